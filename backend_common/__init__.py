@@ -0,0 +1,7 @@
+"""
+Response helpers shared by the backends in this repository.
+
+The repository root is its project folder: backends outside the root
+install it with `pip install -e <repository root>` (see their
+requirements.txt) instead of patching sys.path.
+"""
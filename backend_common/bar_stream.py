@@ -0,0 +1,243 @@
+"""
+Live bar updates over WebSocket.
+
+`BarStream` pushes the forming bar and new bars of (symbol, resolution)
+channels to subscribed WebSocket clients, so a live chart loads
+/udf/history once and then listens instead of re-polling it. Each channel
+asks its source (`poll`) for the latest bars once per `interval` while it
+has subscribers, however many charts show it, and publishes a bar whenever
+it differs from what was last published for that bar time.
+
+Every bar message carries the channel's sequence number. The last
+`backlog` messages are kept, so a client that reconnects with the last
+number it saw receives only the updates it missed; when those are gone it
+is told to reload history instead. Sequence numbers start from the
+channel's creation time in milliseconds, so numbers from before a server
+restart are recognized as stale.
+
+    STREAM = BarStream(poll=latest_bars, interval=1.0)
+
+    @app.websocket("/udf/stream")
+    async def udf_stream(websocket: WebSocket):
+        await STREAM.serve(websocket)
+
+Client messages:
+
+    {"action": "subscribe", "symbol": "AAPL", "resolution": "1", "since": 1234}
+    {"action": "unsubscribe", "symbol": "AAPL", "resolution": "1"}
+
+"since" is optional; without it the client gets the current bar only.
+
+Server messages:
+
+    {"type": "subscribed", "symbol": ..., "resolution": ..., "seq": ...}
+    {"type": "bar", "symbol": ..., "resolution": ..., "seq": ..., "t": ..., "o": ..., "h": ..., "l": ..., "c": ..., "v": ...}
+    {"type": "reset", "symbol": ..., "resolution": ..., "seq": ...}   missed updates are gone; reload history
+    {"type": "error", "errmsg": ...}
+
+A client that falls `max_pending` messages behind is disconnected with
+code 1013 and can resume with "since".
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .bars import Bars
+
+logger = logging.getLogger(__name__)
+
+# Bar times whose last published values a channel remembers
+_PUBLISHED_BARS = 16
+
+Poll = Callable[[str, str], Union[Optional[Bars], Awaitable[Optional[Bars]]]]
+
+
+class _Subscriber:
+    """Outgoing messages of one WebSocket connection"""
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.max_pending = max_pending
+        self.lagging = False
+        self.channels: Set[Tuple[str, str]] = set()
+
+    def offer(self, message: dict) -> None:
+        if self.lagging:
+            return
+        if self.queue.qsize() >= self.max_pending:
+            # Tell the sender to disconnect; the client resumes from its last seq
+            self.lagging = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(message)
+
+
+class _Channel:
+    """Sequenced bar messages of one (symbol, resolution)"""
+
+    def __init__(self, symbol: str, resolution: str, backlog: int):
+        self.symbol = symbol
+        self.resolution = resolution
+        self.seq = int(time.time() * 1000)
+        self.backlog: deque = deque(maxlen=backlog)
+        self.published: Dict[int, Tuple[float, ...]] = {}
+        self.subscribers: Set[_Subscriber] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def message(self, kind: str, **fields: Any) -> dict:
+        return {"type": kind, "symbol": self.symbol, "resolution": self.resolution, "seq": self.seq, **fields}
+
+    def publish(self, bars: Bars) -> None:
+        """Publish the bars that differ from their last published values"""
+        for i in range(len(bars)):
+            t = int(bars.t[i])
+            values = (float(bars.o[i]), float(bars.h[i]), float(bars.l[i]), float(bars.c[i]), float(bars.v[i]))
+            if self.published.get(t) == values:
+                continue
+            self.published[t] = values
+            self.seq += 1
+            o, h, l, c, v = values  # noqa: E741
+            message = self.message("bar", t=t, o=o, h=h, l=l, c=c, v=v)
+            self.backlog.append(message)
+            for subscriber in list(self.subscribers):
+                subscriber.offer(message)
+        if len(self.published) > _PUBLISHED_BARS:
+            for t in sorted(self.published)[:-_PUBLISHED_BARS]:
+                del self.published[t]
+
+    def replay(self, since: Optional[int]) -> List[dict]:
+        """Messages a subscriber that last saw `since` needs"""
+        if since is None:
+            return [self.backlog[-1]] if self.backlog else []
+        if since == self.seq:
+            return []
+        if since > self.seq or not self.backlog or self.backlog[0]["seq"] > since + 1:
+            return [self.message("reset")]
+        return [m for m in self.backlog if m["seq"] > since]
+
+
+class BarStream:
+    """
+    Polled bar sources fanned out to WebSocket subscribers.
+
+    Args:
+        poll: poll(symbol, resolution) -> the latest bars (at least the forming
+            one), sync or async; raises for unknown symbols or resolutions
+        interval: Seconds between polls of a channel with subscribers
+        backlog: Messages kept per channel for resuming clients
+        max_pending: Unsent messages after which a client is disconnected
+    """
+
+    def __init__(self, poll: Poll, interval: float = 1.0, backlog: int = 1024, max_pending: int = 1024):
+        self.poll = poll
+        self.interval = interval
+        self.backlog = backlog
+        self.max_pending = max_pending
+        self._channels: Dict[Tuple[str, str], _Channel] = {}
+
+    async def _poll(self, symbol: str, resolution: str) -> Optional[Bars]:
+        result = self.poll(symbol, resolution)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _run(self, channel: _Channel) -> None:
+        while channel.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                bars = await self._poll(channel.symbol, channel.resolution)
+            except Exception as e:
+                logger.warning("Polling %s %s failed: %s", channel.symbol, channel.resolution, e)
+                continue
+            if bars is not None:
+                channel.publish(bars)
+        channel.task = None
+
+    async def subscribe(self, subscriber: _Subscriber, symbol: str, resolution: str, since: Optional[int]) -> None:
+        key = (symbol, resolution)
+        channel = self._channels.get(key)
+        if channel is None:
+            # Only symbols the source knows get a channel
+            bars = await self._poll(symbol, resolution)
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = _Channel(symbol, resolution, self.backlog)
+            if bars is not None:
+                channel.publish(bars)
+
+        subscriber.offer(channel.message("subscribed"))
+        for message in channel.replay(since):
+            subscriber.offer(message)
+        channel.subscribers.add(subscriber)
+        subscriber.channels.add(key)
+        if channel.task is None:
+            channel.task = asyncio.create_task(self._run(channel))
+
+    def unsubscribe(self, subscriber: _Subscriber, symbol: str, resolution: str) -> None:
+        channel = self._channels.get((symbol, resolution))
+        if channel is not None:
+            channel.subscribers.discard(subscriber)
+        subscriber.channels.discard((symbol, resolution))
+
+    async def _command(self, subscriber: _Subscriber, data: Any) -> None:
+        if not isinstance(data, dict):
+            subscriber.offer({"type": "error", "errmsg": "Messages must be JSON objects"})
+            return
+        action, symbol, resolution = data.get("action"), data.get("symbol"), data.get("resolution")
+        since = data.get("since")
+        if not isinstance(symbol, str) or not isinstance(resolution, str) or not symbol or not resolution:
+            subscriber.offer({"type": "error", "errmsg": "'symbol' and 'resolution' are required"})
+        elif since is not None and (not isinstance(since, int) or isinstance(since, bool)):
+            subscriber.offer({"type": "error", "errmsg": "'since' must be an integer"})
+        elif action == "subscribe":
+            try:
+                await self.subscribe(subscriber, symbol, resolution, since)
+            except Exception as e:
+                subscriber.offer({"type": "error", "symbol": symbol, "resolution": resolution, "errmsg": str(e)})
+        elif action == "unsubscribe":
+            self.unsubscribe(subscriber, symbol, resolution)
+        else:
+            subscriber.offer({"type": "error", "errmsg": f"Unknown action {action!r}"})
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Accept a WebSocket and stream to it until it disconnects"""
+        await websocket.accept()
+        subscriber = _Subscriber(self.max_pending)
+
+        async def consumer_handler():
+            try:
+                async for data in websocket.iter_json():
+                    await self._command(subscriber, data)
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+            except ValueError:
+                # Not JSON
+                await websocket.close(code=1003)
+
+        async def producer_handler():
+            try:
+                while True:
+                    message = await subscriber.queue.get()
+                    if message is None:
+                        await websocket.close(code=1013, reason="Too far behind; resume with 'since'")
+                        return
+                    await websocket.send_json(message)
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+
+        consumer_task = asyncio.create_task(consumer_handler())
+        producer_task = asyncio.create_task(producer_handler())
+        try:
+            done, pending = await asyncio.wait(
+                [consumer_task, producer_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+        finally:
+            for symbol, resolution in list(subscriber.channels):
+                self.unsubscribe(subscriber, symbol, resolution)
@@ -0,0 +1,321 @@
+"""
+Multi-resolution OHLCV bar store.
+
+`BarStore` keeps one base series per symbol in NumPy column arrays and
+builds coarser resolutions from it by vectorized resampling (bucket index
+per bar, then `reduceat`). Each resampled series is cached per
+(symbol, resolution) until the base series changes, so zooming a chart out
+from 5-minute to hourly bars, or from daily to monthly ones, slices arrays
+that are already in memory instead of regenerating data or calling the
+upstream again.
+
+Loading is left to the caller, which keeps the store usable from both sync
+and async endpoints:
+
+    BARS = BarStore(bases={"5": "1", "60": "1", "W": "D", "M": "D"})
+
+    base, start, end = BARS.plan(resolution, from_time, to_time, countback)
+    if not BARS.covered(symbol, base, start, end):
+        BARS.add(symbol, base, load(symbol, base, start, end), start, end)
+    bars = BARS.history(symbol, resolution, from_time, to_time, countback)
+
+`BarStore.get` does the same with a synchronous loader.
+
+Resolutions are UDF codes: minutes ("1", "240"), days ("D", "3D"), weeks
+("W", starting on Monday) and calendar months ("M"), all in UTC.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+_DAY = 86400
+# 1970-01-05 was the first Monday after the epoch
+_WEEK_OFFSET = 4 * _DAY
+
+
+@dataclass
+class Bars:
+    """Column arrays of OHLCV bars, sorted by time"""
+
+    t: np.ndarray  # int64 Unix seconds, bar open
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray  # noqa: E741
+    c: np.ndarray
+    v: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        none = np.empty(0)
+        return cls(none.astype(np.int64), none, none, none, none, none)
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def __getitem__(self, index) -> "Bars":
+        return Bars(
+            self.t[index], self.o[index], self.h[index], self.l[index], self.c[index], self.v[index]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.t, self.o, self.h, self.l, self.c, self.v))
+
+    def to_udf(self, decimals: Optional[int] = None) -> Dict[str, Any]:
+        """UDF history payload; arrays are serialized directly by FastJSONResponse"""
+        if not len(self):
+            return {"s": "no_data"}
+        prices = (self.o, self.h, self.l, self.c)
+        if decimals is not None:
+            prices = tuple(np.round(p, decimals) for p in prices)
+        o, h, l, c = prices  # noqa: E741
+        return {"s": "ok", "t": self.t, "o": o, "h": h, "l": l, "c": c, "v": self.v}
+
+
+class Frame:
+    """
+    Bucketing of timestamps for one resolution.
+
+    Args:
+        step: Bucket length in seconds, for fixed-length resolutions
+        months: Bucket length in calendar months
+        offset: Start of bucket 0 in Unix seconds (fixed-length only)
+    """
+
+    def __init__(self, step: Optional[int] = None, months: Optional[int] = None, offset: int = 0):
+        self.step = step
+        self.months = months
+        self.offset = offset
+
+    def index(self, t):
+        """Bucket number of each timestamp"""
+        t = np.asarray(t, dtype=np.int64)
+        if self.months:
+            month = t.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+            return month // self.months
+        return (t - self.offset) // self.step
+
+    def start(self, index):
+        """Opening time of each bucket"""
+        index = np.asarray(index, dtype=np.int64)
+        if self.months:
+            month = (index * self.months).astype("datetime64[M]")
+            return month.astype("datetime64[s]").astype(np.int64)
+        return index * self.step + self.offset
+
+
+@lru_cache(maxsize=None)
+def resolution_frame(resolution: str) -> Frame:
+    """Frame of a UDF resolution code; ValueError for codes it does not know"""
+    match = re.fullmatch(r"(\d*)([DWM]?)", resolution or "")
+    if match is None or not (match.group(1) or match.group(2)):
+        raise ValueError(f"Unsupported resolution {resolution!r}")
+    count = int(match.group(1) or 1)
+    if count < 1:
+        raise ValueError(f"Unsupported resolution {resolution!r}")
+    unit = match.group(2)
+    if unit == "M":
+        return Frame(months=count)
+    if unit == "W":
+        return Frame(step=count * 7 * _DAY, offset=_WEEK_OFFSET)
+    if unit == "D":
+        return Frame(step=count * _DAY)
+    return Frame(step=count * 60)
+
+
+def resample(bars: Bars, frame: Frame) -> Tuple[np.ndarray, Bars]:
+    """Bucket numbers and OHLCV bars of `bars` aggregated into `frame`"""
+    if not len(bars):
+        return np.empty(0, dtype=np.int64), bars
+    index = frame.index(bars.t)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(index)) + 1))
+    ends = np.append(starts[1:], len(bars)) - 1
+    buckets = index[starts]
+    return buckets, Bars(
+        frame.start(buckets),
+        bars.o[starts],
+        np.maximum.reduceat(bars.h, starts),
+        np.minimum.reduceat(bars.l, starts),
+        bars.c[ends],
+        np.add.reduceat(bars.v, starts),
+    )
+
+
+class _Series:
+    """A symbol's base bars, the time span they cover and their resamplings"""
+
+    __slots__ = ("bars", "start", "end", "loaded_at", "derived")
+
+    def __init__(self, bars: Bars, start: int, end: int):
+        self.bars = bars
+        self.start = start
+        self.end = end
+        self.loaded_at = time.monotonic()
+        self.derived: Dict[str, Tuple[np.ndarray, Bars]] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return self.bars.nbytes + sum(
+            index.nbytes + bars.nbytes for index, bars in self.derived.values()
+        )
+
+
+class BarStore:
+    """
+    Base bars per symbol with cached resamplings.
+
+    Args:
+        bases: Base resolution each resolution is resampled from; resolutions
+            not listed are their own base
+        max_bars: Most base bars one request may need
+        max_bytes: Memory budget; least recently used series are evicted
+            beyond it
+    """
+
+    def __init__(
+        self,
+        bases: Optional[Mapping[str, str]] = None,
+        max_bars: int = 2_000_000,
+        max_bytes: int = 256 * 2**20,
+    ):
+        self.bases = dict(bases or {})
+        self.max_bars = max_bars
+        self.max_bytes = max_bytes
+        self._series: "OrderedDict[Tuple[str, str], _Series]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def base_of(self, resolution: str) -> str:
+        return self.bases.get(resolution, resolution)
+
+    @staticmethod
+    def _buckets(frame: Frame, from_time: int, to_time: int, countback: Optional[int]) -> Tuple[int, int]:
+        """First and last bucket opening in [from_time, to_time], or the last `countback`"""
+        last = int(frame.index(to_time))
+        if countback:
+            return last - countback + 1, last
+        first = int(frame.index(from_time))
+        if int(frame.start(first)) < from_time:
+            first += 1
+        return first, last
+
+    def plan(
+        self, resolution: str, from_time: int, to_time: int, countback: Optional[int] = None
+    ) -> Tuple[str, int, int]:
+        """
+        Base resolution and the [start, end) span in seconds its bars must
+        cover to answer a history request.
+        """
+        frame = resolution_frame(resolution)
+        base = self.base_of(resolution)
+        base_frame = resolution_frame(base)
+        first, last = self._buckets(frame, from_time, to_time, countback)
+        start = int(frame.start(first))
+        end = int(frame.start(max(first, last + 1)))
+        needed = int(base_frame.index(end - 1) - base_frame.index(start)) + 1 if end > start else 0
+        if needed > self.max_bars:
+            raise ValueError(
+                f"{needed} bars at resolution {base} needed; at most {self.max_bars} per request"
+            )
+        return base, start, end
+
+    def covered(
+        self, symbol: str, base: str, start: int, end: int, max_age: Optional[float] = None
+    ) -> bool:
+        """Whether the stored base bars span [start, end), loaded at most `max_age` seconds ago"""
+        series = self._series.get((symbol, base))
+        if series is None or series.start > start or series.end < end:
+            return False
+        return max_age is None or time.monotonic() - series.loaded_at <= max_age
+
+    def add(self, symbol: str, base: str, bars: Bars, start: int, end: int) -> None:
+        """
+        Store base bars covering [start, end), merged with the stored ones
+        when the spans touch; the new bars win where they overlap.
+        """
+        key = (symbol, base)
+        with self._lock:
+            old = self._series.get(key)
+        if old is not None and start <= old.end and end >= old.start:
+            before = old.bars[: np.searchsorted(old.bars.t, start, "left")]
+            after = old.bars[np.searchsorted(old.bars.t, end, "left") :]
+            merged = Bars(
+                *(
+                    np.concatenate((getattr(before, f), getattr(bars, f), getattr(after, f)))
+                    for f in "tohlcv"
+                )
+            )
+            if len(merged) <= self.max_bars:
+                bars, start, end = merged, min(start, old.start), max(end, old.end)
+
+        with self._lock:
+            self._series[key] = _Series(bars, start, end)
+            self._series.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        total = sum(series.nbytes for series in self._series.values())
+        while total > self.max_bytes and len(self._series) > 1:
+            _, series = self._series.popitem(last=False)
+            total -= series.nbytes
+
+    def history(
+        self,
+        symbol: str,
+        resolution: str,
+        from_time: int,
+        to_time: int,
+        countback: Optional[int] = None,
+    ) -> Bars:
+        """
+        Bars opening in [from_time, to_time], or the last `countback` bars
+        opening at or before to_time, from the stored base bars.
+        """
+        frame = resolution_frame(resolution)
+        key = (symbol, self.base_of(resolution))
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+        if series is None:
+            return Bars.empty()
+
+        cached = series.derived.get(resolution)
+        if cached is None:
+            if resolution == key[1]:
+                index, bars = frame.index(series.bars.t), series.bars
+            else:
+                index, bars = resample(series.bars, frame)
+            if len(index) and int(frame.start(index[0])) < max(series.start, int(series.bars.t[0])):
+                # The first bucket opens before the stored bars, so it is partial
+                index, bars = index[1:], bars[1:]
+            cached = (index, bars)
+            with self._lock:
+                series.derived[resolution] = cached
+                self._evict()
+        index, bars = cached
+
+        first, last = self._buckets(frame, from_time, to_time, None)
+        hi = int(np.searchsorted(index, last, "right"))
+        lo = max(0, hi - countback) if countback else int(np.searchsorted(index, first, "left"))
+        return bars[lo:hi]
+
+    def get(
+        self,
+        symbol: str,
+        resolution: str,
+        from_time: int,
+        to_time: int,
+        countback: Optional[int] = None,
+        load: Callable[[str, str, int, int], Bars] = None,
+    ) -> Bars:
+        """`history`, first calling load(symbol, base, start, end) for missing base bars"""
+        base, start, end = self.plan(resolution, from_time, to_time, countback)
+        if end > start and not self.covered(symbol, base, start, end):
+            self.add(symbol, base, load(symbol, base, start, end), start, end)
+        return self.history(symbol, resolution, from_time, to_time, countback)
@@ -0,0 +1,247 @@
+"""
+Response compression middleware.
+
+Compresses complete (non-streamed) responses whose content type is worth
+compressing and whose body reaches a minimum size, with the best encoding
+the client accepts out of brotli, zstd (each if its library is installed)
+and gzip. Bodies at or above `offload_size` are compressed in a worker
+thread so large payloads do not stall the event loop.
+
+Streamed responses (files, server-sent events), responses that already
+carry a Content-Encoding, already-compressed formats (images, PDFs,
+archives) and small payloads are passed through unchanged. Complete
+responses of a compressible type, and 304s, carry Vary: Accept-Encoding
+whether or not they were compressed, since the same route may compress
+larger bodies.
+"""
+import asyncio
+import gzip
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types compressed unless overridden by the middleware's policy;
+# "+json"/"+xml" structured-syntax suffixes are compressed as well
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+# Never worth it: already compressed or meant to be streamed as produced
+SKIPPED_TYPES = (
+    "text/event-stream",
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "font/woff2",
+    "video/",
+    "audio/",
+)
+
+
+def encoders(gzip_level: int = 6, brotli_quality: int = 5, zstd_level: int = 3) -> Dict[str, Callable[[bytes], bytes]]:
+    """Available encoders in server preference order"""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=zstd_level)
+        encoders["zstd"] = compressor.compress
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return encoders
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, available) -> Optional[str]:
+    """The client's most preferred coding out of `available` (in server preference order)"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses by size and content type.
+
+    Args:
+        app: ASGI application
+        minimum_size: Bodies smaller than this many bytes are sent as is
+        offload_size: Bodies at least this large are compressed in a thread
+        policy: Content-type prefix -> True/False overriding the defaults,
+            e.g. {"application/vnd.openbb.columnar+json": True}
+        gzip_level: gzip compression level
+        brotli_quality: brotli quality (0-11)
+        zstd_level: zstd compression level
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        offload_size: int = 256 * 1024,
+        policy: Optional[Mapping[str, bool]] = None,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        # Longest prefix wins
+        self.policy = sorted((policy or {}).items(), key=lambda kv: -len(kv[0]))
+        self.encoders = encoders(gzip_level, brotli_quality, zstd_level)
+
+    def compressible(self, content_type: str) -> bool:
+        content_type = content_type.split(";")[0].strip().lower()
+        for prefix, allowed in self.policy:
+            if content_type.startswith(prefix):
+                return allowed
+        if content_type.startswith(SKIPPED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(("+json", "+xml"))
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        return choose_encoding(accept_encoding, self.encoders)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = self.choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+def _vary_accept_encoding(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Headers with Accept-Encoding added to (or set as) Vary"""
+    out = []
+    vary = None
+    for key, value in headers:
+        if key.lower() == b"vary":
+            vary = value
+        else:
+            out.append((key, value))
+    if vary is None:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in vary.lower():
+        vary += b", Accept-Encoding"
+    out.append((b"vary", vary))
+    return out
+
+
+class _CompressingResponder:
+    """Holds back the response start until it knows whether to compress"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[dict] = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        values = {k.lower(): v for k, v in headers}
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        if b"content-encoding" in values:
+            return False
+        if b"no-transform" in values.get(b"cache-control", b"").lower():
+            return False
+        return self.middleware.compressible(values.get(b"content-type", b"").decode("latin-1"))
+
+    async def send(self, message):
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start = message
+            if message["status"] == 304:
+                # Stands in for a 200 that carried Vary: Accept-Encoding
+                self.passthrough = True
+                await self._send({**message, "headers": _vary_accept_encoding(message.get("headers", []))})
+            elif not self._should_compress(list(message.get("headers", []))):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if message.get("more_body", False):
+            # A streamed response: send it as produced
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        if self.encoding is None or len(body) < self.middleware.minimum_size:
+            await self._send({**self.start, "headers": _vary_accept_encoding(self.start.get("headers", []))})
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        encode = self.middleware.encoders[self.encoding]
+        if len(body) >= self.middleware.offload_size:
+            compressed = await asyncio.get_running_loop().run_in_executor(None, encode, body)
+        else:
+            compressed = encode(body)
+
+        headers = []
+        for key, value in self.start.get("headers", []):
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and value.endswith(b'"') and not value.startswith(b"W/"):
+                # The compressed body is a different representation
+                value = value[:-1] + b"-" + self.encoding.encode() + b'"'
+            headers.append((key, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"content-length", str(len(compressed)).encode()))
+        headers = _vary_accept_encoding(headers)
+
+        await self._send({**self.start, "headers": headers})
+        await self._send({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,311 @@
+"""
+Conditional GET support.
+
+`ConditionalGetMiddleware` gives every complete 200 response to a GET
+request a strong ETag computed from its body (unless the endpoint set one)
+and answers a matching If-None-Match with an empty 304, so a client polling
+unchanged data only pays for the round trip.
+
+`cached_response` goes one step further for endpoints whose output only
+depends on their query parameters (static demo data, configuration files
+read at import): the first call per parameter set is serialized once and its bytes
+and ETag are reused afterwards, so a repeated request neither rebuilds nor
+re-encodes nor re-hashes anything.
+
+    app.add_middleware(ConditionalGetMiddleware)
+
+    @app.get("/table_widget")
+    @cached_response
+    def table_widget():
+        ...
+
+Add the middleware before CompressionMiddleware so it sees the identity
+body; the encoding suffix compression appends to ETags ("abc-br") is
+ignored when comparing, as long as the request still accepts that encoding.
+"""
+import asyncio
+import enum
+import hashlib
+import inspect
+import threading
+import types
+import typing
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi.responses import Response
+
+from .compression import parse_accept_encoding
+from .responses import FastJSONResponse
+
+# Union origins: typing.Union, plus PEP 604 `X | Y` unions on Python 3.10+
+_UNION_TYPES = (typing.Union, getattr(types, "UnionType", typing.Union))
+
+# Suffixes CompressionMiddleware appends to the ETag of encoded representations
+_ENCODING_SUFFIXES = ("-br", "-zstd", "-gzip")
+
+# Headers a 304 must repeat from the 200 it stands in for (RFC 9110 15.4.5)
+_NOT_MODIFIED_HEADERS = (b"cache-control", b"content-location", b"date", b"expires", b"vary")
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong entity tag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque(tag: str) -> Tuple[str, Optional[str]]:
+    """Entity tag without weakness prefix, quotes and encoding suffix, and that encoding"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)], suffix[1:]
+    return tag, None
+
+
+def etag_matches(if_none_match: str, etag: str, accept_encoding: Optional[str] = None) -> Optional[str]:
+    """
+    The tag in an If-None-Match header matching `etag`, or None.
+
+    Uses the weak comparison If-None-Match calls for and treats the
+    per-encoding variants of a tag as the same entity. With the request's
+    `accept_encoding`, a variant only matches if the client accepts its
+    encoding, so a client that cannot decode it gets the full response.
+    """
+    target, _ = _opaque(etag)
+    accepted = None if accept_encoding is None else parse_accept_encoding(accept_encoding)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        if not candidate:
+            continue
+        opaque, coding = _opaque(candidate)
+        if opaque != target:
+            continue
+        if coding is not None and accepted is not None and accepted.get(coding, accepted.get("*", 0.0)) <= 0:
+            continue
+        return candidate
+    return None
+
+
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware adding ETags and answering If-None-Match with 304.
+
+    Args:
+        app: ASGI application
+        cache_control: Cache-Control set on tagged responses that have none;
+            "no-cache" lets browsers keep the response but revalidate it on
+            every use. None leaves the header alone.
+    """
+
+    def __init__(self, app, cache_control: Optional[str] = "no-cache"):
+        self.app = app
+        self.cache_control = cache_control.encode() if cache_control else None
+
+    async def __call__(self, scope, receive, send):
+        # A HEAD response has no body to hash, so it would get another tag than GET
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        if_none_match = None
+        accept_encoding = ""
+        for key, value in scope.get("headers") or []:
+            if key == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+            elif key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        responder = _ConditionalResponder(self, if_none_match, accept_encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _ConditionalResponder:
+    """Holds back a 200 response start until its body has been tagged"""
+
+    def __init__(
+        self, middleware: ConditionalGetMiddleware, if_none_match: Optional[str], accept_encoding: str, send
+    ):
+        self.middleware = middleware
+        self.if_none_match = if_none_match
+        self.accept_encoding = accept_encoding
+        self._send = send
+        self.start: Optional[dict] = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start = message
+            cache_control = b""
+            for key, value in message.get("headers", []):
+                if key.lower() == b"cache-control":
+                    cache_control = value.lower()
+            if message["status"] != 200 or b"no-store" in cache_control:
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or message.get("more_body", False):
+            # Streamed bodies are not buffered to be hashed
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        headers = list(self.start.get("headers", []))
+        etag = None
+        has_cache_control = False
+        for key, value in headers:
+            name = key.lower()
+            if name == b"etag":
+                etag = value.decode("latin-1")
+            elif name == b"cache-control":
+                has_cache_control = True
+        if etag is None:
+            etag = strong_etag(body)
+            headers.append((b"etag", etag.encode("latin-1")))
+        if not has_cache_control and self.middleware.cache_control:
+            headers.append((b"cache-control", self.middleware.cache_control))
+
+        matched = None
+        if self.if_none_match:
+            matched = etag_matches(self.if_none_match, etag, self.accept_encoding)
+        if matched is None:
+            await self._send({**self.start, "headers": headers})
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        # Echo the client's tag so the representation it cached keeps its ETag
+        not_modified = [(b"etag", matched.encode("latin-1"))]
+        vary = None
+        for key, value in headers:
+            name = key.lower()
+            if name == b"vary":
+                vary = value
+            elif name in _NOT_MODIFIED_HEADERS:
+                not_modified.append((key, value))
+        if _opaque(matched)[1] is not None:
+            # The cached representation was compressed downstream, which added
+            # Accept-Encoding to the Vary of its 200
+            if vary is None:
+                vary = b"Accept-Encoding"
+            elif b"accept-encoding" not in vary.lower():
+                vary += b", Accept-Encoding"
+        if vary is not None:
+            not_modified.append((b"vary", vary))
+        await self._send({"type": "http.response.start", "status": 304, "headers": not_modified})
+        await self._send({"type": "http.response.body", "body": b""})
+
+
+class _Frozen:
+    """A serialized 200 response, replayed without re-encoding"""
+
+    __slots__ = ("body", "media_type", "headers")
+
+    def __init__(self, response: Response):
+        self.body = response.body
+        self.media_type = response.media_type
+        self.headers = {
+            k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")
+        }
+        self.headers.setdefault("etag", strong_etag(self.body))
+
+    def response(self) -> Response:
+        return Response(self.body, media_type=self.media_type, headers=self.headers)
+
+
+def _freeze(result: Any) -> Optional[_Frozen]:
+    response = result if isinstance(result, Response) else FastJSONResponse(result)
+    if response.status_code != 200 or not hasattr(response, "body"):
+        return None
+    return _Frozen(response)
+
+
+def _is_query_scalar(annotation: Any) -> bool:
+    """Whether a parameter annotation is a single query value FastAPI parses"""
+    if annotation is inspect.Parameter.empty or annotation is type(None):
+        return True
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return True
+    if origin in _UNION_TYPES:
+        return all(_is_query_scalar(arg) for arg in typing.get_args(annotation))
+    return isinstance(annotation, type) and issubclass(annotation, (str, int, float, enum.Enum))
+
+
+def cached_response(func: Callable = None, *, maxsize: int = 256):
+    """
+    Memoize an endpoint's serialized response per query parameter set.
+
+    For endpoints whose output is fully determined by their scalar query
+    parameters; an endpoint taking anything else (a Request, a body model,
+    a list) raises TypeError when decorated, as every call would be a new
+    key. Only 200 responses with a complete body are kept; the `maxsize`
+    most recently used parameter sets are remembered. Apply it below the
+    route decorator so FastAPI registers the memoized function.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        hints = typing.get_type_hints(func)
+        for name in signature.parameters:
+            if not _is_query_scalar(hints.get(name, inspect.Parameter.empty)):
+                raise TypeError(
+                    f"cached_response: {func.__name__}() parameter {name!r} is not a scalar query parameter"
+                )
+        cache: "OrderedDict[Any, _Frozen]" = OrderedDict()
+        lock = threading.Lock()
+
+        def lookup(key):
+            with lock:
+                frozen = cache.get(key)
+                if frozen is not None:
+                    cache.move_to_end(key)
+                return frozen
+
+        def store(key, result):
+            frozen = _freeze(result)
+            if frozen is None:
+                return result
+            with lock:
+                cache[key] = frozen
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return frozen.response()
+
+        def key_of(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments.values())
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key = key_of(args, kwargs)
+            frozen = lookup(key)
+            if frozen is not None:
+                return frozen.response()
+            return store(key, await func(*args, **kwargs))
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            key = key_of(args, kwargs)
+            frozen = lookup(key)
+            if frozen is not None:
+                return frozen.response()
+            return store(key, func(*args, **kwargs))
+
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
+        return sync_wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,342 @@
+"""
+Request and upstream-call metrics in the Prometheus text format.
+
+`MetricsMiddleware` records, per route template and widgetId, the request
+count by status class, a latency histogram and a response-size histogram;
+`Metrics.observe_upstream` (or the `Metrics.upstream` context manager)
+records the duration and outcome of calls to data providers. `/metrics`
+renders everything, including p50/p95/p99 estimated from the histograms:
+
+    METRICS = Metrics()
+    app.add_middleware(MetricsMiddleware, metrics=METRICS, widgets=WIDGETS)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return METRICS.response()
+
+Writers never take a lock: every counter is sharded per thread (the event
+loop and each worker thread increment their own lists) and a scrape sums
+the shards, so recording costs a dict lookup and a few list increments.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import get_ident
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.responses import Response
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+# Bytes
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(9))  # 256 B .. 16 MB
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Bucketed observations, sharded per thread.
+
+    Each shard is a list of per-bucket counts (the last one for +Inf)
+    followed by the running sum.
+    """
+
+    __slots__ = ("bounds", "_shards")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self._shards: Dict[int, List[float]] = {}
+
+    def observe(self, value: float) -> None:
+        shard = self._shards.get(get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(get_ident(), [0] * (len(self.bounds) + 2))
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket counts (non-cumulative, +Inf last) and the sum"""
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        for shard in list(self._shards.values()):
+            for i in range(len(counts)):
+                counts[i] += shard[i]
+            total += shard[-1]
+        return counts, total
+
+    def quantile(self, q: float, counts: Optional[List[int]] = None) -> float:
+        """Estimate, interpolating linearly inside the bucket holding the q-th value"""
+        if counts is None:
+            counts = self.snapshot()[0]
+        n = sum(counts)
+        if not n:
+            return float("nan")
+        rank = q * n
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    return lower  # +Inf bucket: the best we know is its lower bound
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class Counter:
+    """Monotonic counter, sharded per thread"""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards: Dict[int, List[float]] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        shard = self._shards.get(get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(get_ident(), [0])
+        shard[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(shard[0] for shard in list(self._shards.values()))
+
+
+class _RouteSeries:
+    __slots__ = ("latency", "size", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses: Dict[str, Counter] = {}
+
+
+class _UpstreamSeries:
+    __slots__ = ("latency", "errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.errors = Counter()
+
+
+def _labels(**labels: Any) -> str:
+    def escape(value: Any) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Registry of request and upstream series.
+
+    Args:
+        namespace: Prefix of every metric name
+    """
+
+    def __init__(self, namespace: str = "openbb_backend"):
+        self.namespace = namespace
+        self._routes: Dict[Tuple[str, str, str], _RouteSeries] = {}
+        self._upstreams: Dict[str, _UpstreamSeries] = {}
+
+    def observe_request(
+        self, route: str, widget: str, method: str, status: int, seconds: float, size: int
+    ) -> None:
+        key = (route, widget, method)
+        series = self._routes.get(key)
+        if series is None:
+            series = self._routes.setdefault(key, _RouteSeries())
+        status_class = f"{status // 100}xx"
+        counter = series.statuses.get(status_class)
+        if counter is None:
+            counter = series.statuses.setdefault(status_class, Counter())
+        counter.inc()
+        series.latency.observe(seconds)
+        series.size.observe(size)
+
+    def observe_upstream(self, name: str, seconds: float, ok: bool = True) -> None:
+        series = self._upstreams.get(name)
+        if series is None:
+            series = self._upstreams.setdefault(name, _UpstreamSeries())
+        series.latency.observe(seconds)
+        if not ok:
+            series.errors.inc()
+
+    @contextmanager
+    def upstream(self, name: str):
+        """Time the enclosed call to an upstream provider"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe_upstream(name, time.perf_counter() - started, ok)
+
+    def _histogram(self, lines: List[str], name: str, histogram: Histogram, labels: Dict[str, Any]):
+        counts, total = histogram.snapshot()
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=_number(bound))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+        return counts
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        ns = self.namespace
+        routes = sorted(list(self._routes.items()))
+        upstreams = sorted(list(self._upstreams.items()))
+        lines: List[str] = []
+
+        lines.append(f"# HELP {ns}_requests_total Requests by route, widget, method and status class")
+        lines.append(f"# TYPE {ns}_requests_total counter")
+        for (route, widget, method), series in routes:
+            for status, counter in sorted(series.statuses.items()):
+                labels = _labels(route=route, widget=widget, method=method, status=status)
+                lines.append(f"{ns}_requests_total{labels} {_number(counter.value)}")
+
+        quantiles: List[str] = []
+        lines.append(f"# HELP {ns}_request_duration_seconds Time to the last response byte")
+        lines.append(f"# TYPE {ns}_request_duration_seconds histogram")
+        for (route, widget, method), series in routes:
+            labels = {"route": route, "widget": widget, "method": method}
+            counts = self._histogram(lines, f"{ns}_request_duration_seconds", series.latency, labels)
+            for q in QUANTILES:
+                value = series.latency.quantile(q, counts)
+                quantiles.append(
+                    f"{ns}_request_duration_quantile_seconds{_labels(**labels, quantile=q)} {_number(value)}"
+                )
+
+        lines.append(
+            f"# HELP {ns}_request_duration_quantile_seconds p50/p95/p99 estimated from the histogram"
+        )
+        lines.append(f"# TYPE {ns}_request_duration_quantile_seconds gauge")
+        lines.extend(quantiles)
+
+        lines.append(f"# HELP {ns}_response_size_bytes Response body size as sent")
+        lines.append(f"# TYPE {ns}_response_size_bytes histogram")
+        for (route, widget, method), series in routes:
+            labels = {"route": route, "widget": widget, "method": method}
+            self._histogram(lines, f"{ns}_response_size_bytes", series.size, labels)
+
+        lines.append(f"# HELP {ns}_upstream_duration_seconds Calls to data providers")
+        lines.append(f"# TYPE {ns}_upstream_duration_seconds histogram")
+        for name, series in upstreams:
+            self._histogram(lines, f"{ns}_upstream_duration_seconds", series.latency, {"upstream": name})
+
+        lines.append(f"# HELP {ns}_upstream_errors_total Failed calls to data providers")
+        lines.append(f"# TYPE {ns}_upstream_errors_total counter")
+        for name, series in upstreams:
+            lines.append(f"{ns}_upstream_errors_total{_labels(upstream=name)} {_number(series.errors.value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def response(self) -> Response:
+        return Response(self.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+def _widget_labels(widgets: Any) -> Dict[str, str]:
+    """Widget ids by normalized endpoint path"""
+    configs: Iterable[Any] = widgets.widgets.values() if hasattr(widgets, "widgets") else (
+        widgets.values() if isinstance(widgets, dict) else widgets
+    )
+    by_endpoint: Dict[str, List[str]] = {}
+    for config in configs:
+        endpoint = "/" + str(config.get("endpoint", "")).lstrip("/")
+        widget_id = config.get("widgetId") or endpoint
+        by_endpoint.setdefault(endpoint, []).append(widget_id)
+    return {endpoint: ",".join(sorted(ids)) for endpoint, ids in by_endpoint.items()}
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware feeding `Metrics` with every HTTP request.
+
+    Routes are labelled by their path template ("/api/greeks/{symbol}"), so
+    path parameters do not multiply series; requests matching no route
+    share the "unmatched" label. Add it last so it is the outermost
+    middleware and measures compressed sizes and the full latency.
+
+    Args:
+        app: ASGI application
+        metrics: Registry to record into
+        widgets: WidgetRegistry, {widgetId: config} or list of configs used
+            to label routes with the widget(s) they serve
+        exclude: Paths not recorded (the scrape endpoint itself)
+    """
+
+    def __init__(self, app, metrics: Metrics, widgets: Any = None, exclude: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.metrics = metrics
+        self.widgets = widgets
+        self.exclude = frozenset(exclude)
+        self._route_widgets: Dict[int, Tuple[str, str]] = {}
+        self._by_endpoint: Optional[Dict[str, str]] = None
+
+    def _widget(self, route: Any) -> str:
+        """Widget ids served by a route, matched on the endpoint path or function name"""
+        if self._by_endpoint is None:
+            self._by_endpoint = _widget_labels(self.widgets) if self.widgets is not None else {}
+        path = route.path
+        # "/api/greeks/{symbol}" serves a widget registered as "/api/greeks"
+        widget = self._by_endpoint.get(path) or self._by_endpoint.get(path.split("/{", 1)[0])
+        if not widget:
+            # Widgets registered as "/api/<function name>"
+            name = getattr(getattr(route, "endpoint", None), "__name__", None)
+            widget = next(
+                (ids for endpoint, ids in self._by_endpoint.items() if name and endpoint.rsplit("/", 1)[-1] == name),
+                "",
+            )
+        return widget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            labels = self._route_widgets.get(id(route))
+            if labels is None:
+                labels = (route.path, self._widget(route)) if route is not None else ("unmatched", "")
+                self._route_widgets[id(route)] = labels
+            self.metrics.observe_request(
+                *labels, scope["method"], status, time.perf_counter() - started, size
+            )
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record()
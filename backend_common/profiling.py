@@ -0,0 +1,285 @@
+"""
+On-demand profiling of single requests.
+
+`ProfilerMiddleware` profiles a request only when it carries the admin
+token in `X-Profile-Token`; every other request goes straight to the app,
+so profiling costs nothing while nobody asks for it.
+
+The report format comes from the `X-Profile` header or the `profile` query
+parameter:
+
+    tree       Indented call tree with sample counts and percentages (default)
+    collapsed  Folded stacks ("a;b;c 12"), the input of flamegraph.pl,
+               speedscope and inferno
+    cprofile   Deterministic cProfile statistics sorted by cumulative time
+
+`tree` and `collapsed` come from a sampling profiler that snapshots the
+Python stacks of all busy threads every `interval` seconds, so synchronous
+endpoints running in the threadpool are covered; while the request runs,
+other in-flight requests show up in the samples too. While Python code
+holds the GIL the sampler only runs every sys.getswitchinterval() (5 ms by
+default), so short requests yield few samples. `cprofile` traces the
+event loop thread only, which suits async endpoints.
+
+One request is profiled at a time: only one cProfile profiler may be
+active per process (Python 3.12+ raises otherwise) and concurrent samplers
+would each record the other's request, so a profiled request arriving
+while another one runs gets 409 Conflict.
+
+Without `store_dir` the report replaces the response body (the original
+status is in `X-Profile-Status`); with it, the report is written to that
+directory and the normal response carries its file name in
+`X-Profile-Report`.
+
+    curl -H "X-Profile-Token: $PROFILE_TOKEN" "localhost:7779/plotly_heatmap?profile=collapsed"
+"""
+import cProfile
+import hmac
+import io
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+FORMATS = ("tree", "collapsed", "cprofile")
+
+# Leaf frames of threads that are waiting rather than working
+_IDLE_LEAVES = {
+    ("selectors", "select"),
+    ("threading", "wait"),
+    ("threading", "_wait_for_tstate_lock"),
+    ("queue", "get"),
+    ("concurrent.futures.thread", "_worker"),
+}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of every thread but its own.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.taken = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = frame
+            module = leaf.f_globals.get("__name__", "")
+            if (module, leaf.f_code.co_name) in _IDLE_LEAVES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.samples[tuple(reversed(stack))] += 1
+        self.taken += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """Folded stacks, heaviest first"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def tree(self, min_percent: float = 0.5) -> str:
+        """Call tree of the samples, pruned below `min_percent` of the total"""
+        root: Dict = {}
+        for stack, count in self.samples.items():
+            node = root
+            for name in stack:
+                entry = node.setdefault(name, [0, {}])
+                entry[0] += count
+                node = entry[1]
+        total = sum(self.samples.values())
+        lines = [f"{total} busy samples over {self.taken} ticks of {self.interval * 1000:g} ms"]
+
+        def walk(node: Dict, depth: int) -> None:
+            for name, (count, children) in sorted(node.items(), key=lambda kv: -kv[1][0]):
+                percent = 100.0 * count / total
+                if percent < min_percent:
+                    continue
+                lines.append(f"{'  ' * depth}{percent:5.1f}% {count:>6}  {name}")
+                walk(children, depth + 1)
+
+        if total:
+            walk(root, 0)
+        return "\n".join(lines) + "\n"
+
+
+def _query_format(scope) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile")
+    return values[0] if values else None
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling requests that present the admin token.
+
+    Args:
+        app: ASGI application
+        token: Admin token expected in X-Profile-Token; None disables profiling
+        store_dir: Directory reports are written to instead of being returned
+        interval: Sampling interval in seconds
+    """
+
+    def __init__(
+        self,
+        app,
+        token: Optional[str] = None,
+        store_dir: Union[str, Path, None] = None,
+        interval: float = 0.001,
+    ):
+        self.app = app
+        self.token = token.encode() if token else None
+        self.store_dir = Path(store_dir) if store_dir else None
+        self.interval = interval
+        self._profiling = threading.Lock()
+        if self.store_dir is not None:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _requested(self, scope) -> Optional[bytes]:
+        """The X-Profile header value if the request carries a valid token"""
+        token = profile = None
+        for key, value in scope.get("headers") or []:
+            if key == b"x-profile-token":
+                token = value
+            elif key == b"x-profile":
+                profile = value
+        if token is None or not hmac.compare_digest(token, self.token):
+            return None
+        return profile or b""
+
+    async def __call__(self, scope, receive, send):
+        if self.token is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = self._requested(scope)
+        if header is None:
+            await self.app(scope, receive, send)
+            return
+
+        fmt = header.decode("latin-1") or _query_format(scope) or "tree"
+        if fmt not in FORMATS:
+            await _send_text(send, 400, f"Unknown profile format {fmt!r}; use one of {', '.join(FORMATS)}\n")
+            return
+
+        if not self._profiling.acquire(blocking=False):
+            await _send_text(send, 409, "Another request is being profiled; retry once it has finished\n")
+            return
+        try:
+            await self._profile(scope, receive, send, fmt)
+        finally:
+            self._profiling.release()
+
+    async def _profile(self, scope, receive, send, fmt: str) -> None:
+        if self.store_dir is None:
+            # Swallow the response; the report takes its place
+            status = 500
+
+            async def target(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+
+        else:
+            report_name = self._report_name(scope, fmt)
+            target = _ReportHeader(send, report_name).send
+
+        started = time.perf_counter()
+        if fmt == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, target)
+            finally:
+                profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(80)
+            report = out.getvalue()
+        else:
+            sampler = StackSampler(self.interval)
+            sampler.start()
+            try:
+                await self.app(scope, receive, target)
+            finally:
+                sampler.stop()
+            report = sampler.collapsed() if fmt == "collapsed" else sampler.tree()
+        elapsed = time.perf_counter() - started
+
+        heading = f"{scope['method']} {scope['path']} took {elapsed * 1000:.1f} ms"
+        if fmt == "tree":
+            report = f"{heading}\n{report}"
+
+        if self.store_dir is None:
+            await _send_text(send, 200, report, [(b"x-profile-status", str(status).encode())])
+        else:
+            (self.store_dir / report_name).write_text(report, encoding="utf-8")
+
+    @staticmethod
+    def _report_name(scope, fmt: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        return f"{stamp}-{time.perf_counter_ns() % 10**6:06d}-{slug}.{fmt}.txt"
+
+
+class _ReportHeader:
+    """Adds X-Profile-Report to the response start"""
+
+    def __init__(self, send, report_name: str):
+        self._send = send
+        self.header: Tuple[bytes, bytes] = (b"x-profile-report", report_name.encode())
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + [self.header]}
+        await self._send(message)
+
+
+async def _send_text(send, status: int, text: str, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    body = text.encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+            ]
+            + (headers or []),
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
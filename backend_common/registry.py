@@ -0,0 +1,263 @@
+"""
+Frozen widget registry.
+
+Widget definitions - from a widgets.json file, `register_widget`
+decorators, or both - are validated, merged and frozen once. The frozen
+document is encoded to JSON a single time, hashed for its ETag and
+pre-compressed with every available encoding, so serving /widgets.json is a
+dictionary lookup. When the registry is backed by a file, a change to the
+file on disk is picked up on the next request (checked at most once per
+`reload_interval` seconds); a reload that fails validation keeps serving
+the previous definitions.
+
+    WIDGETS = WidgetRegistry(ROOT_PATH / "widgets.json")
+
+    @app.get("/widgets.json")
+    def get_widgets(request: Request):
+        return WIDGETS.response(request)
+
+`FrozenJSON` does the same for any other JSON file, e.g. apps.json.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .compression import choose_encoding, encoders
+from .conditional import etag_matches, strong_etag
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Encoded once, so spend the CPU on the best ratio
+_PRECOMPRESSORS = encoders(gzip_level=9, brotli_quality=11, zstd_level=19)
+
+
+class WidgetRegistryError(ValueError):
+    """Invalid widget definitions"""
+
+
+def _frozen_view(value: Any) -> Any:
+    """Read-only view of a decoded JSON document"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _frozen_view(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_frozen_view(v) for v in value)
+    return value
+
+
+class _Snapshot:
+    """An encoded document with its ETag and compressed representations"""
+
+    __slots__ = ("document", "etag", "bodies")
+
+    def __init__(self, document: Any):
+        body = dumps(document)
+        self.document = _frozen_view(document)
+        self.etag = strong_etag(body)
+        self.bodies: Dict[Optional[str], bytes] = {None: body}
+        for coding, encode in _PRECOMPRESSORS.items():
+            compressed = encode(body)
+            if len(compressed) < len(body):
+                self.bodies[coding] = compressed
+
+    def response(self, request: Request) -> Response:
+        headers = {"cache-control": "no-cache", "vary": "Accept-Encoding"}
+        coding = choose_encoding(
+            request.headers.get("accept-encoding", ""), [c for c in self.bodies if c]
+        )
+        etag = self.etag if coding is None else self.etag[:-1] + f'-{coding}"'
+
+        matched = etag_matches(
+            request.headers.get("if-none-match", ""), etag, request.headers.get("accept-encoding", "")
+        )
+        if matched is not None:
+            return Response(status_code=304, headers={**headers, "etag": matched})
+
+        headers["etag"] = etag
+        if coding is not None:
+            headers["content-encoding"] = coding
+        return Response(self.bodies[coding], media_type="application/json", headers=headers)
+
+
+class FrozenJSON:
+    """
+    A JSON document encoded, hashed and compressed once.
+
+    Args:
+        path: File the document is read from; None for documents built in code
+        reload_interval: Minimum seconds between checks of the file's mtime
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None, reload_interval: float = 1.0):
+        self.path = Path(path) if path is not None else None
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self) -> Any:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def build(self) -> Any:
+        """The document to serve"""
+        return self._read_file()
+
+    def freeze(self) -> "FrozenJSON":
+        """Build, encode and compress the document now"""
+        with self._lock:
+            signature = self._file_signature() if self.path is not None else None
+            self._snapshot = _Snapshot(self.build())
+            self._signature = signature
+            self._checked = time.monotonic()
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self._snapshot is not None
+
+    def _current(self) -> _Snapshot:
+        if self._snapshot is None:
+            self.freeze()
+        elif self.path is not None and time.monotonic() - self._checked >= self.reload_interval:
+            self._checked = time.monotonic()
+            if self._file_signature() != self._signature:
+                try:
+                    self.freeze()
+                    logger.info("Reloaded %s", self.path)
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good document while the file is being edited
+                    logger.warning("Not reloading %s: %s", self.path, e)
+                    self._signature = self._file_signature()
+        return self._snapshot
+
+    @property
+    def document(self) -> Any:
+        return self._current().document
+
+    @property
+    def etag(self) -> str:
+        return self._current().etag
+
+    def response(self, request: Request) -> Response:
+        """Pre-encoded response in the best encoding the client accepts, or 304"""
+        return self._current().response(request)
+
+
+def validate_widget(widget_id: str, config: Any) -> List[str]:
+    """Problems with one widget definition"""
+    if not isinstance(config, dict):
+        return [f"{widget_id}: definition must be an object"]
+    problems = []
+    for key in ("name", "endpoint"):
+        if not isinstance(config.get(key), str) or not config[key]:
+            problems.append(f"{widget_id}: '{key}' must be a non-empty string")
+    if "type" in config and not isinstance(config["type"], str):
+        problems.append(f"{widget_id}: 'type' must be a string")
+    grid = config.get("gridData")
+    if grid is not None and not (
+        isinstance(grid, dict) and all(isinstance(grid.get(k), int) for k in ("w", "h"))
+    ):
+        problems.append(f"{widget_id}: 'gridData' must have integer 'w' and 'h'")
+    params = config.get("params")
+    if params is not None:
+        if not isinstance(params, list):
+            problems.append(f"{widget_id}: 'params' must be a list")
+        else:
+            for i, param in enumerate(params):
+                if not isinstance(param, (dict, list)):
+                    problems.append(f"{widget_id}: params[{i}] must be an object")
+                elif isinstance(param, dict) and not param.get("paramName"):
+                    problems.append(f"{widget_id}: params[{i}] has no 'paramName'")
+    return problems
+
+
+def _widget_id(config: Mapping[str, Any]) -> str:
+    """Id a widget is keyed by: its widgetId, else its endpoint"""
+    return config.get("widgetId") or config.get("endpoint")
+
+
+class WidgetRegistry(FrozenJSON):
+    """
+    Widget definitions from a widgets.json file and/or `register`.
+
+    Decorator-registered widgets are keyed by their widgetId (the endpoint
+    unless set) and merged over the file's; the same id defined differently
+    in both is an error. Registration closes once the registry is frozen.
+
+    Args:
+        path: widgets.json to read, if any
+        as_list: Serve the widgets as a list instead of an object keyed by id
+        reload_interval: Minimum seconds between checks of the file's mtime
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        as_list: bool = False,
+        reload_interval: float = 1.0,
+    ):
+        super().__init__(path, reload_interval)
+        self.as_list = as_list
+        self._registered: Dict[str, dict] = {}
+
+    def register(self, config: dict) -> dict:
+        """
+        Add a widget definition. Widgets served as an object get their
+        widgetId set on the definition; a list is served as registered.
+        """
+        if self.frozen:
+            raise RuntimeError("widgets cannot be registered after the registry is frozen")
+        widget_id = _widget_id(config)
+        if not self.as_list:
+            config.setdefault("widgetId", widget_id)
+        self._registered[widget_id] = config
+        return config
+
+    def build(self) -> Any:
+        widgets: Dict[str, dict] = {}
+        if self.path is not None:
+            loaded = self._read_file()
+            if not isinstance(loaded, dict):
+                raise WidgetRegistryError(f"{self.path} must be an object keyed by widget id")
+            widgets.update(copy.deepcopy(loaded))
+
+        problems = []
+        for widget_id, config in self._registered.items():
+            if widget_id in widgets and widgets[widget_id] != config:
+                problems.append(f"{widget_id}: defined differently in {self.path.name} and in code")
+            widgets[widget_id] = copy.deepcopy(config)
+        for widget_id, config in widgets.items():
+            problems.extend(validate_widget(widget_id, config))
+        if problems:
+            raise WidgetRegistryError("Invalid widgets:\n  " + "\n  ".join(problems))
+
+        return list(widgets.values()) if self.as_list else widgets
+
+    @property
+    def widgets(self) -> Mapping[str, Mapping[str, Any]]:
+        """Frozen widget definitions by id"""
+        document = self.document
+        if self.as_list:
+            return MappingProxyType({_widget_id(w): w for w in document})
+        return document
+
+    def __len__(self) -> int:
+        return len(self.document)
@@ -0,0 +1,107 @@
+"""
+Fast JSON responses.
+
+`FastJSONResponse` encodes response content to bytes in one pass with
+orjson when it is installed: dicts and lists, NumPy arrays and scalars,
+pandas DataFrames/Series/Timestamps, datetimes, UUIDs, pydantic models and
+Plotly figures are handled directly, and NaN/infinity become null. Without
+orjson it falls back to the standard library encoder with the same
+conversions.
+
+Returning the response from an endpoint skips FastAPI's jsonable_encoder
+pass:
+
+    return FastJSONResponse(fig)          # instead of json.loads(fig.to_json())
+    return FastJSONResponse(dataframe)    # rows, like to_json(orient="records")
+"""
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert the types the encoder does not know natively"""
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return obj.to_dict(orient="records")
+        if isinstance(obj, (pd.Series, pd.Index)):
+            return obj.tolist()
+        if obj is pd.NaT:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if hasattr(obj, "to_plotly_json"):
+        return obj.to_plotly_json()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/infinity as None and unknown types converted (standard library path)"""
+    if isinstance(obj, float):
+        return None if math.isnan(obj) or math.isinf(obj) else obj
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): _finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_finite(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, bool)):
+        return obj
+    return _finite(_default(obj))
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        """Encode content as JSON bytes"""
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        """Encode content as JSON bytes"""
+        return json.dumps(
+            _finite(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with `dumps`"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,155 @@
+"""
+Indexed symbol search.
+
+`SymbolIndex` answers type-ahead queries (UDF /search) over a symbol
+universe without scanning it. Tickers are kept in a sorted list, so the
+tickers starting with the query are one bisect away; names are split into
+lowercase tokens kept in a second sorted list, so a query word finds the
+names with a token starting with it the same way. Results are ranked:
+
+    0  ticker equals the query
+    1  ticker starts with the query (alphabetical, so shorter tickers first)
+    2  every query word starts a token of the ticker or a name
+
+Exchange/type filters are served from sub-indexes built on first use per
+filter combination, so a filtered query does not walk past the symbols it
+excludes. The index is built once, on the first search after the last
+`add`; queries cost a few bisects plus the results they return.
+
+    INDEX = SymbolIndex()
+    INDEX.add({"symbol": "AAPL", ...}, "AAPL", "Apple Inc.", exchange="NASDAQ", type="stock")
+    INDEX.search("app", limit=30, exchange="NASDAQ")
+"""
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Sorts after every character a key can contain
+_END = "\U0010ffff"
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercase alphanumeric words of a text"""
+    return _TOKEN.findall(text.lower())
+
+
+class _View:
+    """Sorted tickers and name tokens of a subset of the symbols"""
+
+    __slots__ = ("keys", "key_ids", "words", "word_ids")
+
+    def __init__(self, ids: Iterable[int], keys: List[str], words: List[Tuple[str, ...]]):
+        self.key_ids = sorted(ids, key=keys.__getitem__)
+        self.keys = [keys[i] for i in self.key_ids]
+        # Sorting positions by word is stable, so symbols sharing a word stay in ticker order
+        flat_words = [w for i in self.key_ids for w in words[i]]
+        flat_ids = [i for i in self.key_ids for _ in words[i]]
+        order = sorted(range(len(flat_words)), key=flat_words.__getitem__)
+        self.words = [flat_words[j] for j in order]
+        self.word_ids = [flat_ids[j] for j in order]
+
+
+class SymbolIndex:
+    """Ranked prefix search over tickers and name tokens with exchange/type filters"""
+
+    def __init__(self):
+        self._records: List[Any] = []
+        self._keys: List[str] = []
+        self._words: List[Tuple[str, ...]] = []
+        self._exchanges: List[str] = []
+        self._types: List[str] = []
+        self._views: Dict[Tuple[str, str], _View] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: Any, symbol: str, *names: str, exchange: str = "", type: str = "") -> None:
+        """
+        Index a symbol.
+
+        Args:
+            record: What `search` returns for the symbol, e.g. its UDF search result
+            symbol: Ticker matched by prefix
+            names: Texts whose words are matched by prefix (name, description, aliases)
+            exchange: Value the exchange filter compares with
+            type: Value the type filter compares with
+        """
+        key = symbol.lower()
+        with self._lock:
+            self._records.append(record)
+            self._keys.append(key)
+            self._words.append(tuple(dict.fromkeys(tokens(symbol) + [w for n in names for w in tokens(n)])))
+            self._exchanges.append(exchange)
+            self._types.append(type)
+            self._views.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _view(self, exchange: str, type: str) -> _View:
+        view = self._views.get((exchange, type))
+        if view is None:
+            with self._lock:
+                ids = [
+                    i
+                    for i in range(len(self._records))
+                    if (not exchange or self._exchanges[i] == exchange)
+                    and (not type or self._types[i] == type)
+                ]
+                view = _View(ids, self._keys, self._words)
+                self._views[(exchange, type)] = view
+        return view
+
+    def search(self, query: str, limit: int = 30, exchange: str = "", type: str = "") -> List[Any]:
+        """
+        Records of the best `limit` matches, best first.
+
+        An exchange prefix in the query ("NASDAQ:AAP") is ignored, and an
+        empty query lists the symbols alphabetically. Empty filters match
+        everything.
+        """
+        view = self._view(exchange or "", type or "")
+        if limit <= 0:
+            return []
+        query = query.strip().lower()
+        if ":" in query:
+            query = query.split(":", 1)[1]
+        if not query:
+            return [self._records[i] for i in view.key_ids[:limit]]
+
+        found: List[int] = []
+        seen = set()
+
+        def take(i: int) -> bool:
+            """Add a match; True once there are enough"""
+            if i not in seen:
+                seen.add(i)
+                found.append(i)
+            return len(found) >= limit
+
+        lo = bisect_left(view.keys, query)
+        hi = bisect_left(view.keys, query + _END, lo)
+        # Exact tickers sort first within the prefix range
+        for j in range(lo, hi):
+            if take(view.key_ids[j]):
+                return self._result(found)
+
+        words = tokens(query)
+        if words:
+            # Walk the candidates of the most selective (longest) word, check the others
+            first = max(words, key=len)
+            others = [w for w in words if w != first]
+            lo = bisect_left(view.words, first)
+            hi = bisect_left(view.words, first + _END, lo)
+            for j in range(lo, hi):
+                i = view.word_ids[j]
+                if i in seen:
+                    continue
+                if others and not all(any(t.startswith(w) for t in self._words[i]) for w in others):
+                    continue
+                if take(i):
+                    break
+        return self._result(found)
+
+    def _result(self, found: List[int]) -> List[Any]:
+        return [self._records[i] for i in found]
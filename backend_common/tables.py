@@ -0,0 +1,120 @@
+"""
+Columnar table responses.
+
+Table endpoints build a `Table` (one list per column) and hand it to
+`table_response`. By default the client gets the usual list of row dicts;
+a client that opts in (`?format=columnar` or an Accept header naming
+COLUMNAR_MEDIA_TYPE) gets a schema plus one array per column instead,
+which does not repeat every key on every row:
+
+    {
+        "schema": [{"name": "Strike", "type": "number"}, ...],
+        "columns": [[500.0, 505.0, ...], ...],
+        "rowCount": 2
+    }
+"""
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from fastapi import Request
+
+from backend_common.responses import FastJSONResponse
+
+try:
+    import numpy as np
+except ImportError:  # backends without NumPy only pass lists
+    np = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.openbb.columnar+json"
+
+
+def column_values(values: Any) -> List[Any]:
+    """A column as a JSON-ready list (NumPy values unboxed, NaN/inf as None)"""
+    if np is not None and isinstance(values, np.ndarray):
+        if values.dtype.kind == "f":
+            out = values.astype(object)
+            out[~np.isfinite(values)] = None
+            return out.tolist()
+        if values.dtype.kind == "M":
+            return np.datetime_as_string(values).tolist()
+        return values.tolist()
+    return [
+        None if isinstance(v, float) and (math.isnan(v) or math.isinf(v)) else v
+        for v in values
+    ]
+
+
+def _json_type(values: List[Any]) -> str:
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            return "boolean"
+        if isinstance(v, int):
+            return "integer"
+        if isinstance(v, float):
+            return "number"
+        return "string"
+    return "null"
+
+
+class Table:
+    """
+    A table held as columns.
+
+    Args:
+        columns: Column name -> values (lists or NumPy arrays, equal length)
+        types: Optional JSON type per column; inferred from the values if missing
+    """
+
+    def __init__(self, columns: Mapping[str, Any], types: Optional[Mapping[str, str]] = None):
+        self.columns = {name: column_values(values) for name, values in columns.items()}
+        lengths = {len(v) for v in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self.types = dict(types or {})
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]]) -> "Table":
+        """Build a table from row dicts (columns in first-seen key order)"""
+        names: Dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        return cls({name: [row.get(name) for row in rows] for name in names})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def schema(self) -> List[Dict[str, str]]:
+        return [
+            {"name": name, "type": self.types.get(name) or _json_type(values)}
+            for name, values in self.columns.items()
+        ]
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+    def to_columnar(self) -> Dict[str, Any]:
+        return {
+            "schema": self.schema(),
+            "columns": list(self.columns.values()),
+            "rowCount": len(self),
+        }
+
+
+def wants_columnar(request: Optional[Request]) -> bool:
+    """Whether the client opted into the columnar format"""
+    if request is None:
+        return False
+    return (
+        request.query_params.get("format") == "columnar"
+        or COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+
+
+def table_response(table: Table, request: Optional[Request] = None) -> FastJSONResponse:
+    """Serialize a table as columns if the client asked for them, else as rows"""
+    if wants_columnar(request):
+        return FastJSONResponse(table.to_columnar(), media_type=COLUMNAR_MEDIA_TYPE)
+    return FastJSONResponse(table.to_rows())
@@ -47,7 +47,7 @@ def get_widgets():
     """
     # Read and return the widgets configuration file
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 
@@ -63,7 +63,7 @@ def get_apps():
     """
     # Read and return the apps configuration file
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "apps.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "apps.json").read_text())
     )
 
 
@@ -1,21 +1,38 @@
 # Import required libraries
 import json
 import base64
+import os
 import requests
+import time
+import numpy as np
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Body, Query
+from fastapi import FastAPI, HTTPException, Body, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from plotly_config import get_theme_colors, base_layout, get_toolbar_config
-import random
 from pydantic import BaseModel, Field
 from uuid import UUID
-from typing import Any, Literal, List, Union
+from typing import Any, Literal, List, Optional, Union
 from functools import wraps
 import asyncio
 
+# Shared response helpers, installed from the repository root (see requirements.txt)
+from backend_common.bar_stream import BarStream
+from backend_common.bars import BarStore, Bars, resolution_frame
+from backend_common.compression import CompressionMiddleware
+from backend_common.conditional import (
+    ConditionalGetMiddleware,
+    cached_response,
+)
+from backend_common.metrics import Metrics, MetricsMiddleware
+from backend_common.profiling import ProfilerMiddleware
+from backend_common.registry import FrozenJSON, WidgetRegistry
+from backend_common.responses import FastJSONResponse
+from backend_common.symbol_search import SymbolIndex
+from mock_bars import MAX_BARS, MockBarGenerator, forming
+
 
 # Pydantic models for multi-file viewer POST endpoints
 class FileOption(BaseModel):
@@ -80,6 +97,14 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Tag GET responses with a strong ETag so the Workspace can revalidate with
+# If-None-Match and get an empty 304 when the data has not changed
+app.add_middleware(ConditionalGetMiddleware)
+
+# Compress JSON/text responses (Plotly figures, base64 PDFs, tables) above 1 KB;
+# images and PDF files are already compressed and sent as is
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 ROOT_PATH = Path(__file__).parent.resolve()
 
 
@@ -89,17 +114,38 @@ def read_root():
     return {"Info": "Hello World"}
 
 
-# Initialize empty dictionary for widgets
-WIDGETS = {}
+# Widget registry: filled by the @register_widget decorator, then validated,
+# frozen and pre-encoded once at startup
+WIDGETS = WidgetRegistry()
+
+# apps.json is encoded once and reloaded when the file changes
+APPS = FrozenJSON(ROOT_PATH / "apps.json")
+
+# Requests sent with X-Profile-Token: $PROFILE_TOKEN return a profile of
+# themselves (call tree, folded stacks or cProfile stats) instead of their data.
+# Profiling is off when PROFILE_TOKEN is unset
+app.add_middleware(ProfilerMiddleware, token=os.getenv("PROFILE_TOKEN"))
+
+# Request count, latency, size and error metrics per route and widgetId,
+# plus upstream API timings, scraped from /metrics in the Prometheus format.
+# Added last so it wraps the other middleware and sees what the client sees
+METRICS = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=METRICS, widgets=WIDGETS)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return METRICS.response()
 
 
 def register_widget(widget_config):
     """
-    Decorator that registers a widget configuration in the WIDGETS dictionary.
+    Decorator that registers a widget configuration in the WIDGETS registry.
 
     Args:
         widget_config (dict): The widget configuration to add to the WIDGETS
-            dictionary. This should follow the same structure as other entries
+            registry. This should follow the same structure as other entries
             in WIDGETS.
 
     Returns:
@@ -117,16 +163,10 @@ def register_widget(widget_config):
             # Call the original function
             return func(*args, **kwargs)
 
-        # Extract the endpoint from the widget_config
-        endpoint = widget_config.get("endpoint")
-        if endpoint:
-            # Add an id field to the widget_config if not already present
-            if "widgetId" not in widget_config:
-                widget_config["widgetId"] = endpoint
-
-            # Use id as the key to allow multiple widgets per endpoint
-            widget_id = widget_config["widgetId"]
-            WIDGETS[widget_id] = widget_config
+        # Widgets are keyed by widgetId (defaulting to the endpoint)
+        # to allow multiple widgets per endpoint
+        if widget_config.get("endpoint"):
+            WIDGETS.register(widget_config)
 
         # Return the appropriate wrapper based on whether the function is async
         if asyncio.iscoroutinefunction(func):
@@ -137,35 +177,38 @@ def register_widget(widget_config):
 
 
 # Endpoint that returns the registered widgets configuration
-# The WIDGETS dictionary is maintained by the registry.py helper
-# which automatically registers widgets when using the @register_widget decorator
+# The WIDGETS registry is filled by the @register_widget decorator and
+# frozen at startup, so this only picks the pre-encoded bytes
 @app.get("/widgets.json")
-def get_widgets():
+def get_widgets(request: Request):
     """Returns the configuration of all registered widgets
 
     The widgets are automatically registered through the @register_widget decorator
-    and stored in the WIDGETS dictionary from registry.py
+    and stored in the WIDGETS registry
 
     Returns:
-        dict: The configuration of all registered widgets
+        Response: The configuration of all registered widgets
     """
-    return WIDGETS
+    return WIDGETS.response(request)
+
+
+@app.on_event("startup")
+def freeze_widgets():
+    """Validate the registered widgets and encode widgets.json once"""
+    WIDGETS.freeze()
 
 
 # Apps configuration file for the OpenBB Workspace
 # it contains the information and configuration about all the
 # apps that will be displayed in the OpenBB Workspace
 @app.get("/apps.json")
-def get_apps():
+def get_apps(request: Request):
     """Apps configuration file for the OpenBB Workspace
 
     Returns:
-        JSONResponse: The contents of apps.json file
+        Response: The contents of apps.json file
     """
-    # Read and return the apps configuration file
-    return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "apps.json").open())
-    )
+    return APPS.response(request)
 
 
 # Simple markdown widget
@@ -456,8 +499,9 @@ def markdown_widget_with_image_from_url():
     image_url = "https://api.star-history.com/svg?repos=openbb-finance/OpenBB&type=Date&theme=dark"
 
     try:
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()  # Raise an exception for bad status codes
+        with METRICS.upstream("star-history.com"):
+            response = requests.get(image_url, timeout=10)
+            response.raise_for_status()  # Raise an exception for bad status codes
 
         # Verify the response is actually an image
         content_type = response.headers.get("content-type", "")
@@ -795,6 +839,7 @@ def metric_widget():
     }
 )
 @app.get("/table_widget")
+@cached_response
 def table_widget():
     """Returns a mock table data for demonstration"""
     mock_data = [
@@ -1210,7 +1255,8 @@ def table_to_time_series_widget():
 @app.get("/table_widget_from_api_endpoint")
 def table_widget_from_api_endpoint():
     """Get current TVL of all chains using Defi LLama"""
-    response = requests.get("https://api.llama.fi/v2/chains")
+    with METRICS.upstream("api.llama.fi"):
+        response = requests.get("https://api.llama.fi/v2/chains")
 
     if response.status_code == 200:
         return response.json()
@@ -1871,6 +1917,7 @@ def get_company_options():
     }
 )
 @app.get("/company_performance")
+@cached_response
 def get_company_performance(company: str, year: str = "2024"):
     """Returns car manufacturer performance metrics"""
     performance_data = {
@@ -2369,7 +2416,7 @@ def get_plotly_chart():
     # Update the bar trace to use secondary y-axis
     fig.data[1].update(yaxis="y2")
 
-    return json.loads(fig.to_json())
+    return FastJSONResponse(fig)
 
 
 # Plotly chart with raw data
@@ -2431,7 +2478,7 @@ def get_plotly_chart_with_raw_data(raw: bool = False):
     # Update the bar trace to use secondary y-axis
     fig.data[1].update(yaxis="y2")
 
-    return json.loads(fig.to_json())
+    return FastJSONResponse(fig)
 
 
 # Plotly chart with theme
@@ -2540,7 +2587,7 @@ def get_plotly_chart_with_theme(theme: str = "dark"):
     # Update the bar trace to use secondary y-axis
     fig.data[1].update(yaxis="y2")
 
-    return json.loads(fig.to_json())
+    return FastJSONResponse(fig)
 
 
 # Plotly chart with theme and toolbar
@@ -2688,10 +2735,10 @@ def get_plotly_chart_with_theme_and_toolbar(theme: str = "dark"):
     }
 
     # Convert figure to JSON and add config
-    figure_json = json.loads(fig.to_json())
+    figure_json = fig.to_plotly_json()
     figure_json["config"] = toolbar_config
 
-    return figure_json
+    return FastJSONResponse(figure_json)
 
 
 # Plotly chart with theme and config file
@@ -2770,10 +2817,10 @@ def get_plotly_chart_with_theme_and_toolbar_using_config_file(theme: str = "dark
     # Update the bar trace to use secondary y-axis
     fig.data[1].update(yaxis="y2")
 
-    figure_json = json.loads(fig.to_json())
+    figure_json = fig.to_plotly_json()
     figure_json["config"] = get_toolbar_config()
 
-    return figure_json
+    return FastJSONResponse(figure_json)
 
 
 # Plotly heatmap
@@ -2864,13 +2911,13 @@ def get_plotly_heatmap(color_scale: str = "RdBu_r", theme: str = "dark"):
     )
 
     # Convert figure to JSON and apply config
-    figure_json = json.loads(fig.to_json())
+    figure_json = fig.to_plotly_json()
     figure_json["config"] = {
         **get_toolbar_config(),
         "scrollZoom": False,  # Disable scroll zoom
     }
 
-    return figure_json
+    return FastJSONResponse(figure_json)
 
 
 # Plotly heatmap with raw data
@@ -2978,13 +3025,13 @@ def get_plotly_heatmap(
     )
 
     # Convert figure to JSON and apply config
-    figure_json = json.loads(fig.to_json())
+    figure_json = fig.to_plotly_json()
     figure_json["config"] = {
         **get_toolbar_config(),
         "scrollZoom": False,  # Disable scroll zoom
     }
 
-    return figure_json
+    return FastJSONResponse(figure_json)
 
 
 # Global variable to store form submissions
@@ -3186,109 +3233,95 @@ MOCK_SYMBOLS = {
 }
 
 
+# One deterministic bar generator per (symbol, base resolution), created on first use
+_BAR_GENERATORS = {}
+
+# Resolutions the chart can ask for
+SUPPORTED_RESOLUTIONS = ["1", "5", "15", "30", "60", "D", "3D", "W", "M"]
+
+# Only 1-minute, 5-minute and daily bars are generated; the other resolutions are
+# resampled from 5-minute or daily bars and cached, so zooming the chart out
+# slices bars already in memory. Hourly bars come from 5-minute ones so that long
+# hourly charts stay within MAX_BARS
+BARS = BarStore(
+    bases={"15": "5", "30": "5", "60": "5", "3D": "D", "W": "D", "M": "D"},
+    max_bars=MAX_BARS,
+)
+
+
+def _load_mock_bars(symbol: str, resolution: str, start: int, end: int) -> Bars:
+    """Generate the bars of one base resolution opening in [start, end)"""
+    generator = _BAR_GENERATORS.get((symbol, resolution))
+    if generator is None:
+        # Different symbols have different base prices to make them visually distinct
+        base_price = 100.0 if symbol == "AAPL" else 200.0 if symbol == "MSFT" else 150.0
+        generator = MockBarGenerator(symbol, resolution, base_price=base_price)
+        _BAR_GENERATORS[(symbol, resolution)] = generator
+    return generator.bars(start, end - 1)
+
+
 def generate_mock_price_data(
-    symbol: str, from_time: int, to_time: int, resolution: str
+    symbol: str,
+    from_time: int,
+    to_time: int,
+    resolution: str,
+    countback: Optional[int] = None,
 ) -> dict:
     """Generate mock OHLCV (Open, High, Low, Close, Volume) data for a symbol
 
-    This function creates realistic-looking price data for the TradingView chart.
-    It generates timestamps and corresponding price data based on the requested time range
-    and resolution (timeframe).
+    Prices are a geometric Brownian motion generated with NumPy (see mock_bars.py),
+    seeded per (symbol, resolution), so a bar has the same values in every request
+    that covers it. Millions of bars per second can be generated, which makes this
+    endpoint usable as a load-test data source. 15-, 30- and 60-minute bars are
+    resampled from 5-minute bars and 3-day, weekly and monthly bars from daily bars
+    (see backend_common/bars.py), so prices agree within each of those families;
+    1-minute, 5-minute and daily bars are independent series.
 
     Args:
         symbol: The stock symbol to generate data for
         from_time: Start timestamp in seconds
         to_time: End timestamp in seconds
-        resolution: Timeframe (1, 5, 15, 30, 60 minutes, D for daily, W for weekly, M for monthly)
+        resolution: Timeframe (1, 5, 15, 30, 60 minutes, D for daily, 3D, W for weekly, M for monthly)
+        countback: If set, return this many bars ending at to_time instead of
+            starting at from_time
 
     Returns:
-        Dictionary containing OHLCV data in TradingView's expected format
+        Dictionary containing OHLCV arrays in TradingView's expected format
     """
-    # Convert resolution to minutes for timestamp generation
-    # TradingView uses specific resolution codes that we map to minutes
-    resolution_minutes = {
-        "1": 1,
-        "5": 5,
-        "15": 15,
-        "30": 30,
-        "60": 60,
-        "D": 1440,
-        "W": 10080,
-        "M": 43200,
-    }.get(resolution, 60)
-
-    # Generate timestamps for each candle based on the resolution
-    current_time = from_time
-    timestamps = []
-    while current_time <= to_time:
-        timestamps.append(current_time)
-        current_time += resolution_minutes * 60
-
-    # Generate base price data with random movements
-    # Different symbols have different base prices to make them visually distinct
-    base_price = 100.0 if symbol == "AAPL" else 200.0 if symbol == "MSFT" else 150.0
-    prices = []
-    current_price = base_price
-
-    for _ in timestamps:
-        # Add random price movement to create realistic-looking price action
-        change = random.uniform(-2, 2)
-        current_price += change
-        current_price = max(current_price, 1.0)  # Ensure price doesn't go below 1
-        prices.append(current_price)
-
-    # Generate OHLCV data with proper bullish/bearish candles
-    # This creates realistic-looking candlesticks with proper open, high, low, close values
-    opens = []
-    highs = []
-    lows = []
-    closes = []
-    volumes = []
-
-    for price in prices:
-        # Randomly decide if this is a bullish or bearish candle
-        is_bullish = random.random() > 0.5
-
-        if is_bullish:
-            # Bullish candle: open < close (green candle)
-            open_price = price * 0.99
-            close_price = price * 1.01
-        else:
-            # Bearish candle: open > close (red candle)
-            open_price = price * 1.01
-            close_price = price * 0.99
-
-        # Add some randomness to high and low prices
-        high_price = max(open_price, close_price) * 1.02
-        low_price = min(open_price, close_price) * 0.98
-
-        opens.append(open_price)
-        highs.append(high_price)
-        lows.append(low_price)
-        closes.append(close_price)
-
-        # Generate volume that correlates with price movement
-        # Higher volume on larger price movements
-        price_change = abs(close_price - open_price)
-        base_volume = 1000000  # Base volume of 1M shares
-        volume_multiplier = (
-            1 + (price_change / open_price) * 10
-        )  # Scale volume with price change
-        volume = int(
-            base_volume * volume_multiplier * random.uniform(0.8, 1.2)
-        )  # Add some randomness
-        volumes.append(volume)
-
-    # Return data in TradingView's expected format
-    return {
-        "s": "ok",  # Status: ok
-        "t": timestamps,  # Time array
-        "o": opens,  # Open prices array
-        "h": highs,  # High prices array
-        "l": lows,  # Low prices array
-        "c": closes,  # Close prices array
-        "v": volumes,  # Volume array
-    }
+    return _mock_bars(symbol, from_time, to_time, resolution, countback).to_udf(decimals=2)
+
+
+def _mock_bars(
+    symbol: str,
+    from_time: int,
+    to_time: int,
+    resolution: str,
+    countback: Optional[int] = None,
+) -> Bars:
+    """Bars up to now; the bar of the current period is still forming"""
+    if resolution not in SUPPORTED_RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution {resolution!r}")
+    now = int(time.time())
+    bars = BARS.get(symbol, resolution, from_time, min(to_time, now), countback, load=_load_mock_bars)
+    if not len(bars):
+        return bars
+    frame = resolution_frame(resolution)
+    close_time = int(frame.start(frame.index(bars.t[-1]) + 1))
+    return forming(bars, now, close_time)
+
+
+def latest_mock_bars(symbol: str, resolution: str) -> Bars:
+    """The previous and the forming bar of a symbol, polled by the bar stream"""
+    clean_symbol = symbol.split(":")[-1]
+    if clean_symbol not in MOCK_SYMBOLS:
+        raise ValueError("Symbol not found")
+    now = int(time.time())
+    bars = _mock_bars(clean_symbol, now, now, resolution, countback=2)
+    return Bars(bars.t, *(np.round(a, 2) for a in (bars.o, bars.h, bars.l, bars.c)), bars.v)
+
+
+# Pushes the forming bar and new bars of every subscribed (symbol, resolution)
+BAR_STREAM = BarStream(poll=latest_mock_bars, interval=1.0)
 
 
 @app.get("/udf/config")
@@ -3302,17 +3335,8 @@ async def get_config():
         Dictionary containing configuration options for the TradingView chart
     """
     return {
-        "supported_resolutions": [
-            "1",
-            "5",
-            "15",
-            "30",
-            "60",
-            "D",
-            "W",
-            "M",
-        ],  # Timeframes we support
-        "supports_group_request": False,  # We don't support requesting multiple symbols at once
+        "supported_resolutions": SUPPORTED_RESOLUTIONS,  # Timeframes we support
+        "supports_group_request": False,  # Symbols are found with /udf/search, not loaded by group
         "supports_marks": False,  # We don't support custom marks on the chart
         "supports_search": True,  # We support symbol search
         "supports_timescale_marks": False,  # We don't support marks on the timescale
@@ -3328,39 +3352,50 @@ async def get_config():
     }
 
 
+# Search index over MOCK_SYMBOLS, matching tickers and the words of their names
+SYMBOL_INDEX = SymbolIndex()
+for _symbol, _info in MOCK_SYMBOLS.items():
+    SYMBOL_INDEX.add(
+        {
+            "symbol": _symbol,
+            "full_name": f"{_info['exchange']}:{_symbol}",
+            "description": _info["description"],
+            "exchange": _info["exchange"],
+            "ticker": _symbol,
+            "type": _info["type"],
+        },
+        _symbol,
+        _info["name"],
+        _info["description"],
+        exchange=_info["exchange"],
+        type=_info["type"],
+    )
+
+
 @app.get("/udf/search")
 async def search_symbols(
     query: str = Query("", description="Search query"),
     limit: int = Query(30, description="Limit of results"),
+    exchange: str = Query("", description="Exchange filter; empty for all"),
+    symbol_type: str = Query("", alias="type", description="Symbol type filter; empty for all"),
 ):
     """UDF symbol search endpoint
 
     This endpoint allows TradingView to search for symbols in our data feed.
-    It's used when the user types in the symbol search box.
+    It's used when the user types in the symbol search box, so it looks the query
+    up in SYMBOL_INDEX instead of scanning the symbols: exact tickers rank first,
+    then tickers starting with the query, then names with words starting with it.
 
     Args:
         query: Search term entered by user
         limit: Maximum number of results to return
+        exchange: Only return symbols of this exchange
+        symbol_type: Only return symbols of this type
 
     Returns:
         List of matching symbols with their details
     """
-    results = []
-    for symbol, info in MOCK_SYMBOLS.items():
-        if query.lower() in symbol.lower() or query.lower() in info["name"].lower():
-            results.append(
-                {
-                    "symbol": symbol,
-                    "full_name": f"NASDAQ:{symbol}",
-                    "description": info["description"],
-                    "exchange": "NASDAQ",
-                    "ticker": symbol,
-                    "type": "stock",
-                }
-            )
-            if len(results) >= limit:
-                break
-    return results
+    return SYMBOL_INDEX.search(query, limit, exchange=exchange, type=symbol_type)
 
 
 @app.get("/udf/symbols")
@@ -3401,29 +3436,35 @@ async def get_symbol_info(
         "has_intraday": True,  # We support intraday data
         "has_daily": True,  # We support daily data
         "has_weekly_and_monthly": True,  # We support weekly and monthly data
-        "supported_resolutions": ["1", "5", "15", "30", "60", "D", "W", "M"],
+        "supported_resolutions": SUPPORTED_RESOLUTIONS,
         "session-regular": "0930-1600",  # Regular trading hours
         "timezone": "America/New_York",  # Timezone for the exchange
     }
 
 
 @app.get("/udf/history")
-async def get_history(
+def get_history(
     symbol: str = Query(..., description="Symbol"),
     resolution: str = Query(..., description="Resolution"),
     from_time: int = Query(..., alias="from", description="From timestamp"),
     to_time: int = Query(..., alias="to", description="To timestamp"),
+    countback: Optional[int] = Query(
+        None, description="Number of bars ending at `to`; takes precedence over `from`"
+    ),
 ):
     """UDF historical data endpoint
 
     This endpoint provides TradingView with the actual price data for the chart.
-    It's called when the chart needs to load or update its data.
+    It's called when the chart needs to load or update its data. It is a plain
+    function so FastAPI runs the bar generation, up to MAX_BARS bars, in its
+    threadpool instead of on the event loop.
 
     Args:
         symbol: The symbol to get data for
         resolution: The timeframe (1, 5, 15, 30, 60, D, W, M)
         from_time: Start timestamp in seconds
         to_time: End timestamp in seconds
+        countback: Number of bars to return ending at to_time
 
     Returns:
         Dictionary containing OHLCV data for the requested period
@@ -3433,7 +3474,98 @@ async def get_history(
     if clean_symbol not in MOCK_SYMBOLS:
         return {"s": "error", "errmsg": "Symbol not found"}
 
-    return generate_mock_price_data(clean_symbol, from_time, to_time, resolution)
+    try:
+        history = generate_mock_price_data(
+            clean_symbol, from_time, to_time, resolution, countback
+        )
+    except ValueError as e:
+        return {"s": "error", "errmsg": str(e)}
+    # The OHLCV values are NumPy arrays, serialized without conversion to lists
+    return FastJSONResponse(history)
+
+
+# Most symbols one quotes request may ask for
+MAX_QUOTE_SYMBOLS = 100
+
+
+def _quote_symbols(symbols: str) -> List[str]:
+    """Comma-separated symbols, in request order and without duplicates"""
+    names = [name.strip() for name in symbols.split(",") if name.strip()]
+    names = list(dict.fromkeys(names))
+    if len(names) > MAX_QUOTE_SYMBOLS:
+        raise ValueError(f"{len(names)} symbols requested; at most {MAX_QUOTE_SYMBOLS} per request")
+    return names
+
+
+@app.get("/udf/quotes")
+async def get_quotes(
+    symbols: str = Query(..., description="Comma-separated symbols"),
+):
+    """UDF quotes endpoint
+
+    Latest price, change and day range of many symbols in one call, computed from
+    the daily bars in the bar store.
+
+    Args:
+        symbols: Comma-separated symbols, with or without exchange prefix
+
+    Returns:
+        Dictionary with one quote entry per symbol in TradingView's expected format
+    """
+    try:
+        names = _quote_symbols(symbols)
+    except ValueError as e:
+        return {"s": "error", "errmsg": str(e)}
+
+    now = int(datetime.now().timestamp())
+    quotes = []
+    for name in names:
+        clean_symbol = name.split(":")[-1]
+        info = MOCK_SYMBOLS.get(clean_symbol)
+        if info is None:
+            quotes.append({"s": "error", "n": name, "v": {}})
+            continue
+
+        # Today's bar and the one before it
+        bars = _mock_bars(clean_symbol, now, now, "D", countback=2)
+        last = float(bars.c[-1])
+        prev_close = float(bars.c[-2]) if len(bars) > 1 else float(bars.o[-1])
+        change = last - prev_close
+        quotes.append(
+            {
+                "s": "ok",
+                "n": name,
+                "v": {
+                    "ch": round(change, 2),
+                    "chp": round(100 * change / prev_close, 2),
+                    "short_name": clean_symbol,
+                    "exchange": info["exchange"],
+                    "description": info["description"],
+                    "lp": round(last, 2),
+                    "ask": round(last + 0.01, 2),
+                    "bid": round(last - 0.01, 2),
+                    "open_price": round(float(bars.o[-1]), 2),
+                    "high_price": round(float(bars.h[-1]), 2),
+                    "low_price": round(float(bars.l[-1]), 2),
+                    "prev_close_price": round(prev_close, 2),
+                    "volume": int(bars.v[-1]),
+                },
+            }
+        )
+    return {"s": "ok", "d": quotes}
+
+
+@app.websocket("/udf/stream")
+async def udf_stream(websocket: WebSocket):
+    """UDF live bar stream
+
+    Live charts load /udf/history once, then subscribe here instead of polling it:
+    the forming bar is pushed every second while it changes, and new bars as they
+    open. Send {"action": "subscribe", "symbol": "AAPL", "resolution": "1"} and,
+    when reconnecting, the last "seq" received as "since" to get only the missed
+    updates. See backend_common/bar_stream.py for the message format.
+    """
+    await BAR_STREAM.serve(websocket)
 
 
 @app.get("/udf/time")
@@ -3638,13 +3770,15 @@ async def get_omni_widget_post(data: str | dict = Body(...)):
         )
 
         # Convert to JSON and add toolbar config
-        content = json.loads(fig.to_json())
+        content = fig.to_plotly_json()
         content["config"] = get_toolbar_config()
 
-        return OmniWidgetResponse(
-            content=content,
-            data_format=DataFormat(data_type="object", parse_as="chart"),
-            citable=False,
+        return FastJSONResponse(
+            OmniWidgetResponse(
+                content=content,
+                data_format=DataFormat(data_type="object", parse_as="chart"),
+                citable=False,
+            )
         )
 
     # Default to markdown without citations
@@ -3836,14 +3970,16 @@ async def get_omni_widget_with_citations(data: str | dict = Body(...)):
         )
 
         # Convert to JSON and add toolbar config
-        content = json.loads(fig.to_json())
+        content = fig.to_plotly_json()
         content["config"] = get_toolbar_config()
 
-        return OmniWidgetResponse(
-            content=content,
-            data_format=DataFormat(data_type="object", parse_as="chart"),
-            extra_citations=[extra_citation],
-            citable=True,
+        return FastJSONResponse(
+            OmniWidgetResponse(
+                content=content,
+                data_format=DataFormat(data_type="object", parse_as="chart"),
+                extra_citations=[extra_citation],
+                citable=True,
+            )
         )
 
     # Default to markdown with citations
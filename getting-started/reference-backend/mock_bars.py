@@ -0,0 +1,171 @@
+"""
+Vectorized mock OHLCV bars for the UDF (TradingView) endpoints.
+
+Prices follow a geometric Brownian motion laid on a fixed time grid: bar k
+of a resolution covers [k * step, (k + 1) * step) in Unix seconds. The grid
+is cut into blocks of BLOCK_BARS bars. Every block draws its shocks from its
+own generator seeded by (symbol, resolution, block), and the block's total
+log-return comes from a coarse, equally seeded walk anchored at ANCHOR_TIME.
+A bar therefore has the same values whatever window it is requested in, and
+generating a window only touches the blocks it overlaps - no Python loop
+over bars.
+"""
+import hashlib
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend_common.bars import Bars
+
+# Seconds per bar for the resolutions TradingView asks for
+RESOLUTION_SECONDS = {
+    "1": 60,
+    "5": 300,
+    "15": 900,
+    "30": 1800,
+    "60": 3600,
+    "D": 86400,
+    "W": 604800,
+    "M": 2592000,
+}
+DEFAULT_RESOLUTION_SECONDS = 3600
+
+# The bar opening at this time (2024-01-01 UTC) opens at the symbol's base price
+ANCHOR_TIME = 1704067200
+BLOCK_BARS = 8192
+# Blocks whose returns one coarse-walk generator draws
+_CHUNK_BLOCKS = 4096
+
+ANNUAL_VOLATILITY = 0.30
+BASE_VOLUME = 1_000_000
+_SECONDS_PER_YEAR = 365 * 86400
+
+# Bars per request, so a typo in a timestamp cannot ask for gigabytes
+MAX_BARS = 5_000_000
+
+
+def resolution_seconds(resolution: str) -> int:
+    return RESOLUTION_SECONDS.get(resolution, DEFAULT_RESOLUTION_SECONDS)
+
+
+def _seed(symbol: str, resolution: str) -> int:
+    """Seed stable across processes (unlike hash())"""
+    digest = hashlib.blake2b(f"{symbol}|{resolution}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class MockBarGenerator:
+    """
+    Deterministic GBM bars for one (symbol, resolution).
+
+    Args:
+        symbol: Ticker, part of the seed
+        resolution: UDF resolution code, part of the seed
+        base_price: Open of the bar at ANCHOR_TIME
+        volatility: Annualized volatility of log returns
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        resolution: str,
+        base_price: float = 150.0,
+        volatility: float = ANNUAL_VOLATILITY,
+    ):
+        self.symbol = symbol
+        self.resolution = resolution
+        self.step = resolution_seconds(resolution)
+        self.base_price = base_price
+        self.sigma = volatility * np.sqrt(self.step / _SECONDS_PER_YEAR)
+        self.seed = _seed(symbol, resolution)
+        self.anchor = ANCHOR_TIME // self.step
+        self._chunk_sums: Dict[int, np.ndarray] = {}
+
+    def _chunk_prefix(self, chunk: int) -> np.ndarray:
+        """Prefix sums of the coarse walk's block returns within one chunk"""
+        prefix = self._chunk_sums.get(chunk)
+        if prefix is None:
+            rng = np.random.default_rng([self.seed, 0, chunk & 0xFFFFFFFF, int(chunk < 0)])
+            returns = rng.standard_normal(_CHUNK_BLOCKS) * self.sigma * np.sqrt(BLOCK_BARS)
+            prefix = np.concatenate(([0.0], np.cumsum(returns)))
+            self._chunk_sums[chunk] = prefix
+        return prefix
+
+    def _block_start(self, block: int) -> float:
+        """Log price relative to the base price at the start of a block (0 for block 0)"""
+        chunk, index = divmod(block, _CHUNK_BLOCKS)
+        level = float(self._chunk_prefix(chunk)[index])
+        # Whole chunks between chunk 0 and this one
+        for c in range(0, chunk):
+            level += float(self._chunk_prefix(c)[-1])
+        for c in range(chunk, 0):
+            level -= float(self._chunk_prefix(c)[-1])
+        return level
+
+    def _block(self, block: int) -> np.ndarray:
+        """(5, BLOCK_BARS) rows: log close, log open, high wick, low wick, volume noise"""
+        rng = np.random.default_rng([self.seed, 1, block & 0xFFFFFFFF, int(block < 0)])
+        z = rng.standard_normal((4, BLOCK_BARS))
+        start = self._block_start(block)
+        end = self._block_start(block + 1)
+        # Bridge the shocks so the block ends exactly where the next one starts
+        shocks = (z[0] - z[0].mean()) * self.sigma + (end - start) / BLOCK_BARS
+        log_close = start + np.cumsum(shocks)
+        log_open = np.empty(BLOCK_BARS)
+        log_open[0] = start
+        log_open[1:] = log_close[:-1]
+        return np.stack((log_close, log_open, np.abs(z[1]), np.abs(z[2]), z[3]))
+
+    def bars(self, from_time: int, to_time: int, countback: Optional[int] = None) -> Bars:
+        """
+        Bars opening in [from_time, to_time], or the last `countback` bars
+        opening at or before to_time when countback is given.
+        """
+        last = to_time // self.step
+        first = last - countback + 1 if countback else -(-from_time // self.step)
+        if last < first:
+            return Bars.empty()
+        if last - first + 1 > MAX_BARS:
+            raise ValueError(f"{last - first + 1} bars requested; at most {MAX_BARS} per request")
+
+        rel_first, rel_last = first - self.anchor, last - self.anchor
+        first_block, last_block = rel_first // BLOCK_BARS, rel_last // BLOCK_BARS
+        rows = np.concatenate([self._block(b) for b in range(first_block, last_block + 1)], axis=1)
+        offset = rel_first - first_block * BLOCK_BARS
+        rows = rows[:, offset : offset + (last - first + 1)]
+
+        log_close, log_open, up, down, noise = rows
+        close = self.base_price * np.exp(log_close)
+        open_ = self.base_price * np.exp(log_open)
+        body_top = np.maximum(open_, close)
+        body_bottom = np.minimum(open_, close)
+        high = body_top * np.exp(up * self.sigma * 0.5)
+        low = body_bottom * np.exp(-down * self.sigma * 0.5)
+        # More volume on bigger moves, as on a real tape
+        move = np.abs(log_close - log_open) / self.sigma
+        volume = (BASE_VOLUME * (1 + 0.5 * move) * np.exp(0.2 * noise)).astype(np.int64)
+        t = np.arange(first, last + 1, dtype=np.int64) * self.step
+        return Bars(t, open_, high, low, close, volume)
+
+
+def forming(bars: Bars, now: int, close_time: int) -> Bars:
+    """
+    `bars` with the last bar as it stands at `now`, before it closes at
+    `close_time`: close, wicks and volume move from the open toward their
+    final values, which they reach when the bar closes.
+    """
+    if not len(bars) or not bars.t[-1] <= now < close_time:
+        return bars
+    done = (now - bars.t[-1]) / (close_time - bars.t[-1])
+    o, h, l, c, v = (float(a[-1]) for a in (bars.o, bars.h, bars.l, bars.c, bars.v))  # noqa: E741
+    close = o + (c - o) * done
+    high = max(o, close) + (h - max(o, c)) * done
+    low = min(o, close) - (min(o, c) - l) * done
+    return Bars(
+        bars.t,
+        bars.o,
+        np.append(bars.h[:-1], high),
+        np.append(bars.l[:-1], low),
+        np.append(bars.c[:-1], close),
+        np.append(bars.v[:-1], int(v * done)),
+    )
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON response paths used by the backends.
+
+Usage:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --rows 100000 --repeat 10
+
+Compares, for the largest payload shapes served in this repository:
+1. Plotly figures: json.loads(fig.to_json()) returned through FastAPI vs
+   FastJSONResponse(fig)
+2. Table rows (list of dicts): FastAPI's jsonable_encoder + JSONResponse vs
+   FastJSONResponse, and the columnar table format
+3. pandas DataFrames: json.loads(df.to_json(orient="records")) returned
+   through FastAPI vs FastJSONResponse(df)
+
+Each case reports the median time to produce the response body and its size.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+try:
+    import numpy as np
+    import pandas as pd
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+except ImportError as e:
+    print(f"Error: {e.name} is required. Install with: pip install fastapi numpy pandas")
+    sys.exit(1)
+
+try:
+    from backend_common import responses
+    from backend_common.responses import FastJSONResponse
+    from backend_common.tables import Table
+except ImportError:
+    print("Error: backend_common is required. Install it with: pip install -e .")
+    sys.exit(1)
+
+try:
+    import plotly.graph_objects as go
+except ImportError:
+    go = None
+
+
+def fastapi_default(content) -> bytes:
+    """What FastAPI does with a plain return value"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def measure(func: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    func()  # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(body)
+
+
+def make_figure(points: int):
+    dates = pd.date_range("2000-01-01", periods=points, freq="min")
+    rng = np.random.default_rng(0)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=np.cumsum(rng.normal(size=points)), mode="lines", name="Price"))
+    fig.add_trace(go.Bar(x=dates, y=rng.integers(0, 10_000, points), name="Volume", opacity=0.5))
+    fig.update_layout(title="Benchmark", xaxis_title="Date", yaxis_title="Price")
+    return fig
+
+
+def make_rows(rows: int) -> List[dict]:
+    rng = np.random.default_rng(0)
+    strikes = rng.uniform(100, 700, rows).round(1).tolist()
+    volume = rng.integers(0, 10_000, rows).tolist()
+    iv = rng.uniform(0.1, 0.6, rows).tolist()
+    return [
+        {
+            "Strike": strikes[i],
+            "Expiration": "2026-01-16",
+            "Type": "call" if i % 2 else "put",
+            "Bid": round(strikes[i] * 0.01, 2),
+            "Ask": round(strikes[i] * 0.011, 2),
+            "Volume": volume[i],
+            "IV": f"{iv[i] * 100:.1f}%",
+        }
+        for i in range(rows)
+    ]
+
+
+def make_frame(rows: int) -> "pd.DataFrame":
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "year": rng.integers(1995, 2025, rows),
+            "town": rng.choice(["LONDON", "LEEDS", "YORK"], rows),
+            "price": rng.uniform(1e5, 1e6, rows).round(),
+            "ratio": rng.normal(size=rows),
+        }
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows/points per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    args = parser.parse_args()
+
+    encoder = "orjson" if responses.orjson is not None else "json (install orjson for the fast path)"
+    print(f"FastJSONResponse encoder: {encoder}")
+    print(f"{args.rows:,} rows/points, median of {args.repeat} runs\n")
+
+    cases = []
+    if go is not None:
+        fig = make_figure(args.rows)
+        cases.append(("Plotly figure", [
+            ("json.loads(fig.to_json())", lambda: fastapi_default(json.loads(fig.to_json()))),
+            ("FastJSONResponse(fig)", lambda: FastJSONResponse(fig).body),
+        ]))
+    else:
+        print("plotly not installed, skipping the figure case\n")
+
+    rows = make_rows(args.rows)
+    cases.append(("Table rows", [
+        ("jsonable_encoder + JSONResponse", lambda: fastapi_default(rows)),
+        ("FastJSONResponse(rows)", lambda: FastJSONResponse(rows).body),
+        ("FastJSONResponse(columnar)", lambda: FastJSONResponse(Table.from_rows(rows).to_columnar()).body),
+    ]))
+
+    frame = make_frame(args.rows)
+    cases.append(("DataFrame", [
+        ("json.loads(df.to_json(orient=records))", lambda: fastapi_default(json.loads(frame.to_json(orient="records")))),
+        ("FastJSONResponse(df)", lambda: FastJSONResponse(frame).body),
+    ]))
+
+    for title, variants in cases:
+        print(title)
+        baseline = None
+        for name, func in variants:
+            seconds, size = measure(func, args.repeat)
+            baseline = baseline or seconds
+            print(f"  {name:<42} {seconds * 1000:9.1f} ms {size / 1e6:8.2f} MB {baseline / seconds:6.1f}x")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
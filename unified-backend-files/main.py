@@ -11,6 +11,9 @@ from functools import wraps
 import json
 import asyncio
 
+from unified_backend.executor import SDKExecutor
+from unified_backend.quotes import QuoteEngine
+
 app = FastAPI(
     title="Unified Trading Backend for OpenBB",
     description="35+ integrated trading tools as OpenBB widgets",
@@ -59,6 +62,19 @@ except ImportError:
     OPENBB_AVAILABLE = False
     obb = None
 
+# Quotes go through the same engine as unified-main.py: one SDK call per
+# batch, batches fetched concurrently on the executor's "quotes" lane
+sdk_executor = SDKExecutor({"quotes": {"max_workers": 8, "max_queue": 64}})
+
+
+def _fetch_quotes(symbols, provider):
+    """Fetch quotes for a batch of symbols in a single SDK call"""
+    return obb.equity.price.quote(",".join(symbols), provider=provider).results
+
+
+quote_engine = QuoteEngine(_fetch_quotes, sdk_executor)
+
+
 # ============================================================================
 # REQUIRED ENDPOINTS
 # ============================================================================
@@ -86,25 +102,22 @@ def root():
     "gridData": {"w": 20, "h": 9}
 })
 @app.get("/market_overview")
-def market_overview():
+async def market_overview():
     if not OPENBB_AVAILABLE:
         return [{"Symbol": "N/A", "Price": "OpenBB not available"}]
     
     symbols = ["SPY", "QQQ", "IWM", "AAPL", "MSFT", "NVDA", "TSLA", "GOOGL", "META", "AMZN"]
+    quotes = await quote_engine.get_quotes(symbols)
     results = []
     for sym in symbols:
-        try:
-            result = obb.equity.price.quote(sym, provider="yfinance")
-            if result.results:
-                d = result.results[0]
-                results.append({
-                    "Symbol": sym,
-                    "Price": f"${float(d.last_price):.2f}" if d.last_price else "N/A",
-                    "Change %": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
-                    "Volume": f"{int(d.volume):,}" if d.volume else "N/A"
-                })
-        except:
-            pass
+        d = quotes.get(sym)
+        if d is not None:
+            results.append({
+                "Symbol": sym,
+                "Price": f"${float(d.last_price):.2f}" if d.last_price else "N/A",
+                "Change %": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
+                "Volume": f"{int(d.volume):,}" if d.volume else "N/A"
+            })
     return results if results else [{"Symbol": "Error", "Price": "Failed to fetch data"}]
 
 
@@ -402,15 +415,15 @@ def earnings_calendar():
     "gridData": {"w": 16, "h": 8}
 })
 @app.get("/crypto_prices")
-def crypto_prices():
+async def crypto_prices():
     if OPENBB_AVAILABLE:
         try:
             symbols = ["BTC-USD", "ETH-USD", "SOL-USD"]
+            quotes = await quote_engine.get_quotes(symbols)
             results = []
             for sym in symbols:
-                result = obb.equity.price.quote(sym, provider="yfinance")
-                if result.results:
-                    d = result.results[0]
+                d = quotes.get(sym)
+                if d is not None:
                     results.append({
                         "Symbol": sym.replace("-USD", ""),
                         "Price": f"${float(d.last_price):,.2f}" if d.last_price else "N/A",
@@ -2,19 +2,48 @@
 Unified OpenBB Backend - Integrates 35+ Trading Tools
 Connect this backend to OpenBB Workspace to access all tools as widgets
 """
-from fastapi import FastAPI, HTTPException
+import time
+
+_APP_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from functools import wraps
+import asyncio
 import json
 import os
+from pathlib import Path
+
+import numpy as np
+
+from backend_common.compression import CompressionMiddleware
+from backend_common.conditional import ConditionalGetMiddleware
+from backend_common.metrics import Metrics, MetricsMiddleware
+from backend_common.profiling import ProfilerMiddleware
+from backend_common.registry import WidgetRegistry
+from backend_common.responses import FastJSONResponse
+from backend_common.tables import Table, table_response
+from unified_backend.executor import SDKExecutor
+from unified_backend.flow import FlowDetector
+from unified_backend.greeks import GreeksEngine
+from unified_backend.indicators import IndicatorEngine
+from unified_backend.levels import LevelDetector
+from unified_backend.ohlcv_store import OHLCVStore
+from unified_backend.options import OptionsChainCache
+from unified_backend.prediction import PredictionService
+from unified_backend.quotes import QuoteEngine
+from unified_backend.risk import RiskEngine, load_portfolio
+from unified_backend.sdk import LazySDK
+from unified_backend.sentiment import NewsCache, SentimentPipeline
 
 app = FastAPI(
     title="Unified Trading Backend for OpenBB",
     description="35+ integrated trading tools as OpenBB widgets",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -25,8 +54,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Widget registry
-WIDGETS = []
+# Strong ETags on GET responses; If-None-Match answered with 304
+app.add_middleware(ConditionalGetMiddleware)
+
+# gzip/brotli/zstd for JSON and text responses of at least COMPRESSION_MIN_SIZE bytes
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+)
+
+# Widget registry, frozen and pre-encoded at startup
+WIDGETS = WidgetRegistry(as_list=True)
+
+# Requests carrying X-Profile-Token: $PROFILE_TOKEN are profiled (disabled when unset)
+app.add_middleware(
+    ProfilerMiddleware,
+    token=os.getenv("PROFILE_TOKEN"),
+    store_dir=os.getenv("PROFILE_DIR"),
+)
+
+# Per-route/per-widget request metrics and SDK call timings, served on /metrics.
+# Outermost middleware, so latency and sizes are as seen by the client
+METRICS = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=METRICS, widgets=WIDGETS)
+
 
 def register_widget(
     name: str,
@@ -46,7 +97,7 @@ def register_widget(
             "endpoint": endpoint or f"/api/{func.__name__}",
             "gridData": gridData or {"w": 20, "h": 9}
         }
-        WIDGETS.append(widget_info)
+        WIDGETS.register(widget_info)
         
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -55,22 +106,247 @@ def register_widget(
     return decorator
 
 
-# Initialize OpenBB SDK
-try:
-    from openbb import obb
-    OPENBB_AVAILABLE = True
-except ImportError:
-    OPENBB_AVAILABLE = False
-    obb = None
+# The OpenBB SDK is loaded in the background once the server is up (or by the
+# first SDK call, whichever comes first), so / and /widgets.json answer
+# immediately. `obb` waits for the load when an SDK call needs it.
+openbb_sdk = LazySDK("openbb", "obb", warmup=("equity.price", "derivatives.options", "news"))
+OPENBB_AVAILABLE = openbb_sdk.available
+obb = openbb_sdk.proxy(timeout=float(os.getenv("SDK_LOAD_TIMEOUT", "120")))
+
+
+# Every blocking SDK call runs in a per-(provider, lane) thread pool so a slow
+# upstream can only exhaust its own lane, never the event loop
+SDK_LANES = {
+    "quotes": {"max_workers": 8, "max_queue": 64},
+    "historical": {"max_workers": 4, "max_queue": 32},
+    "options": {"max_workers": 2, "max_queue": 8},
+    "news": {"max_workers": 2, "max_queue": 16},
+}
+sdk_executor = SDKExecutor(SDK_LANES)
+sdk_executor.listeners.append(
+    lambda provider, lane, seconds, ok: METRICS.observe_upstream(f"{provider}/{lane}", seconds, ok)
+)
+
+
+def _fetch_quotes(symbols, provider):
+    """Fetch quotes for a batch of symbols in a single SDK call"""
+    return obb.equity.price.quote(",".join(symbols), provider=provider).results
+
+
+# Quotes are shared across widgets and users for QUOTE_CACHE_TTL seconds
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "5"))
+quote_engine = QuoteEngine(_fetch_quotes, sdk_executor, cache_ttl=QUOTE_CACHE_TTL)
+
+
+def _fetch_bars(symbol, interval, start, end):
+    """Download bars for a date range, treating an empty range as no bars"""
+    try:
+        return obb.equity.price.historical(
+            symbol,
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+            interval=interval,
+            provider="yfinance"
+        ).results
+    except Exception as e:
+        # Weekends/holidays-only ranges come back as an empty-data error
+        if "no results" in str(e).lower():
+            return []
+        raise
+
+
+# Daily bars are kept on disk and only missing date ranges are downloaded
+OHLCV_STORE_DIR = Path(os.getenv("OHLCV_STORE_DIR", Path(__file__).parent / ".ohlcv_store"))
+ohlcv_store = OHLCVStore(OHLCV_STORE_DIR, _fetch_bars, sdk_executor)
+indicator_engine = IndicatorEngine(ohlcv_store)
+level_detector = LevelDetector(ohlcv_store)
+
+# Forecast model (PREDICTION_MODEL .npz, else the baseline model) is loaded
+# once into each scoring process; concurrent requests are scored in batches.
+# The processes are spawned by the first prediction, keeping startup fast
+PREDICTION_MODEL = os.getenv("PREDICTION_MODEL")
+prediction_service = PredictionService(
+    ohlcv_store,
+    model_path=Path(PREDICTION_MODEL) if PREDICTION_MODEL else None,
+    workers=int(os.getenv("PREDICTION_WORKERS", "2")),
+)
+HORIZON_LABELS = {1: "1 Day", 5: "1 Week", 21: "1 Month", 63: "3 Months"}
+
+
+@app.on_event("shutdown")
+def stop_prediction_service():
+    prediction_service.close()
+
+
+def _fetch_chain(symbol):
+    """Download the full options chain for an underlying"""
+    return obb.derivatives.options.chains(symbol, provider="yfinance").results
+
+
+# Chains are downloaded once per OPTIONS_CHAIN_TTL and sliced per request
+OPTIONS_CHAIN_TTL = float(os.getenv("OPTIONS_CHAIN_TTL", "60"))
+options_chains = OptionsChainCache(_fetch_chain, sdk_executor, ttl=OPTIONS_CHAIN_TTL)
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.045"))
+greeks_engine = GreeksEngine(rate=RISK_FREE_RATE)
+
+# Positions come from PORTFOLIO_FILE (JSON) when set, else a demo portfolio
+PORTFOLIO_FILE = os.getenv("PORTFOLIO_FILE")
+risk_engine = RiskEngine(
+    ohlcv_store,
+    benchmark=os.getenv("RISK_BENCHMARK", "SPY"),
+    risk_free_rate=RISK_FREE_RATE,
+)
+
+
+def _fetch_news(symbol, limit):
+    """Download recent company news"""
+    return obb.news.company(symbol, provider="yfinance", limit=limit).results
+
+
+# News is downloaded once per NEWS_TTL per symbol and shared by the news and
+# sentiment widgets; each article is scored once, keyed by its content hash
+NEWS_TTL = float(os.getenv("NEWS_TTL", "300"))
+news_cache = NewsCache(_fetch_news, sdk_executor, ttl=NEWS_TTL)
+sentiment_pipeline = SentimentPipeline(news_cache)
+
+
+# Every downloaded chain feeds the unusual-activity detector; while the
+# Options Flow widget is in use the flow symbols are also polled in the
+# background so it sees each refresh
+flow_detector = FlowDetector()
+options_chains.listeners.append(flow_detector.ingest)
+OPTIONS_FLOW_SYMBOLS = [
+    s.strip().upper()
+    for s in os.getenv("OPTIONS_FLOW_SYMBOLS", "SPY,QQQ,NVDA,TSLA,AAPL").split(",")
+    if s.strip()
+]
+OPTIONS_FLOW_IDLE = float(os.getenv("OPTIONS_FLOW_IDLE", "300"))
+_options_flow = {"requested_at": 0.0, "task": None}
+
+
+async def _refresh_options_flow():
+    await asyncio.gather(
+        *(options_chains.get(symbol) for symbol in OPTIONS_FLOW_SYMBOLS),
+        return_exceptions=True,
+    )
+
+
+async def _poll_options_flow():
+    """Refresh the chains of OPTIONS_FLOW_SYMBOLS once per OPTIONS_CHAIN_TTL until
+    the widget has not been requested for OPTIONS_FLOW_IDLE seconds"""
+    try:
+        while True:
+            await asyncio.sleep(OPTIONS_CHAIN_TTL)
+            if time.monotonic() - _options_flow["requested_at"] > OPTIONS_FLOW_IDLE:
+                return
+            await _refresh_options_flow()
+    finally:
+        _options_flow["task"] = None
+
+
+async def _watch_options_flow():
+    """Note a request for the flow; the first one after an idle spell loads
+    the chains and starts polling"""
+    _options_flow["requested_at"] = time.monotonic()
+    if OPENBB_AVAILABLE and OPTIONS_FLOW_SYMBOLS and _options_flow["task"] is None:
+        _options_flow["task"] = asyncio.create_task(_poll_options_flow())
+        await _refresh_options_flow()
+
+
+async def _chain_snapshot(symbol: str):
+    """Cached chain snapshot, with the spot price filled in from a quote if the chain lacks it"""
+    snapshot = await options_chains.get(symbol)
+    if snapshot.underlying_price is None:
+        quotes = await quote_engine.get_quotes([symbol])
+        d = quotes.get(symbol.upper())
+        if d is not None and d.last_price:
+            snapshot.underlying_price = float(d.last_price)
+    return snapshot
+
+
+def _fmt_number(value: float, fmt: str) -> str:
+    return "N/A" if value is None or np.isnan(value) else fmt.format(value)
+
+
+def _fmt_volume(value: float) -> str:
+    if value is None or np.isnan(value):
+        return "N/A"
+    for unit, scale in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.1f}{unit}"
+    return f"{value:.0f}"
+
+
+def _rsi_signal(rsi: float) -> str:
+    if np.isnan(rsi):
+        return "N/A"
+    return "Overbought" if rsi > 70 else "Oversold" if rsi < 30 else "Neutral"
+
+
+def _above_below(close: float, level: float) -> str:
+    if np.isnan(level):
+        return "N/A"
+    return "Above" if close > level else "Below"
+
+
+def _bollinger_zone(pct_b: float) -> str:
+    if np.isnan(pct_b):
+        return "N/A"
+    return "Upper" if pct_b > 0.8 else "Lower" if pct_b < 0.2 else "Middle"
+
+
+def _int_column(values: np.ndarray) -> List[Optional[int]]:
+    """Float column as ints, NaN as None"""
+    out = np.full(len(values), None, dtype=object)
+    valid = ~np.isnan(values)
+    out[valid] = values[valid].astype(np.int64).tolist()
+    return out.tolist()
+
+
+def _sentiment_label(score: float) -> str:
+    return "Bullish" if score > 0.1 else "Bearish" if score < -0.1 else "Neutral"
+
+
+def _sentiment_pct(score: float) -> str:
+    """Score in [-1, 1] shown as 0-100% with 50% neutral"""
+    return f"{(score + 1) * 50:.0f}%"
+
+
+def _quote_row(symbol: str, d: Any) -> Dict[str, str]:
+    """Format a quote record as a Market Overview / Watchlist row"""
+    if d is None:
+        # The quote could not be fetched; keep the symbol visible
+        return {
+            "Symbol": symbol,
+            "Price": "Unavailable",
+            "Change %": "N/A",
+            "Volume": "N/A",
+            "Day High": "N/A",
+            "Day Low": "N/A"
+        }
+    return {
+        "Symbol": symbol,
+        "Price": f"${float(d.last_price):.2f}" if d.last_price else "N/A",
+        "Change %": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
+        "Volume": f"{int(d.volume):,}" if d.volume else "N/A",
+        "Day High": f"${float(d.high):.2f}" if d.high else "N/A",
+        "Day Low": f"${float(d.low):.2f}" if d.low else "N/A"
+    }
 
 # ============================================================================
 # WIDGETS.JSON ENDPOINT (Required by OpenBB Workspace)
 # ============================================================================
 
 @app.get("/widgets.json")
-async def get_widgets():
+async def get_widgets(request: Request):
     """Return all registered widgets for OpenBB Workspace discovery"""
-    return WIDGETS
+    return WIDGETS.response(request)
+
+
+@app.on_event("startup")
+async def freeze_widgets():
+    """Validate the registered widgets and encode widgets.json once"""
+    WIDGETS.freeze()
 
 @app.get("/")
 async def root():
@@ -79,9 +355,23 @@ async def root():
         "version": "1.0.0",
         "widgets": len(WIDGETS),
         "status": "running",
-        "openbb_sdk": OPENBB_AVAILABLE
+        "openbb_sdk": OPENBB_AVAILABLE,
+        "sdk_state": openbb_sdk.state
     }
 
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the OpenBB SDK is loaded, 503 while it loads"""
+    report = openbb_sdk.report()
+    return JSONResponse(report, status_code=200 if openbb_sdk.ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return METRICS.response()
+
 # ============================================================================
 # MARKET DATA WIDGETS (OpenBB SDK)
 # ============================================================================
@@ -93,31 +383,34 @@ async def root():
     category="Market Data",
     type="table"
 )
-async def market_overview():
+async def market_overview(request: Request):
     """Get market overview - SPY, QQQ, IWM, major stocks"""
     if not OPENBB_AVAILABLE:
         return {"error": "OpenBB SDK not available"}
     
     symbols = ["SPY", "QQQ", "IWM", "AAPL", "MSFT", "NVDA", "TSLA", "GOOGL", "META", "AMZN"]
-    results = []
+    quotes = await quote_engine.get_quotes(symbols)
     
-    for sym in symbols:
-        try:
-            result = obb.equity.price.quote(sym, provider="yfinance")
-            if result.results:
-                d = result.results[0]
-                results.append({
-                    "Symbol": sym,
-                    "Price": f"${float(d.last_price):.2f}" if d.last_price else "N/A",
-                    "Change %": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
-                    "Volume": f"{int(d.volume):,}" if d.volume else "N/A",
-                    "Day High": f"${float(d.high):.2f}" if d.high else "N/A",
-                    "Day Low": f"${float(d.low):.2f}" if d.low else "N/A"
-                })
-        except Exception as e:
-            pass
+    rows = [_quote_row(sym, quotes.get(sym)) for sym in symbols]
+    return table_response(Table.from_rows(rows), request)
+
+
+@app.get("/api/watchlist")
+@register_widget(
+    name="Watchlist Quotes",
+    description="Quotes for a comma-separated list of symbols",
+    category="Market Data",
+    type="table"
+)
+async def watchlist(symbols: str = "SPY,QQQ,IWM,DIA"):
+    """Get quotes for an arbitrary watchlist in batched, concurrent calls"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
     
-    return results
+    requested = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+    quotes = await quote_engine.get_quotes(requested)
+    
+    return [_quote_row(sym, quotes.get(sym)) for sym in requested]
 
 
 @app.get("/api/stock_quote/{symbol}")
@@ -133,9 +426,9 @@ async def stock_quote(symbol: str):
         return {"error": "OpenBB SDK not available"}
     
     try:
-        result = obb.equity.price.quote(symbol.upper(), provider="yfinance")
-        if result.results:
-            d = result.results[0]
+        quotes = await quote_engine.get_quotes([symbol])
+        d = quotes.get(symbol.upper())
+        if d is not None:
             return [{
                 "Field": "Symbol", "Value": symbol.upper()
             }, {
@@ -174,27 +467,30 @@ async def historical_prices(symbol: str, days: int = 30):
         return {"error": "OpenBB SDK not available"}
     
     try:
-        end = datetime.now()
+        end = datetime.now().date()
         start = end - timedelta(days=days)
-        result = obb.equity.price.historical(
-            symbol.upper(),
-            start_date=start.strftime("%Y-%m-%d"),
-            end_date=end.strftime("%Y-%m-%d"),
-            provider="yfinance"
-        )
+        bars = await ohlcv_store.get(symbol, start, end)
+        dates = bars["t"].astype("datetime64[s]").astype("datetime64[D]").astype(str)
         
         return {
             "title": f"{symbol.upper()} - {days} Day Price History",
             "data": [
                 {
-                    "date": str(r.date),
-                    "open": float(r.open),
-                    "high": float(r.high),
-                    "low": float(r.low),
-                    "close": float(r.close),
-                    "volume": int(r.volume)
+                    "date": d,
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": int(v)
                 }
-                for r in result.results
+                for d, o, h, l, c, v in zip(
+                    dates.tolist(),
+                    bars["open"].tolist(),
+                    bars["high"].tolist(),
+                    bars["low"].tolist(),
+                    bars["close"].tolist(),
+                    bars["volume"].tolist()
+                )
             ]
         }
     except Exception as e:
@@ -212,29 +508,66 @@ async def historical_prices(symbol: str, days: int = 30):
     category="Options",
     type="table"
 )
-async def options_chain(symbol: str):
-    """Get options chain"""
+async def options_chain(
+    request: Request,
+    symbol: str,
+    expiration: Optional[str] = None,
+    option_type: str = "both",
+    strikes: int = 10,
+    page: int = 1,
+    page_size: int = 50
+):
+    """Get one expiration of the options chain, around the money and paged
+    
+    Args:
+        symbol: Underlying symbol
+        expiration: Expiration date (YYYY-MM-DD), defaults to the nearest one
+        option_type: call, put or both
+        strikes: Strikes kept on each side of the money (0 for all strikes)
+        page: 1-based page number
+        page_size: Rows per page
+
+    Add format=columnar for one array per column instead of row objects.
+    """
     if not OPENBB_AVAILABLE:
         return {"error": "OpenBB SDK not available"}
     
     try:
-        result = obb.derivatives.options.chains(symbol.upper(), provider="yfinance")
-        if result.results:
-            return [
-                {
-                    "Strike": float(r.strike) if r.strike else None,
-                    "Expiration": str(r.expiration) if r.expiration else None,
-                    "Type": r.option_type if hasattr(r, 'option_type') else None,
-                    "Bid": float(r.bid) if r.bid else None,
-                    "Ask": float(r.ask) if r.ask else None,
-                    "Last": float(r.last_price) if hasattr(r, 'last_price') and r.last_price else None,
-                    "Volume": int(r.volume) if r.volume else None,
-                    "OI": int(r.open_interest) if r.open_interest else None,
-                    "IV": f"{float(r.implied_volatility)*100:.1f}%" if r.implied_volatility else None
-                }
-                for r in result.results[:50]  # Limit to 50 rows
-            ]
-        return []
+        snapshot = await _chain_snapshot(symbol)
+        idx = snapshot.select(expiration, option_type, strikes or None)
+        start = max(page - 1, 0) * page_size
+        idx = idx[start:start + page_size]
+        
+        cols = snapshot.columns
+        iv = cols["implied_volatility"][idx]
+        table = Table(
+            {
+                "Strike": cols["strike"][idx],
+                "Expiration": snapshot.expirations[snapshot.exp_index[idx]],
+                "Type": np.where(snapshot.is_put[idx], "put", "call"),
+                "Bid": cols["bid"][idx],
+                "Ask": cols["ask"][idx],
+                "Last": cols["last_price"][idx],
+                "Volume": _int_column(cols["volume"][idx]),
+                "OI": _int_column(cols["open_interest"][idx]),
+                "IV": [None if np.isnan(v) else f"{v*100:.1f}%" for v in iv.tolist()],
+            },
+            types={"Volume": "integer", "OI": "integer", "IV": "string"},
+        )
+        return table_response(table, request)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/options_expirations/{symbol}")
+async def options_expirations(symbol: str):
+    """Expirations available in the cached options chain"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        snapshot = await options_chains.get(symbol)
+        return [{"label": exp, "value": exp} for exp in snapshot.expiration_list()]
     except Exception as e:
         return {"error": str(e)}
 
@@ -246,16 +579,27 @@ async def options_chain(symbol: str):
     category="Options",
     type="table"
 )
-async def options_flow():
-    """Scan for unusual options activity"""
-    # This would integrate with your options flow tools
-    return [
-        {"Symbol": "SPY", "Strike": 600, "Type": "CALL", "Volume": "125K", "OI": "45K", "Signal": "🔥 Unusual"},
-        {"Symbol": "QQQ", "Strike": 520, "Type": "PUT", "Volume": "89K", "OI": "23K", "Signal": "⚠️ Large"},
-        {"Symbol": "NVDA", "Strike": 140, "Type": "CALL", "Volume": "234K", "OI": "67K", "Signal": "🔥 Unusual"},
-        {"Symbol": "TSLA", "Strike": 400, "Type": "CALL", "Volume": "156K", "OI": "34K", "Signal": "📈 Sweep"},
-        {"Symbol": "AAPL", "Strike": 280, "Type": "PUT", "Volume": "78K", "OI": "12K", "Signal": "⚠️ Large"},
-    ]
+async def options_flow(limit: int = 25):
+    """Top unusual contracts flagged across the chain snapshots seen so far"""
+    await _watch_options_flow()
+    try:
+        return [
+            {
+                "Symbol": a["symbol"],
+                "Expiration": a["expiration"],
+                "Strike": a["strike"],
+                "Type": a["type"],
+                "Volume": _fmt_volume(a["volume"]),
+                "OI": _fmt_volume(a["open_interest"]),
+                "Premium": f"${_fmt_volume(a['premium'])}",
+                "Signal": a["signal"],
+                "Score": round(a["score"], 1),
+                "Time": datetime.fromtimestamp(a["time"]).strftime("%H:%M:%S"),
+            }
+            for a in flow_detector.top(limit)
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 @app.get("/api/greeks/{symbol}")
@@ -265,15 +609,69 @@ async def options_flow():
     category="Options",
     type="table"
 )
-async def greeks_dashboard(symbol: str = "SPY"):
-    """Get options greeks"""
-    return [
-        {"Greek": "Delta", "Call ATM": "0.52", "Put ATM": "-0.48", "Description": "Price sensitivity"},
-        {"Greek": "Gamma", "Call ATM": "0.045", "Put ATM": "0.045", "Description": "Delta change rate"},
-        {"Greek": "Theta", "Call ATM": "-0.15", "Put ATM": "-0.12", "Description": "Time decay"},
-        {"Greek": "Vega", "Call ATM": "0.28", "Put ATM": "0.28", "Description": "IV sensitivity"},
-        {"Greek": "Rho", "Call ATM": "0.08", "Put ATM": "-0.06", "Description": "Rate sensitivity"},
-    ]
+async def greeks_dashboard(symbol: str = "SPY", expiration: Optional[str] = None):
+    """ATM greeks of one expiration plus open-interest weighted chain exposure"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        snapshot = await _chain_snapshot(symbol)
+        atm = greeks_engine.atm(snapshot, expiration)
+        exposure = greeks_engine.exposure(snapshot)
+        call, put = atm.get("call", {}), atm.get("put", {})
+        
+        def fmt(side, name, digits):
+            value = side.get(name)
+            return "N/A" if value is None or np.isnan(value) else f"{value:.{digits}f}"
+        
+        rows = [
+            {"Greek": "Strike", "Call ATM": fmt(call, "strike", 2), "Put ATM": fmt(put, "strike", 2), "Description": f"Closest to spot ${snapshot.underlying_price:,.2f}"},
+            {"Greek": "Delta", "Call ATM": fmt(call, "delta", 3), "Put ATM": fmt(put, "delta", 3), "Description": "Price sensitivity"},
+            {"Greek": "Gamma", "Call ATM": fmt(call, "gamma", 4), "Put ATM": fmt(put, "gamma", 4), "Description": "Delta change rate"},
+            {"Greek": "Theta", "Call ATM": fmt(call, "theta", 3), "Put ATM": fmt(put, "theta", 3), "Description": "Time decay per day"},
+            {"Greek": "Vega", "Call ATM": fmt(call, "vega", 3), "Put ATM": fmt(put, "vega", 3), "Description": "IV sensitivity per vol point"},
+            {"Greek": "Rho", "Call ATM": fmt(call, "rho", 3), "Put ATM": fmt(put, "rho", 3), "Description": "Rate sensitivity per 1%"},
+            {"Greek": "Delta Exposure", "Call ATM": f"${exposure['call_delta']/1e6:,.1f}M", "Put ATM": f"${exposure['put_delta']/1e6:,.1f}M", "Description": "OI-weighted dollar delta, all expirations"},
+            {"Greek": "Gamma Exposure", "Call ATM": f"${exposure['call_gamma']/1e6:,.1f}M", "Put ATM": f"${exposure['put_gamma']/1e6:,.1f}M", "Description": "OI-weighted dollar gamma per 1% move"},
+        ]
+        return rows
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/gamma_exposure")
+@register_widget(
+    name="Gamma Exposure",
+    description="Net dollar gamma exposure by strike",
+    category="Options",
+    type="table"
+)
+async def gamma_exposure(symbol: str = "SPY", expiration: Optional[str] = None, strikes: int = 15):
+    """Net gamma by strike around the money, across all or one expiration"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        snapshot = await _chain_snapshot(symbol)
+        gex = greeks_engine.gamma_by_strike(snapshot, expiration)
+        atm = int(np.searchsorted(gex["strike"], snapshot.underlying_price))
+        window = slice(max(atm - strikes, 0), atm + strikes)
+        return [
+            {
+                "Strike": strike,
+                "Call GEX": f"${call/1e6:,.2f}M",
+                "Put GEX": f"${put/1e6:,.2f}M",
+                "Net GEX": f"${net/1e6:,.2f}M"
+            }
+            for strike, call, put, net in zip(
+                gex["strike"][window].tolist(),
+                gex["call"][window].tolist(),
+                gex["put"][window].tolist(),
+                gex["net"][window].tolist()
+            )
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 # ============================================================================
@@ -288,14 +686,70 @@ async def greeks_dashboard(symbol: str = "SPY"):
     type="table"
 )
 async def sentiment_analysis(symbol: str = "SPY"):
-    """AI sentiment analysis"""
-    return [
-        {"Source": "News", "Sentiment": "Bullish", "Score": "72%", "Articles": 45},
-        {"Source": "Social Media", "Sentiment": "Neutral", "Score": "51%", "Posts": 1234},
-        {"Source": "Options Flow", "Sentiment": "Bullish", "Score": "68%", "Trades": 567},
-        {"Source": "Technical", "Sentiment": "Bullish", "Score": "65%", "Signals": 12},
-        {"Source": "Overall", "Sentiment": "Bullish", "Score": "64%", "Confidence": "High"},
-    ]
+    """News sentiment from scored headlines"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        result = (await sentiment_pipeline.analyze([symbol])).get(symbol.upper())
+        if result is None:
+            return {"error": f"No news available for {symbol.upper()}"}
+        rows = [
+            {
+                "Source": "News (24h)",
+                "Sentiment": _sentiment_label(result["score_24h"]),
+                "Score": _sentiment_pct(result["score_24h"]),
+                "Articles": result["articles_24h"],
+            },
+            {
+                "Source": "News (weighted)",
+                "Sentiment": _sentiment_label(result["score"]),
+                "Score": _sentiment_pct(result["score"]),
+                "Articles": result["articles"],
+            },
+        ]
+        rows += [
+            {
+                "Source": (getattr(a, "title", None) or "")[:80],
+                "Sentiment": _sentiment_label(score),
+                "Score": _sentiment_pct(score),
+                "Articles": 1,
+            }
+            for score, a in result["scored"][:5]
+        ]
+        return rows
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/sentiment_scan")
+@register_widget(
+    name="Sentiment Scan",
+    description="News sentiment across a symbol universe",
+    category="AI Tools",
+    type="table"
+)
+async def sentiment_scan(symbols: str = "SPY,QQQ,AAPL,MSFT,NVDA,TSLA,GOOGL,META,AMZN,AMD"):
+    """News sentiment for a comma-separated list of symbols"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        requested = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+        scan = await sentiment_pipeline.analyze(requested)
+        return [
+            {
+                "Symbol": sym,
+                "Sentiment": _sentiment_label(r["score"]),
+                "Score": _sentiment_pct(r["score"]),
+                "Bullish": r["bullish"],
+                "Bearish": r["bearish"],
+                "Articles": r["articles"],
+            }
+            for sym, r in ((sym, scan[sym]) for sym in requested if sym in scan)
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 @app.get("/api/trade_signals")
@@ -324,13 +778,21 @@ async def trade_signals():
     type="table"
 )
 async def price_prediction(symbol: str = "SPY"):
-    """AI price predictions"""
-    return [
-        {"Timeframe": "1 Day", "Prediction": "$601.25", "Direction": "↑", "Confidence": "72%"},
-        {"Timeframe": "1 Week", "Prediction": "$608.50", "Direction": "↑", "Confidence": "68%"},
-        {"Timeframe": "1 Month", "Prediction": "$625.00", "Direction": "↑", "Confidence": "62%"},
-        {"Timeframe": "3 Months", "Prediction": "$650.00", "Direction": "↑", "Confidence": "55%"},
-    ]
+    """Price forecasts per horizon from the prediction model"""
+    try:
+        forecasts = await prediction_service.predict(symbol)
+        return [
+            {
+                "Timeframe": HORIZON_LABELS.get(h, f"{h} Days"),
+                "Prediction": f"${f['price']:,.2f}",
+                "Change": f"{f['expected_return'] * 100:+.2f}%",
+                "Direction": "↑" if f["expected_return"] >= 0 else "↓",
+                "Confidence": f"{f['confidence'] * 100:.0f}%",
+            }
+            for h, f in forecasts.items()
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 # ============================================================================
@@ -345,15 +807,30 @@ async def price_prediction(symbol: str = "SPY"):
     type="table"
 )
 async def portfolio_summary():
-    """Portfolio summary"""
-    return [
-        {"Metric": "Total Value", "Value": "$125,430.50"},
-        {"Metric": "Day P&L", "Value": "+$1,234.50 (+0.99%)"},
-        {"Metric": "Week P&L", "Value": "+$3,456.00 (+2.83%)"},
-        {"Metric": "Month P&L", "Value": "+$8,901.00 (+7.63%)"},
-        {"Metric": "Cash Available", "Value": "$15,000.00"},
-        {"Metric": "Buying Power", "Value": "$45,000.00"},
-    ]
+    """Portfolio value and P&L from the latest stored prices"""
+    try:
+        portfolio = load_portfolio(Path(PORTFOLIO_FILE) if PORTFOLIO_FILE else None)
+        r = await risk_engine.evaluate(portfolio)
+        invested = r["invested"]
+
+        def pnl(value):
+            if np.isnan(value):
+                return "N/A"
+            base = invested - value
+            pct = f" ({value / base * 100:+.2f}%)" if base else ""
+            return f"{'+' if value >= 0 else '-'}${abs(value):,.2f}{pct}"
+
+        return [
+            {"Metric": "Total Value", "Value": f"${r['value']:,.2f}"},
+            {"Metric": "Day P&L", "Value": pnl(r["day_pnl"])},
+            {"Metric": "Week P&L", "Value": pnl(r["week_pnl"])},
+            {"Metric": "Month P&L", "Value": pnl(r["month_pnl"])},
+            {"Metric": "Unrealized P&L", "Value": pnl(r["unrealized_pnl"])},
+            {"Metric": "Positions", "Value": str(r["positions"])},
+            {"Metric": "Cash Available", "Value": f"${r['cash']:,.2f}"},
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 @app.get("/api/risk_metrics")
@@ -364,14 +841,47 @@ async def portfolio_summary():
     type="table"
 )
 async def risk_metrics():
-    """Risk analysis"""
-    return [
-        {"Metric": "Beta", "Value": "1.15", "Status": "⚠️ Above Market"},
-        {"Metric": "Sharpe Ratio", "Value": "1.82", "Status": "✅ Good"},
-        {"Metric": "Max Drawdown", "Value": "-12.5%", "Status": "✅ Acceptable"},
-        {"Metric": "VaR (95%)", "Value": "-$3,450", "Status": "✅ Within Limits"},
-        {"Metric": "Volatility", "Value": "18.5%", "Status": "⚠️ Elevated"},
-    ]
+    """Beta, Sharpe, drawdown, VaR and volatility over the last year of daily returns"""
+    try:
+        portfolio = load_portfolio(Path(PORTFOLIO_FILE) if PORTFOLIO_FILE else None)
+        r = await risk_engine.evaluate(portfolio)
+        beta, sharpe, vol = r["beta"], r["sharpe"], r["volatility"]
+        drawdown = r["max_drawdown"]
+        var_limit = 0.05 * r["invested"]
+        return [
+            {
+                "Metric": "Beta",
+                "Value": _fmt_number(beta, "{:.2f}"),
+                "Status": "⚠️ Above Market" if beta > 1 else "✅ Below Market",
+            },
+            {
+                "Metric": "Sharpe Ratio",
+                "Value": _fmt_number(sharpe, "{:.2f}"),
+                "Status": "✅ Good" if sharpe >= 1 else "⚠️ Weak",
+            },
+            {
+                "Metric": "Max Drawdown",
+                "Value": _fmt_number(drawdown * 100, "{:.1f}%"),
+                "Status": "✅ Acceptable" if drawdown > -0.2 else "⚠️ Deep",
+            },
+            {
+                "Metric": "VaR (95%, Historical)",
+                "Value": _fmt_number(r["var_historical"], "-${:,.0f}"),
+                "Status": "✅ Within Limits" if r["var_historical"] <= var_limit else "⚠️ Above Limit",
+            },
+            {
+                "Metric": "VaR (95%, Parametric)",
+                "Value": _fmt_number(r["var_parametric"], "-${:,.0f}"),
+                "Status": "✅ Within Limits" if r["var_parametric"] <= var_limit else "⚠️ Above Limit",
+            },
+            {
+                "Metric": "Volatility",
+                "Value": _fmt_number(vol * 100, "{:.1f}%"),
+                "Status": "⚠️ Elevated" if vol > 0.2 else "✅ Normal",
+            },
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 # ============================================================================
@@ -391,14 +901,14 @@ async def company_news(symbol: str):
         return {"error": "OpenBB SDK not available"}
     
     try:
-        result = obb.news.company(symbol.upper(), provider="yfinance", limit=10)
+        articles = await news_cache.get(symbol)
         return [
             {
                 "Date": str(r.date)[:10] if r.date else "N/A",
                 "Title": r.title[:80] + "..." if len(r.title) >80 else r.title,
                 "Source": r.source if hasattr(r, 'source') else "Yahoo Finance"
             }
-            for r in result.results[:10]
+            for r in articles[:10]
         ]
     except Exception as e:
         return {"error": str(e)}
@@ -433,15 +943,61 @@ async def earnings_calendar():
     type="table"
 )
 async def technical_analysis(symbol: str = "SPY"):
-    """Technical indicators"""
-    return [
-        {"Indicator": "RSI (14)", "Value": "58.5", "Signal": "Neutral"},
-        {"Indicator": "MACD", "Value": "2.45", "Signal": "Bullish"},
-        {"Indicator": "SMA 50", "Value": "$585.20", "Signal": "Above"},
-        {"Indicator": "SMA 200", "Value": "$545.80", "Signal": "Above"},
-        {"Indicator": "Bollinger", "Value": "Middle", "Signal": "Neutral"},
-        {"Indicator": "Volume", "Value": "125M", "Signal": "Above Avg"},
-    ]
+    """RSI, MACD, SMA, Bollinger and volume from stored daily bars"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        values = (await indicator_engine.compute([symbol])).get(symbol.upper())
+        if values is None:
+            return {"error": f"No price data for {symbol.upper()}"}
+        
+        close = values["close"]
+        rsi, macd, hist = values["rsi"], values["macd"], values["macd_hist"]
+        sma50, sma200, bb_pct = values["sma_short"], values["sma_long"], values["bb_pct"]
+        volume, volume_avg = values["volume"], values["volume_avg"]
+        return [
+            {"Indicator": "RSI (14)", "Value": _fmt_number(rsi, "{:.1f}"), "Signal": _rsi_signal(rsi)},
+            {"Indicator": "MACD", "Value": _fmt_number(macd, "{:.2f}"), "Signal": "N/A" if np.isnan(hist) else "Bullish" if hist > 0 else "Bearish"},
+            {"Indicator": "SMA 50", "Value": _fmt_number(sma50, "${:,.2f}"), "Signal": _above_below(close, sma50)},
+            {"Indicator": "SMA 200", "Value": _fmt_number(sma200, "${:,.2f}"), "Signal": _above_below(close, sma200)},
+            {"Indicator": "Bollinger", "Value": _bollinger_zone(bb_pct), "Signal": "Overbought" if bb_pct > 1 else "Oversold" if bb_pct < 0 else "Neutral"},
+            {"Indicator": "Volume", "Value": _fmt_volume(volume), "Signal": "N/A" if np.isnan(volume_avg) else "Above Avg" if volume > volume_avg else "Below Avg"},
+        ]
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/technical_scan")
+@register_widget(
+    name="Technical Scan",
+    description="Indicators for a whole symbol universe in one pass",
+    category="Technical",
+    type="table"
+)
+async def technical_scan(symbols: str = "SPY,QQQ,IWM,AAPL,MSFT,NVDA,TSLA,GOOGL,META,AMZN"):
+    """Indicator snapshot for a comma-separated list of symbols"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        requested = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+        scan = await indicator_engine.compute(requested)
+        return [
+            {
+                "Symbol": sym,
+                "Close": _fmt_number(v["close"], "${:,.2f}"),
+                "RSI (14)": _fmt_number(v["rsi"], "{:.1f}"),
+                "MACD Hist": _fmt_number(v["macd_hist"], "{:.2f}"),
+                "vs SMA 50": _above_below(v["close"], v["sma_short"]),
+                "vs SMA 200": _above_below(v["close"], v["sma_long"]),
+                "Bollinger": _bollinger_zone(v["bb_pct"]),
+                "Signal": _rsi_signal(v["rsi"]),
+            }
+            for sym, v in ((sym, scan[sym]) for sym in requested if sym in scan)
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 @app.get("/api/support_resistance/{symbol}")
@@ -451,17 +1007,25 @@ async def technical_analysis(symbol: str = "SPY"):
     category="Technical",
     type="table"
 )
-async def support_resistance(symbol: str = "SPY"):
-    """Support and resistance levels"""
-    return [
-        {"Level": "R3", "Price": "$620.00", "Type": "Resistance", "Strength": "Weak"},
-        {"Level": "R2", "Price": "$610.00", "Type": "Resistance", "Strength": "Medium"},
-        {"Level": "R1", "Price": "$605.00", "Type": "Resistance", "Strength": "Strong"},
-        {"Level": "Pivot", "Price": "$598.50", "Type": "Pivot", "Strength": "-"},
-        {"Level": "S1", "Price": "$592.00", "Type": "Support", "Strength": "Strong"},
-        {"Level": "S2", "Price": "$585.00", "Type": "Support", "Strength": "Medium"},
-        {"Level": "S3", "Price": "$575.00", "Type": "Support", "Strength": "Weak"},
-    ]
+async def support_resistance(symbol: str = "SPY", interval: str = "1d", lookback_days: int = 365):
+    """Pivot, swing-cluster and volume-profile levels from stored bars"""
+    if not OPENBB_AVAILABLE:
+        return {"error": "OpenBB SDK not available"}
+    
+    try:
+        levels = await level_detector.levels(symbol, interval, lookback_days)
+        return [
+            {
+                "Level": level["name"],
+                "Price": f"${level['price']:,.2f}",
+                "Type": level["type"],
+                "Strength": level["strength"],
+                "Source": level["source"]
+            }
+            for level in levels
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
 
 # ============================================================================
@@ -480,17 +1044,25 @@ async def crypto_prices():
     if OPENBB_AVAILABLE:
         try:
             symbols = ["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "ADA-USD"]
+            quotes = await quote_engine.get_quotes(symbols)
             results = []
             for sym in symbols:
-                result = obb.equity.price.quote(sym, provider="yfinance")
-                if result.results:
-                    d = result.results[0]
+                d = quotes.get(sym)
+                if d is None:
+                    # The quote could not be fetched; keep the coin visible
                     results.append({
                         "Symbol": sym.replace("-USD", ""),
-                        "Price": f"${float(d.last_price):,.2f}" if d.last_price else "N/A",
-                        "Change": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
-                        "Volume": f"${int(d.volume)/1e9:.2f}B" if d.volume else "N/A"
+                        "Price": "Unavailable",
+                        "Change": "N/A",
+                        "Volume": "N/A"
                     })
+                    continue
+                results.append({
+                    "Symbol": sym.replace("-USD", ""),
+                    "Price": f"${float(d.last_price):,.2f}" if d.last_price else "N/A",
+                    "Change": f"{float(d.change_percent):.2f}%" if d.change_percent else "N/A",
+                    "Volume": f"${int(d.volume)/1e9:.2f}B" if d.volume else "N/A"
+                })
             return results
         except:
             pass
@@ -553,6 +1125,59 @@ async def tools_summary():
     return tools
 
 
+@app.get("/api/executor_stats")
+@register_widget(
+    name="SDK Executor",
+    description="Queue depth, wait and run times of the SDK call lanes",
+    category="System",
+    type="table"
+)
+async def executor_stats():
+    """Per-lane executor counters"""
+    return [
+        {
+            "Provider": lane["provider"],
+            "Lane": lane["lane"],
+            "Running": f"{lane['running']}/{lane['max_workers']}",
+            "Queued": f"{lane['queued']}/{lane['max_queue']}",
+            "Completed": lane["completed"],
+            "Failed": lane["failed"],
+            "Rejected": lane["rejected"],
+            "Avg Wait": f"{lane['avg_wait_ms']:.1f} ms",
+            "Max Wait": f"{lane['max_wait_ms']:.1f} ms",
+            "Avg Run": f"{lane['avg_run_ms']:.1f} ms",
+        }
+        for lane in sdk_executor.stats()
+    ]
+
+
+@app.get("/api/startup_report")
+@register_widget(
+    name="Startup Timing",
+    description="Where app and OpenBB SDK load time went",
+    category="System",
+    type="table"
+)
+async def startup_report():
+    """Load phases of the app and the OpenBB SDK"""
+    report = openbb_sdk.report()
+    rows = [{"Phase": p["phase"], "Time": f"{p['ms']:,.1f} ms", "Detail": ""} for p in report["phases"]]
+    rows.append({"Phase": "SDK state", "Time": "", "Detail": report["error"] or report["state"]})
+    rows += [
+        {"Phase": f"modules: {p['package']}", "Time": "", "Detail": str(p["modules"])}
+        for p in report["top_packages"]
+    ]
+    return rows
+
+
+@app.on_event("startup")
+async def start_sdk_loader():
+    openbb_sdk.start()
+
+
+openbb_sdk.mark("app import", time.perf_counter() - _APP_IMPORT_STARTED)
+
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
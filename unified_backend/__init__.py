@@ -0,0 +1,7 @@
+"""
+Engines backing the unified OpenBB backend (unified-main.py).
+
+Each module wraps one piece of data plumbing so the widget handlers in
+unified-main.py stay thin. unified-backend-files/main.py shares the quote
+engine by installing the repository root (see its requirements.txt).
+"""
@@ -0,0 +1,176 @@
+"""
+Off-event-loop execution layer for blocking OpenBB SDK calls.
+
+Every SDK call is routed to a lane identified by (provider, lane name), e.g.
+("yfinance", "options"). Each lane owns its own thread pool and a bounded
+queue, so a slow options chain download can only ever saturate the options
+lane and never delays quotes or the /widgets.json endpoint.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a lane's queue is full and the call is rejected"""
+
+
+class _Lane:
+    """Thread pool plus counters for one (provider, lane) pair"""
+
+    def __init__(self, provider: str, name: str, max_workers: int, max_queue: int):
+        self.provider = provider
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"sdk-{provider}-{name}"
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "provider": self.provider,
+                "lane": self.name,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0,
+            }
+
+
+class SDKExecutor:
+    """
+    Run blocking SDK calls in per-(provider, lane) thread pools.
+
+    Args:
+        lanes: Limits per lane name, e.g. {"options": {"max_workers": 2, "max_queue": 8}}.
+            The same limits apply to every provider using that lane.
+        default_max_workers: Concurrency for lanes not listed in `lanes`
+        default_max_queue: Queue bound for lanes not listed in `lanes`
+
+    Attributes:
+        listeners: Callables run on the event loop after every call as
+            listener(provider, lane, seconds, ok); seconds include queueing
+    """
+
+    def __init__(
+        self,
+        lanes: Optional[Dict[str, Dict[str, int]]] = None,
+        default_max_workers: int = 4,
+        default_max_queue: int = 32,
+    ):
+        self.lane_limits = lanes or {}
+        self.default_max_workers = default_max_workers
+        self.default_max_queue = default_max_queue
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._lock = threading.Lock()
+        self.listeners: List[Callable[[str, str, float, bool], None]] = []
+
+    def _lane(self, provider: str, name: str) -> _Lane:
+        key = (provider, name)
+        lane = self._lanes.get(key)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.get(key)
+                if lane is None:
+                    limits = self.lane_limits.get(name, {})
+                    lane = _Lane(
+                        provider,
+                        name,
+                        max_workers=limits.get("max_workers", self.default_max_workers),
+                        max_queue=limits.get("max_queue", self.default_max_queue),
+                    )
+                    self._lanes[key] = lane
+        return lane
+
+    async def run(
+        self, lane: str, provider: str, func: Callable[..., Any], /, *args, **kwargs
+    ) -> Any:
+        """
+        Run func(*args, **kwargs) in the pool of the given lane.
+
+        Args:
+            lane: Lane name grouping calls of similar cost (quotes, options, ...)
+            provider: Provider the call hits; each provider gets its own pools
+            func: Blocking callable to run
+
+        Returns:
+            Any: Whatever func returns
+
+        Raises:
+            ExecutorSaturated: If the lane already has `max_queue` calls waiting
+        """
+        target = self._lane(provider, lane)
+        with target._lock:
+            if target.queued >= target.max_queue:
+                target.rejected += 1
+                raise ExecutorSaturated(
+                    f"{provider}/{lane} queue is full ({target.queued} waiting)"
+                )
+            target.queued += 1
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            wait = started - submitted
+            with target._lock:
+                target.queued -= 1
+                target.running += 1
+                target.total_wait += wait
+                target.max_wait = max(target.max_wait, wait)
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with target._lock:
+                    target.running -= 1
+                    target.total_run += time.perf_counter() - started
+                    if ok:
+                        target.completed += 1
+                    else:
+                        target.failed += 1
+
+        def release_if_cancelled(future):
+            # A call cancelled before it started never ran `call`
+            if future.cancelled():
+                with target._lock:
+                    target.queued -= 1
+
+        future = target.pool.submit(call)
+        future.add_done_callback(release_if_cancelled)
+        if not self.listeners:
+            return await asyncio.wrap_future(future)
+        ok = False
+        try:
+            result = await asyncio.wrap_future(future)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - submitted
+            for listener in self.listeners:
+                listener(provider, lane, elapsed, ok)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Counters for every lane that has been used so far"""
+        return [lane.stats() for lane in list(self._lanes.values())]
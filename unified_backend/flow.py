@@ -0,0 +1,243 @@
+"""
+Streaming unusual-options-activity detector.
+
+Successive chain snapshots are folded into per-contract state held in flat
+NumPy arrays (one slot per contract): the cumulative volume last seen, an
+exponentially weighted baseline of the volume traded between snapshots,
+and open interest. Each snapshot is compared against those baselines as it
+arrives, and the resulting alerts are merged into a bounded top-N list, so
+serving the list never rescans history or the tracked contracts. When the
+trading day rolls over, slots of expired contracts are dropped and the
+arrays compacted, so state stays proportional to the live chains.
+"""
+import heapq
+import itertools
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from unified_backend.options import ChainSnapshot
+
+SIGNAL_SWEEP = "📈 Sweep"
+SIGNAL_UNUSUAL = "🔥 Unusual"
+SIGNAL_LARGE = "⚠️ Large"
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class FlowDetector:
+    """
+    Flags volume spikes, volume above open interest and sweeps.
+
+    Args:
+        top_n: Number of alerts kept in the ranked list
+        alpha: Weight of the newest observation in the volume baselines
+        spike_factor: Multiple of the baseline a volume increment must reach
+        min_volume: Smallest volume (contracts) worth flagging
+        vol_oi_ratio: Day volume / open interest ratio flagged as unusual
+        alert_ttl: Seconds an alert stays in the ranked list
+    """
+
+    def __init__(
+        self,
+        top_n: int = 50,
+        alpha: float = 0.2,
+        spike_factor: float = 3.0,
+        min_volume: float = 500,
+        vol_oi_ratio: float = 1.0,
+        alert_ttl: float = 6 * 3600,
+    ):
+        self.top_n = top_n
+        self.alpha = alpha
+        self.spike_factor = spike_factor
+        self.min_volume = min_volume
+        self.vol_oi_ratio = vol_oi_ratio
+        self.alert_ttl = alert_ttl
+
+        self._slots: Dict[str, int] = {}
+        # Contract symbols of the last snapshot per underlying, their keys and slots
+        self._chain_slots: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._last_fetch: Dict[str, float] = {}
+        self._size = 0
+        self.last_volume = np.zeros(0)
+        self.baseline = np.zeros(0)
+        self.day = np.zeros(0, dtype=np.int32)
+        # Expiration of each slot's contract, in days since the epoch
+        self.expiry = np.zeros(0, dtype=np.int64)
+        # Day ordinal of the newest snapshot, to notice rollovers
+        self._today = -1
+
+        self._seq = itertools.count()
+        # (score, seq, contract, alert) sorted best first, at most top_n long
+        self._top: List[Tuple[float, int, str, Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, size: int) -> None:
+        capacity = len(self.last_volume)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        for name, fill in self._columns():
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def _columns() -> Tuple[Tuple[str, Any], ...]:
+        """Per-slot arrays and the value of an unused slot"""
+        return (("last_volume", 0.0), ("baseline", np.nan), ("day", -1), ("expiry", 0))
+
+    def _prune(self, today: int) -> None:
+        """Drop the slots of contracts that expired before `today` (a day ordinal)"""
+        keep = self.expiry[: self._size] >= today - _EPOCH_ORDINAL
+        if keep.all():
+            return
+        live = np.flatnonzero(keep)
+        remap = np.full(self._size, -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        self._slots = {key: int(remap[slot]) for key, slot in self._slots.items() if keep[slot]}
+        for name, fill in self._columns():
+            column = getattr(self, name)
+            column[: len(live)] = column[live]
+            column[len(live) : self._size] = fill
+        self._size = len(live)
+        # Cached slot arrays point at the old positions
+        self._chain_slots.clear()
+
+    def _slots_for(self, snapshot: ChainSnapshot) -> Tuple[np.ndarray, np.ndarray]:
+        """Key and slot of every contract in the snapshot, allocating new slots"""
+        cached = self._chain_slots.get(snapshot.symbol)
+        if cached is not None and np.array_equal(cached[0], snapshot.contract):
+            return cached[1], cached[2]
+
+        keys = np.empty(len(snapshot), dtype=object)
+        slots = np.empty(len(snapshot), dtype=np.int64)
+        complete = True
+        for i, contract in enumerate(snapshot.contract):
+            if not isinstance(contract, str) or not contract:
+                # Rows without a contract symbol are keyed by their terms
+                complete = False
+                expiration = snapshot.expirations[snapshot.exp_index[i]]
+                kind = "P" if snapshot.is_put[i] else "C"
+                contract = f"{snapshot.symbol} {expiration} {float(snapshot.columns['strike'][i]):g}{kind}"
+            keys[i] = contract
+            slot = self._slots.get(contract)
+            if slot is None:
+                slot = self._slots[contract] = self._size
+                self._size += 1
+            slots[i] = slot
+        self._grow(self._size)
+        if complete:
+            self._chain_slots[snapshot.symbol] = (snapshot.contract, keys, slots)
+        else:
+            # Equal symbol arrays would not mean equal contracts
+            self._chain_slots.pop(snapshot.symbol, None)
+        return keys, slots
+
+    def ingest(self, snapshot: ChainSnapshot) -> int:
+        """
+        Fold one chain snapshot into the baselines and rank its alerts.
+
+        Returns:
+            int: Number of contracts flagged in this snapshot
+        """
+        if self._last_fetch.get(snapshot.symbol) == snapshot.fetched_at or not len(snapshot):
+            return 0
+        self._last_fetch[snapshot.symbol] = snapshot.fetched_at
+
+        today = date.fromtimestamp(snapshot.fetched_at).toordinal()
+        if today > self._today:
+            self._prune(today)
+            self._today = today
+
+        keys, slots = self._slots_for(snapshot)
+        self.expiry[slots] = snapshot.expirations[snapshot.exp_index].astype(np.int64)
+        cols = snapshot.columns
+        volume = np.nan_to_num(cols["volume"])
+        oi = np.nan_to_num(cols["open_interest"])
+
+        seen_day = self.day[slots]
+        seen = seen_day >= 0
+        # Volume is cumulative for the session; it restarts on a new day
+        prior = np.where(seen_day == today, self.last_volume[slots], 0.0)
+        delta = volume - prior
+        delta = np.where(delta < 0, volume, delta)
+
+        baseline = self.baseline[slots]
+        has_baseline = seen & ~np.isnan(baseline)
+        spike_ratio = np.where(has_baseline, delta / np.maximum(baseline, 1.0), 0.0)
+        spike = has_baseline & (delta >= self.min_volume) & (spike_ratio >= self.spike_factor)
+
+        oi_ratio = volume / np.maximum(oi, 1.0)
+        unusual = (volume >= self.min_volume) & (oi_ratio >= self.vol_oi_ratio) & (delta > 0)
+
+        ask = cols["ask"]
+        sweep = spike & (ask > 0) & (cols["last_price"] >= ask)
+
+        self.baseline[slots] = np.where(
+            has_baseline, (1 - self.alpha) * baseline + self.alpha * delta, np.where(seen, delta, np.nan)
+        )
+        self.last_volume[slots] = volume
+        self.day[slots] = today
+
+        flagged = np.flatnonzero(spike | unusual)
+        if len(flagged):
+            score = np.maximum(spike_ratio, oi_ratio)
+            self._rank(snapshot, keys, flagged, score, delta, sweep, unusual)
+        return len(flagged)
+
+    def _rank(
+        self,
+        snapshot: ChainSnapshot,
+        keys: np.ndarray,
+        flagged: np.ndarray,
+        score: np.ndarray,
+        delta: np.ndarray,
+        sweep: np.ndarray,
+        unusual: np.ndarray,
+    ) -> None:
+        """Merge new alerts into the top-N list (newer alerts replace a contract's older one)"""
+        cols = snapshot.columns
+        # Only the best top_n of this snapshot can make the list
+        if len(flagged) > self.top_n:
+            flagged = flagged[np.argpartition(-score[flagged], self.top_n - 1)[: self.top_n]]
+
+        now = snapshot.fetched_at
+        alerts = {}
+        for i in flagged:
+            contract = keys[i]
+            signal = SIGNAL_SWEEP if sweep[i] else SIGNAL_UNUSUAL if unusual[i] else SIGNAL_LARGE
+            alerts[contract] = (
+                float(score[i]),
+                next(self._seq),
+                contract,
+                {
+                    "symbol": snapshot.symbol,
+                    "contract": contract,
+                    "expiration": str(snapshot.expirations[snapshot.exp_index[i]]),
+                    "strike": float(cols["strike"][i]),
+                    "type": "PUT" if snapshot.is_put[i] else "CALL",
+                    "volume": float(cols["volume"][i]),
+                    "open_interest": float(cols["open_interest"][i]),
+                    "new_volume": float(delta[i]),
+                    "premium": float(delta[i] * np.nan_to_num(cols["last_price"][i]) * 100),
+                    "signal": signal,
+                    "score": float(score[i]),
+                    "time": now,
+                },
+            )
+
+        cutoff = time.time() - self.alert_ttl
+        current = (a for a in self._top if a[2] not in alerts and a[3]["time"] >= cutoff)
+        self._top = heapq.nlargest(self.top_n, itertools.chain(current, alerts.values()))
+
+    def top(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ranked alerts, best first"""
+        cutoff = time.time() - self.alert_ttl
+        alerts = [a[3] for a in self._top if a[3]["time"] >= cutoff]
+        return alerts[:limit] if limit else alerts
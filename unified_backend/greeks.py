@@ -0,0 +1,205 @@
+"""
+Vectorized Black-Scholes greeks for whole options chains.
+
+Greeks for every contract of a chain snapshot are computed in one pass of
+NumPy array operations and cached until the snapshot is replaced.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from unified_backend.options import ChainSnapshot
+
+try:
+    from scipy.special import ndtr as _ndtr
+except ImportError:
+    _ndtr = None
+
+SECONDS_PER_YEAR = 365.0 * 24 * 3600
+# Contracts are treated as expiring at the end of their expiration day
+MIN_YEARS = 1.0 / (365 * 24)
+CONTRACT_MULTIPLIER = 100
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (SciPy if installed, else an erf approximation)"""
+    if _ndtr is not None:
+        return _ndtr(x)
+    # Abramowitz & Stegun 7.1.26, absolute error below 1.5e-7
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def black_scholes_greeks(
+    spot: float,
+    strike: np.ndarray,
+    years: np.ndarray,
+    rate: float,
+    iv: np.ndarray,
+    is_put: np.ndarray,
+    dividend_yield: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Black-Scholes greeks for arrays of contracts.
+
+    Args:
+        spot: Underlying price
+        strike: Strike per contract
+        years: Time to expiry per contract, in years
+        rate: Continuously compounded risk-free rate
+        iv: Implied volatility per contract (NaN or <= 0 gives NaN greeks)
+        is_put: True for puts
+        dividend_yield: Continuous dividend yield of the underlying
+
+    Returns:
+        Dict[str, np.ndarray]: delta, gamma, theta (per day), vega and rho
+        (per 1 percentage point) for every contract
+    """
+    iv = np.where(iv > 0, iv, np.nan)
+    sqrt_t = np.sqrt(years)
+    vol_t = iv * sqrt_t
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * iv * iv) * years) / vol_t
+    d2 = d1 - vol_t
+
+    disc_q = np.exp(-dividend_yield * years)
+    disc_r = np.exp(-rate * years)
+    pdf_d1 = norm_pdf(d1)
+    sign = np.where(is_put, -1.0, 1.0)
+    cdf_d1 = norm_cdf(sign * d1)
+    cdf_d2 = norm_cdf(sign * d2)
+
+    delta = sign * disc_q * cdf_d1
+    gamma = disc_q * pdf_d1 / (spot * vol_t)
+    vega = spot * disc_q * pdf_d1 * sqrt_t / 100.0
+    theta = (
+        -spot * disc_q * pdf_d1 * iv / (2.0 * sqrt_t)
+        - sign * rate * strike * disc_r * cdf_d2
+        + sign * dividend_yield * spot * disc_q * cdf_d1
+    ) / 365.0
+    rho = sign * strike * years * disc_r * cdf_d2 / 100.0
+
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+
+
+class GreeksEngine:
+    """
+    Chain-wide greeks cached per snapshot.
+
+    Args:
+        rate: Risk-free rate used for every chain
+    """
+
+    def __init__(self, rate: float = 0.045):
+        self.rate = rate
+        self._cache: Dict[str, Tuple[ChainSnapshot, Dict[str, np.ndarray]]] = {}
+
+    def compute(self, snapshot: ChainSnapshot) -> Dict[str, np.ndarray]:
+        """
+        Greeks for every contract of a snapshot, aligned with its columns.
+
+        Raises:
+            ValueError: If the snapshot has no underlying price
+        """
+        cached = self._cache.get(snapshot.symbol)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        if snapshot.underlying_price is None:
+            raise ValueError(f"No underlying price for {snapshot.symbol}")
+
+        expiry = (
+            (snapshot.expirations[snapshot.exp_index] + np.timedelta64(1, "D"))
+            .astype("datetime64[s]")
+            .astype(np.float64)
+        )
+        years = np.maximum((expiry - time.time()) / SECONDS_PER_YEAR, MIN_YEARS)
+        greeks = black_scholes_greeks(
+            snapshot.underlying_price,
+            snapshot.columns["strike"],
+            years,
+            self.rate,
+            snapshot.columns["implied_volatility"],
+            snapshot.is_put,
+        )
+        self._cache[snapshot.symbol] = (snapshot, greeks)
+        return greeks
+
+    def atm(
+        self, snapshot: ChainSnapshot, expiration: Optional[str] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Greeks of the at-the-money call and put of one expiration.
+
+        Returns:
+            Dict[str, Dict[str, float]]: {"call": {...}, "put": {...}}; a side
+            with no contracts is missing
+        """
+        greeks = self.compute(snapshot)
+        exp_i = snapshot.expiration_index(expiration)
+        if exp_i is None:
+            return {}
+        result = {}
+        for side, put in (("call", False), ("put", True)):
+            sl = snapshot.block(exp_i, put)
+            strikes = snapshot.columns["strike"][sl]
+            if not len(strikes):
+                continue
+            i = sl.start + int(np.argmin(np.abs(strikes - snapshot.underlying_price)))
+            result[side] = {"strike": float(snapshot.columns["strike"][i])}
+            result[side].update({name: float(values[i]) for name, values in greeks.items()})
+        return result
+
+    def exposure(self, snapshot: ChainSnapshot) -> Dict[str, float]:
+        """
+        Open-interest weighted dollar delta and gamma of the whole chain.
+
+        Gamma exposure is expressed per 1% move of the underlying; calls
+        count positive and puts negative (dealer short puts convention).
+        """
+        greeks = self.compute(snapshot)
+        spot = snapshot.underlying_price
+        oi = np.nan_to_num(snapshot.columns["open_interest"]) * CONTRACT_MULTIPLIER
+        sign = np.where(snapshot.is_put, -1.0, 1.0)
+        delta = np.nan_to_num(greeks["delta"]) * oi * spot
+        gamma = sign * np.nan_to_num(greeks["gamma"]) * oi * spot * spot * 0.01
+        calls = ~snapshot.is_put
+        return {
+            "call_delta": float(delta[calls].sum()),
+            "put_delta": float(delta[~calls].sum()),
+            "call_gamma": float(gamma[calls].sum()),
+            "put_gamma": float(gamma[~calls].sum()),
+        }
+
+    def gamma_by_strike(
+        self, snapshot: ChainSnapshot, expiration: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Net dollar gamma exposure per strike, across expirations or for one.
+
+        Returns:
+            Dict[str, np.ndarray]: "strike", "call", "put" and "net" arrays
+            sorted by strike
+        """
+        greeks = self.compute(snapshot)
+        spot = snapshot.underlying_price
+        mask = np.ones(len(snapshot), dtype=bool)
+        if expiration:
+            exp_i = snapshot.expiration_index(expiration)
+            mask = snapshot.exp_index == (exp_i if exp_i is not None else -1)
+
+        strike = snapshot.columns["strike"][mask]
+        oi = np.nan_to_num(snapshot.columns["open_interest"][mask]) * CONTRACT_MULTIPLIER
+        gex = np.nan_to_num(greeks["gamma"][mask]) * oi * spot * spot * 0.01
+        is_put = snapshot.is_put[mask]
+
+        strikes, bucket = np.unique(strike, return_inverse=True)
+        call = np.bincount(bucket, weights=np.where(is_put, 0.0, gex), minlength=len(strikes))
+        put = -np.bincount(bucket, weights=np.where(is_put, gex, 0.0), minlength=len(strikes))
+        return {"strike": strikes, "call": call, "put": put, "net": call + put}
@@ -0,0 +1,281 @@
+"""
+Vectorized, incremental technical indicator engine.
+
+Indicator state (EMAs, Wilder averages and a window of recent closes) is
+kept per symbol as NumPy arrays with one row per symbol, so a whole universe
+is advanced with the same array operations as a single symbol. When new
+bars arrive only those bars are folded into the cached state; the last bar,
+which may still be in progress, is applied on top of the committed state
+without being committed.
+"""
+import asyncio
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from unified_backend.ohlcv_store import OHLCVStore
+
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+SMA_SHORT, SMA_LONG = 50, 200
+BB_PERIOD, BB_WIDTH = 20, 2.0
+VOLUME_PERIOD = 20
+
+# EMA/Wilder weights decay geometrically, so seeding the recursion this many
+# bars back gives the same state as replaying the full history (the slowest
+# decay, (25/27)^300, is ~1e-10)
+WARMUP_BARS = 300
+# Past this many new bars a cached state is rebuilt instead of advanced
+MAX_INCREMENTAL_BARS = 50
+# Calendar days of history loaded to cover WARMUP_BARS trading days
+HISTORY_DAYS = 460
+
+
+def _alpha(period: int) -> float:
+    return 2.0 / (period + 1)
+
+
+def _ema(prev: np.ndarray, value: np.ndarray, alpha: float) -> np.ndarray:
+    """One EMA step; NaN state is seeded with the value, NaN values keep the state"""
+    out = np.where(np.isnan(prev), value, prev + alpha * (value - prev))
+    return np.where(np.isnan(value), prev, out)
+
+
+@dataclass
+class IndicatorState:
+    """Indicator state of k symbols (every array has k rows)"""
+
+    count: np.ndarray
+    last_close: np.ndarray
+    ema_fast: np.ndarray
+    ema_slow: np.ndarray
+    macd_signal: np.ndarray
+    avg_gain: np.ndarray
+    avg_loss: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+
+    @classmethod
+    def empty(cls, k: int) -> "IndicatorState":
+        nan = np.full(k, np.nan)
+        return cls(
+            count=np.zeros(k, dtype=np.int64),
+            last_close=nan.copy(),
+            ema_fast=nan.copy(),
+            ema_slow=nan.copy(),
+            macd_signal=nan.copy(),
+            avg_gain=nan.copy(),
+            avg_loss=nan.copy(),
+            closes=np.full((k, SMA_LONG), np.nan),
+            volumes=np.full((k, VOLUME_PERIOD), np.nan),
+        )
+
+    @classmethod
+    def stack(cls, states: Sequence["IndicatorState"]) -> "IndicatorState":
+        return cls(
+            **{
+                f.name: np.concatenate([getattr(s, f.name) for s in states])
+                for f in fields(cls)
+            }
+        )
+
+    def row(self, i: int) -> "IndicatorState":
+        return IndicatorState(
+            **{f.name: getattr(self, f.name)[i : i + 1].copy() for f in fields(self)}
+        )
+
+    def advance(self, close: np.ndarray, volume: np.ndarray) -> "IndicatorState":
+        """
+        Fold one bar per symbol into the state and return the new state.
+
+        Symbols whose close is NaN (no bar) keep their state unchanged.
+        """
+        valid = ~np.isnan(close)
+        change = close - self.last_close
+        gain = np.where(change > 0, change, 0.0)
+        loss = np.where(change < 0, -change, 0.0)
+        has_change = valid & ~np.isnan(change)
+        wilder = 1.0 / RSI_PERIOD
+        avg_gain = np.where(has_change, _ema(self.avg_gain, gain, wilder), self.avg_gain)
+        avg_loss = np.where(has_change, _ema(self.avg_loss, loss, wilder), self.avg_loss)
+
+        ema_fast = _ema(self.ema_fast, close, _alpha(MACD_FAST))
+        ema_slow = _ema(self.ema_slow, close, _alpha(MACD_SLOW))
+        macd_signal = _ema(self.macd_signal, ema_fast - ema_slow, _alpha(MACD_SIGNAL))
+
+        closes = np.where(
+            valid[:, None],
+            np.concatenate([self.closes[:, 1:], close[:, None]], axis=1),
+            self.closes,
+        )
+        volumes = np.where(
+            valid[:, None],
+            np.concatenate([self.volumes[:, 1:], volume[:, None]], axis=1),
+            self.volumes,
+        )
+        return IndicatorState(
+            count=self.count + valid,
+            last_close=np.where(valid, close, self.last_close),
+            ema_fast=ema_fast,
+            ema_slow=ema_slow,
+            macd_signal=macd_signal,
+            avg_gain=avg_gain,
+            avg_loss=avg_loss,
+            closes=closes,
+            volumes=volumes,
+        )
+
+    def values(self) -> Dict[str, np.ndarray]:
+        """Indicator values for every symbol (NaN where history is too short)"""
+
+        def sma(period: int) -> np.ndarray:
+            mean = self.closes[:, -period:].mean(axis=1)
+            return np.where(self.count >= period, mean, np.nan)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rs = self.avg_gain / self.avg_loss
+            rsi = np.where(self.avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+            rsi = np.where(self.count > RSI_PERIOD, rsi, np.nan)
+
+            macd = self.ema_fast - self.ema_slow
+            bb_mid = sma(BB_PERIOD)
+            bb_std = self.closes[:, -BB_PERIOD:].std(axis=1)
+            bb_upper = bb_mid + BB_WIDTH * bb_std
+            bb_lower = bb_mid - BB_WIDTH * bb_std
+            bb_pct = (self.last_close - bb_lower) / (bb_upper - bb_lower)
+            volume_avg = np.where(
+                self.count >= VOLUME_PERIOD, self.volumes.mean(axis=1), np.nan
+            )
+
+        return {
+            "close": self.last_close,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": self.macd_signal,
+            "macd_hist": macd - self.macd_signal,
+            "sma_short": sma(SMA_SHORT),
+            "sma_long": sma(SMA_LONG),
+            "bb_upper": bb_upper,
+            "bb_mid": bb_mid,
+            "bb_lower": bb_lower,
+            "bb_pct": bb_pct,
+            "volume": self.volumes[:, -1],
+            "volume_avg": volume_avg,
+        }
+
+
+def build_states(closes: np.ndarray, volumes: np.ndarray) -> IndicatorState:
+    """
+    Build indicator state for k symbols from right-aligned (k, n) bar matrices.
+
+    Shorter histories are NaN-padded on the left. Only the last WARMUP_BARS
+    columns are replayed.
+    """
+    closes = closes[:, -WARMUP_BARS:]
+    volumes = volumes[:, -WARMUP_BARS:]
+    state = IndicatorState.empty(closes.shape[0])
+    for j in range(closes.shape[1]):
+        state = state.advance(closes[:, j], volumes[:, j])
+    return state
+
+
+def _right_aligned(series: Sequence[np.ndarray], width: int) -> np.ndarray:
+    out = np.full((len(series), width), np.nan)
+    for i, values in enumerate(series):
+        values = values[-width:]
+        if len(values):
+            out[i, width - len(values) :] = values
+    return out
+
+
+class IndicatorEngine:
+    """
+    Indicator values per symbol, backed by the OHLCV store.
+
+    The committed state of each (symbol, interval) covers every bar except
+    the latest one. Each request folds in only the bars that arrived since,
+    and evaluates the latest bar on top of the committed state.
+
+    Args:
+        store: OHLCV store the bars are read from
+    """
+
+    def __init__(self, store: OHLCVStore):
+        self.store = store
+        # (symbol, interval) -> (timestamp of last committed bar, state)
+        self._states: Dict[Tuple[str, str], Tuple[int, IndicatorState]] = {}
+
+    def _refresh(
+        self, keys: List[Tuple[str, str]], bars: List[Dict[str, np.ndarray]]
+    ) -> IndicatorState:
+        """Bring committed states up to date and evaluate the latest bars"""
+        rebuild: List[int] = []
+        live: List[Optional[IndicatorState]] = [None] * len(keys)
+
+        for i, (key, series) in enumerate(zip(keys, bars)):
+            t = series["t"]
+            cached = self._states.get(key)
+            if cached is None or not len(t):
+                rebuild.append(i)
+                continue
+            # Bars after the committed one, except the still-open last bar
+            start = int(np.searchsorted(t, cached[0], side="right"))
+            pending = range(start, len(t) - 1)
+            if start == 0 or start >= len(t) or len(pending) > MAX_INCREMENTAL_BARS:
+                rebuild.append(i)
+                continue
+            state = cached[1]
+            for j in pending:
+                state = state.advance(series["close"][j : j + 1], series["volume"][j : j + 1])
+            if len(pending):
+                self._states[key] = (int(t[-2]), state)
+            live[i] = state
+
+        if rebuild:
+            closes = _right_aligned([bars[i]["close"][:-1] for i in rebuild], WARMUP_BARS)
+            volumes = _right_aligned([bars[i]["volume"][:-1] for i in rebuild], WARMUP_BARS)
+            states = build_states(closes, volumes)
+            for row, i in enumerate(rebuild):
+                state = states.row(row)
+                t = bars[i]["t"]
+                if len(t) > 1:
+                    self._states[keys[i]] = (int(t[-2]), state)
+                live[i] = state
+
+        committed = IndicatorState.stack(live)
+        last_close = np.array([b["close"][-1] if len(b["t"]) else np.nan for b in bars])
+        last_volume = np.array([b["volume"][-1] if len(b["t"]) else np.nan for b in bars])
+        return committed.advance(last_close, last_volume)
+
+    async def compute(
+        self, symbols: Sequence[str], interval: str = "1d"
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Latest indicator values for a universe of symbols.
+
+        Args:
+            symbols: Symbols to evaluate; all are computed in one array pass
+            interval: Bar interval
+
+        Returns:
+            Dict[str, Dict[str, float]]: Indicator values per symbol. Symbols
+            without bars are left out.
+        """
+        end = date.today()
+        start = end - timedelta(days=HISTORY_DAYS)
+        loaded = await self.store.get_many(symbols, start, end, interval)
+        names = [s for s in (sym.upper() for sym in symbols) if s in loaded and len(loaded[s]["t"])]
+        if not names:
+            return {}
+
+        keys = [(name, interval) for name in names]
+        state = await asyncio.get_running_loop().run_in_executor(
+            None, self._refresh, keys, [loaded[name] for name in names]
+        )
+        values = state.values()
+        return {
+            name: {indicator: float(array[i]) for indicator, array in values.items()}
+            for i, name in enumerate(names)
+        }
@@ -0,0 +1,183 @@
+"""
+Vectorized support/resistance detection.
+
+Levels come from three sources, each computed with whole-array NumPy
+passes: classic floor pivots of the last completed bar, clusters of swing
+highs/lows, and high-volume nodes of the volume profile. Results are cached
+per (symbol, interval, last bar), so repeat requests between bars are free.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from unified_backend.cache import TTLCache
+from unified_backend.ohlcv_store import OHLCVStore
+
+SWING_ORDER = 5
+ATR_PERIOD = 14
+PROFILE_BINS = 50
+LEVELS_PER_SIDE = 3
+
+
+def classic_pivots(high: float, low: float, close: float) -> Dict[str, float]:
+    """Floor-trader pivot levels of one bar"""
+    pivot = (high + low + close) / 3.0
+    return {
+        "R3": high + 2.0 * (pivot - low),
+        "R2": pivot + (high - low),
+        "R1": 2.0 * pivot - low,
+        "Pivot": pivot,
+        "S1": 2.0 * pivot - high,
+        "S2": pivot - (high - low),
+        "S3": low - 2.0 * (high - pivot),
+    }
+
+
+def swing_points(high: np.ndarray, low: np.ndarray, order: int = SWING_ORDER) -> np.ndarray:
+    """
+    Prices of swing highs and lows.
+
+    A bar is a swing high (low) when its high (low) is the extreme of the
+    `order` bars on either side.
+    """
+    width = 2 * order + 1
+    if len(high) < width:
+        return np.empty(0)
+    centre = slice(order, len(high) - order)
+    is_high = sliding_window_view(high, width).max(axis=1) == high[centre]
+    is_low = sliding_window_view(low, width).min(axis=1) == low[centre]
+    return np.concatenate([high[centre][is_high], low[centre][is_low]])
+
+
+def cluster_levels(prices: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group nearby prices into levels.
+
+    Sorted prices are split wherever the gap to the next one exceeds
+    `tolerance`; each group becomes one level at its mean price.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: level prices and the number of
+        touches in each level
+    """
+    if not len(prices):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    prices = np.sort(prices)
+    group = np.concatenate([[0], np.cumsum(np.diff(prices) > tolerance)])
+    touches = np.bincount(group)
+    levels = np.bincount(group, weights=prices) / touches
+    return levels, touches
+
+
+def volume_nodes(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    bins: int = PROFILE_BINS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Volume profile local maxima (high-volume nodes).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: node prices and their share of the
+        total traded volume
+    """
+    typical = (high + low + close) / 3.0
+    hist, edges = np.histogram(typical, bins=bins, weights=volume)
+    total = hist.sum()
+    if total <= 0:
+        return np.empty(0), np.empty(0)
+    padded = np.concatenate([[-np.inf], hist, [-np.inf]])
+    is_peak = (hist > padded[:-2]) & (hist >= padded[2:])
+    centres = (edges[:-1] + edges[1:]) / 2.0
+    return centres[is_peak], hist[is_peak] / total
+
+
+def _strength(score: float, strong: float, medium: float) -> str:
+    return "Strong" if score >= strong else "Medium" if score >= medium else "Weak"
+
+
+def detect_levels(bars: Dict[str, np.ndarray]) -> List[Dict[str, object]]:
+    """
+    Support and resistance levels for a bar series.
+
+    Args:
+        bars: Arrays "high", "low", "close" and "volume" sorted by time
+
+    Returns:
+        List[Dict[str, object]]: Levels with "source", "name", "price",
+        "type" and "strength", highest price first
+    """
+    high, low, close, volume = bars["high"], bars["low"], bars["close"], bars["volume"]
+    if len(close) < 2:
+        return []
+    last = float(close[-1])
+    levels = []
+
+    # The last bar may still be in progress, so pivots use the one before
+    for name, price in classic_pivots(high[-2], low[-2], close[-2]).items():
+        kind = "Pivot" if name == "Pivot" else "Resistance" if name.startswith("R") else "Support"
+        strength = "-" if name == "Pivot" else {"1": "Strong", "2": "Medium", "3": "Weak"}[name[1]]
+        levels.append({"source": "Pivot", "name": name, "price": float(price), "type": kind, "strength": strength})
+
+    atr = float(np.mean((high - low)[-ATR_PERIOD:]))
+    prices, touches = cluster_levels(swing_points(high, low), tolerance=0.5 * atr)
+    for side, mask, order in (
+        ("Resistance", prices > last, np.argsort(prices)),
+        ("Support", prices < last, np.argsort(-prices)),
+    ):
+        nearest = [i for i in order if mask[i]][:LEVELS_PER_SIDE]
+        for rank, i in enumerate(nearest, start=1):
+            levels.append({
+                "source": "Swing",
+                "name": f"Swing {side[0]}{rank}",
+                "price": float(prices[i]),
+                "type": side,
+                "strength": _strength(touches[i], strong=4, medium=2),
+            })
+
+    node_prices, shares = volume_nodes(high, low, close, volume)
+    for rank, i in enumerate(np.argsort(-shares)[:LEVELS_PER_SIDE], start=1):
+        levels.append({
+            "source": "Volume",
+            "name": f"HVN{rank}",
+            "price": float(node_prices[i]),
+            "type": "Resistance" if node_prices[i] > last else "Support",
+            "strength": _strength(shares[i], strong=0.08, medium=0.04),
+        })
+
+    return sorted(levels, key=lambda level: -level["price"])
+
+
+class LevelDetector:
+    """
+    Support/resistance levels per symbol, backed by the OHLCV store.
+
+    Args:
+        store: OHLCV store the bars are read from
+    """
+
+    def __init__(self, store: OHLCVStore):
+        self.store = store
+        # Keyed by the last bar, so the TTL only bounds memory
+        self.cache = TTLCache(ttl=24 * 3600, maxsize=1024)
+
+    async def levels(
+        self, symbol: str, interval: str = "1d", lookback_days: int = 365
+    ) -> List[Dict[str, object]]:
+        """Levels for a symbol over the last `lookback_days` days"""
+        end = date.today()
+        bars = await self.store.get(symbol, end - timedelta(days=lookback_days), end, interval)
+        if not len(bars["t"]):
+            return []
+
+        key = (symbol.upper(), interval, lookback_days, int(bars["t"][-1]), float(bars["close"][-1]))
+        levels = self.cache.get(key)
+        if levels is None:
+            levels = await asyncio.get_running_loop().run_in_executor(None, detect_levels, bars)
+            self.cache.set(key, levels)
+        return levels
@@ -0,0 +1,300 @@
+"""
+Incremental on-disk OHLCV store.
+
+Bars are kept per (symbol, interval) as one NumPy array per column in a
+compressed .npz file, together with the date range they cover. A request
+only downloads the dates outside that range, merges them in and persists
+the result, so long histories are read from local disk after the first
+fetch.
+"""
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from unified_backend.executor import SDKExecutor
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Symbols and intervals come from request parameters and name files under
+# the store root, so only plain ticker and interval characters are accepted
+_SYMBOL = re.compile(r"[A-Z0-9.^=-]{1,20}")
+_INTERVAL = re.compile(r"[A-Za-z0-9]{1,10}")
+
+# fetcher(symbol, interval, start, end) -> list of bar records with a `date`
+# attribute and one attribute per name in COLUMNS
+BarFetcher = Callable[[str, str, date, date], List[Any]]
+
+
+def _epoch(value: Any) -> int:
+    """Convert a bar date/datetime to epoch seconds (naive values are UTC)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, date):
+        return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+    return int(datetime.fromisoformat(str(value)).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _day_start(day: date) -> int:
+    return _epoch(day)
+
+
+def _day_end(day: date) -> int:
+    return _epoch(day + timedelta(days=1)) - 1
+
+
+@dataclass
+class _Series:
+    """Bars of one (symbol, interval) plus the date range they cover"""
+
+    t: np.ndarray
+    columns: Dict[str, np.ndarray]
+    first_day: date
+    last_day: date
+    tail_fetched_at: float = 0.0
+
+    @classmethod
+    def from_records(cls, records: List[Any], first_day: date, last_day: date) -> "_Series":
+        t = np.fromiter((_epoch(r.date) for r in records), dtype=np.int64, count=len(records))
+        columns = {
+            name: np.fromiter(
+                (float(getattr(r, name) or 0.0) for r in records),
+                dtype=np.float64,
+                count=len(records),
+            )
+            for name in COLUMNS
+        }
+        order = np.argsort(t, kind="stable")
+        return cls(t[order], {k: v[order] for k, v in columns.items()}, first_day, last_day)
+
+    def merge(self, other: "_Series") -> "_Series":
+        """Combine two series; bars from `other` win on equal timestamps"""
+        t = np.concatenate([self.t, other.t])
+        order = np.argsort(t, kind="stable")
+        t = t[order]
+        keep = np.ones(len(t), dtype=bool)
+        keep[:-1] = t[1:] != t[:-1]
+        columns = {
+            name: np.concatenate([self.columns[name], other.columns[name]])[order][keep]
+            for name in COLUMNS
+        }
+        return _Series(
+            t[keep],
+            columns,
+            min(self.first_day, other.first_day),
+            max(self.last_day, other.last_day),
+            max(self.tail_fetched_at, other.tail_fetched_at),
+        )
+
+    def slice(self, start: date, end: date) -> Dict[str, np.ndarray]:
+        lo = np.searchsorted(self.t, _day_start(start), side="left")
+        hi = np.searchsorted(self.t, _day_end(end), side="right")
+        bars = {"t": self.t[lo:hi]}
+        bars.update({name: values[lo:hi] for name, values in self.columns.items()})
+        return bars
+
+
+class OHLCVStore:
+    """
+    Local columnar OHLCV store that only fetches missing date ranges.
+
+    Args:
+        root: Directory holding one sub-directory per interval
+        fetcher: Blocking callable downloading bars for a date range
+        executor: Executor the downloads run on ("historical" lane)
+        provider: Provider name used for the executor lane
+        chunk_days: Long missing ranges are split into chunks of this many
+            days and downloaded in parallel
+        tail_ttl: Seconds before the most recent day is fetched again
+        max_downloads: Chunk downloads submitted to the executor at once;
+            keeps large multi-symbol loads within the lane's queue bound
+        empty_ttl: Seconds a symbol for which no bars at all came back is
+            answered with no bars before it is fetched again; such results
+            are not written to disk
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        fetcher: BarFetcher,
+        executor: SDKExecutor,
+        provider: str = "yfinance",
+        chunk_days: int = 365,
+        tail_ttl: float = 60.0,
+        max_downloads: int = 8,
+        empty_ttl: float = 300.0,
+    ):
+        self.root = Path(root)
+        self.fetcher = fetcher
+        self.executor = executor
+        self.provider = provider
+        self.chunk_days = max(1, chunk_days)
+        self.tail_ttl = tail_ttl
+        self.empty_ttl = empty_ttl
+        # (symbol, interval) -> time a fetch last returned no bars at all
+        self._empty: Dict[Tuple[str, str], float] = {}
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.max_downloads = max_downloads
+        # Created on first use, inside the running loop
+        self._downloads: Optional[asyncio.Semaphore] = None
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / f"{symbol}.npz"
+
+    def _load(self, symbol: str, interval: str) -> Optional[_Series]:
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            if not len(data["t"]):
+                # Written before empty results stopped being stored
+                return None
+            first_day, last_day = (date.fromordinal(int(d)) for d in data["coverage"])
+            return _Series(
+                data["t"],
+                {name: data[name] for name in COLUMNS},
+                first_day,
+                last_day,
+                float(data["tail_fetched_at"]),
+            )
+
+    def _save(self, symbol: str, interval: str, series: _Series) -> None:
+        path = self._path(symbol, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            t=series.t,
+            coverage=np.array([series.first_day.toordinal(), series.last_day.toordinal()]),
+            tail_fetched_at=np.array(series.tail_fetched_at),
+            **series.columns,
+        )
+        os.replace(tmp, path)
+
+    def _missing_ranges(
+        self, series: Optional[_Series], start: date, end: date
+    ) -> List[Tuple[date, date]]:
+        """Date ranges that have to be downloaded to cover [start, end]"""
+        if series is None:
+            return [(start, end)]
+        ranges = []
+        if start < series.first_day:
+            ranges.append((start, series.first_day - timedelta(days=1)))
+        # A stored day that is still in progress holds a partial bar, so it
+        # is refreshed once tail_ttl has passed
+        tail_stale = (
+            series.last_day >= date.today()
+            and time.time() - series.tail_fetched_at > self.tail_ttl
+        )
+        if end > series.last_day or (end == series.last_day and tail_stale):
+            ranges.append((series.last_day, end))
+        return ranges
+
+    def _chunks(self, start: date, end: date) -> List[Tuple[date, date]]:
+        chunks = []
+        while start <= end:
+            chunk_end = min(end, start + timedelta(days=self.chunk_days - 1))
+            chunks.append((start, chunk_end))
+            start = chunk_end + timedelta(days=1)
+        return chunks
+
+    async def _download_chunk(self, symbol: str, interval: str, start: date, end: date) -> List[Any]:
+        if self._downloads is None:
+            self._downloads = asyncio.Semaphore(self.max_downloads)
+        async with self._downloads:
+            return await self.executor.run(
+                "historical", self.provider, self.fetcher, symbol, interval, start, end
+            )
+
+    async def _download(self, symbol: str, interval: str, start: date, end: date) -> _Series:
+        chunks = self._chunks(start, end)
+        results = await asyncio.gather(
+            *(self._download_chunk(symbol, interval, lo, hi) for lo, hi in chunks)
+        )
+        records = [record for chunk in results for record in (chunk or [])]
+        return _Series.from_records(records, start, end)
+
+    async def get(
+        self, symbol: str, start: date, end: date, interval: str = "1d"
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get bars for a symbol between two dates (inclusive).
+
+        Args:
+            symbol: Ticker symbol
+            start: First day requested
+            end: Last day requested
+            interval: Bar interval understood by the provider, e.g. "1d"
+
+        Returns:
+            Dict[str, np.ndarray]: "t" (epoch seconds) plus one array per
+            OHLCV column, sorted by time
+
+        Raises:
+            ValueError: If the symbol or interval is not a plain ticker or
+                interval name
+        """
+        symbol = symbol.upper()
+        if not _SYMBOL.fullmatch(symbol):
+            raise ValueError(f"Invalid symbol {symbol!r}")
+        if not _INTERVAL.fullmatch(interval):
+            raise ValueError(f"Invalid interval {interval!r}")
+        key = (symbol, interval)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        loop = asyncio.get_running_loop()
+
+        async with lock:
+            if time.time() - self._empty.get(key, -np.inf) < self.empty_ttl:
+                return _Series.from_records([], start, end).slice(start, end)
+
+            series = self._series.get(key)
+            if series is None:
+                series = await loop.run_in_executor(None, self._load, symbol, interval)
+
+            missing = self._missing_ranges(series, start, end)
+            if missing:
+                fetched_at = time.time()
+                downloads = await asyncio.gather(
+                    *(self._download(symbol, interval, lo, hi) for lo, hi in missing)
+                )
+                for download in downloads:
+                    if download.last_day >= end:
+                        download.tail_fetched_at = fetched_at
+                    series = download if series is None else series.merge(download)
+                if not len(series.t):
+                    # Most likely an unknown symbol: not recorded as covered
+                    self._empty[key] = fetched_at
+                    return series.slice(start, end)
+                self._empty.pop(key, None)
+                await loop.run_in_executor(None, self._save, symbol, interval, series)
+
+            self._series[key] = series
+
+        return series.slice(start, end)
+
+    async def get_many(
+        self, symbols: Sequence[str], start: date, end: date, interval: str = "1d"
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Get bars for several symbols concurrently.
+
+        Symbols whose download fails are left out of the result.
+        """
+        results = await asyncio.gather(
+            *(self.get(symbol, start, end, interval) for symbol in symbols),
+            return_exceptions=True,
+        )
+        return {
+            symbol.upper(): bars
+            for symbol, bars in zip(symbols, results)
+            if not isinstance(bars, BaseException)
+        }
@@ -0,0 +1,211 @@
+"""
+Indexed options-chain snapshots.
+
+A chain is downloaded once per TTL and stored column-wise in NumPy arrays,
+sorted by (expiration, call/put, strike). An offsets table gives the start
+of every (expiration, type) block, so a request for one expiry and a strike
+window around the money only touches that slice of the chain.
+"""
+import time
+from datetime import date
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from unified_backend.cache import SingleFlight, TTLCache
+from unified_backend.executor import SDKExecutor
+
+NUMERIC_FIELDS = (
+    "strike",
+    "bid",
+    "ask",
+    "last_price",
+    "volume",
+    "open_interest",
+    "implied_volatility",
+    "underlying_price",
+)
+
+# fetcher(symbol) -> OpenBB chain results: a list of contract records or a
+# single record holding one list per field
+ChainFetcher = Callable[[str], Any]
+
+
+def _field(results: Any, name: str, size: int) -> List[Any]:
+    """Read one field as a list from either row or column shaped results"""
+    if isinstance(results, list):
+        return [getattr(r, name, None) for r in results]
+    values = getattr(results, name, None)
+    return list(values) if values is not None else [None] * size
+
+
+def _size(results: Any) -> int:
+    if isinstance(results, list):
+        return len(results)
+    strikes = getattr(results, "strike", None)
+    return len(strikes) if strikes is not None else 0
+
+
+class ChainSnapshot:
+    """
+    One options chain stored as sorted columns.
+
+    Attributes:
+        symbol: Underlying symbol
+        fetched_at: Epoch seconds the chain was downloaded
+        underlying_price: Spot price of the underlying, if known
+        expirations: Sorted unique expirations (datetime64[D])
+        exp_index: Expiration position of each contract
+        is_put: True for puts, False for calls
+        contract: Contract symbols (object array)
+        columns: Float arrays for every name in NUMERIC_FIELDS (NaN if missing)
+    """
+
+    def __init__(self, symbol: str, results: Any, underlying_price: Optional[float] = None):
+        self.symbol = symbol
+        self.fetched_at = time.time()
+
+        size = _size(results)
+        expirations = np.array(
+            [str(e)[:10] if e is not None else "NaT" for e in _field(results, "expiration", size)],
+            dtype="datetime64[D]",
+        )
+        option_types = _field(results, "option_type", size)
+        is_put = np.array([str(t).lower().startswith("p") for t in option_types], dtype=bool)
+        contract = np.array(_field(results, "contract_symbol", size), dtype=object)
+        columns = {
+            name: np.array(_field(results, name, size), dtype=np.float64)
+            for name in NUMERIC_FIELDS
+        }
+
+        valid = ~np.isnat(expirations) & ~np.isnan(columns["strike"])
+        self.expirations, exp_index = np.unique(expirations[valid], return_inverse=True)
+        exp_index = exp_index.astype(np.int32)
+        is_put = is_put[valid]
+        strike = columns["strike"][valid]
+
+        order = np.lexsort((strike, is_put, exp_index))
+        self.exp_index = exp_index[order]
+        self.is_put = is_put[order]
+        self.contract = contract[valid][order]
+        self.columns = {name: values[valid][order] for name, values in columns.items()}
+
+        # offsets[2 * e + p] .. offsets[2 * e + p + 1] is the block of
+        # expiration e and type p (0 = call, 1 = put)
+        block = self.exp_index * 2 + self.is_put
+        counts = np.bincount(block, minlength=2 * len(self.expirations))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        if underlying_price is None:
+            spot = self.columns["underlying_price"]
+            spot = spot[~np.isnan(spot)]
+            underlying_price = float(spot[0]) if len(spot) else None
+        self.underlying_price = underlying_price
+
+    def __len__(self) -> int:
+        return len(self.exp_index)
+
+    def expiration_index(self, expiration: Optional[str] = None) -> Optional[int]:
+        """Position of the requested expiration, or of the nearest one not yet expired"""
+        if not len(self.expirations):
+            return None
+        if expiration:
+            target = np.datetime64(expiration[:10], "D")
+            i = int(np.searchsorted(self.expirations, target))
+            if i < len(self.expirations) and self.expirations[i] == target:
+                return i
+            return None
+        i = int(np.searchsorted(self.expirations, np.datetime64(date.today(), "D")))
+        return min(i, len(self.expirations) - 1)
+
+    def block(self, exp_i: int, put: bool) -> slice:
+        """Slice of contracts for one expiration and type, sorted by strike"""
+        b = 2 * exp_i + int(put)
+        return slice(int(self.offsets[b]), int(self.offsets[b + 1]))
+
+    def select(
+        self,
+        expiration: Optional[str] = None,
+        option_type: str = "both",
+        strikes: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Indices of the contracts matching a filter, ordered by strike.
+
+        Args:
+            expiration: Expiration date (YYYY-MM-DD); defaults to the nearest one
+            option_type: "call", "put" or "both"
+            strikes: Number of strikes kept on each side of the money; all if None
+
+        Returns:
+            np.ndarray: Contract indices into the snapshot columns
+        """
+        exp_i = self.expiration_index(expiration)
+        if exp_i is None:
+            return np.empty(0, dtype=np.int64)
+
+        types = {"call": [False], "put": [True]}.get(option_type.lower(), [False, True])
+        parts = []
+        for put in types:
+            sl = self.block(exp_i, put)
+            idx = np.arange(sl.start, sl.stop)
+            if strikes is not None and len(idx) and self.underlying_price is not None:
+                atm = sl.start + int(
+                    np.searchsorted(self.columns["strike"][sl], self.underlying_price)
+                )
+                lo = max(sl.start, atm - strikes)
+                hi = min(sl.stop, atm + strikes)
+                idx = np.arange(lo, hi)
+            parts.append(idx)
+
+        idx = np.concatenate(parts)
+        return idx[np.argsort(self.columns["strike"][idx], kind="stable")]
+
+    def expiration_list(self) -> List[str]:
+        return self.expirations.astype(str).tolist()
+
+
+class OptionsChainCache:
+    """
+    Per-underlying chain snapshots, downloaded at most once per TTL.
+
+    Concurrent requests for a chain that is being downloaded share the same
+    download.
+
+    Args:
+        fetcher: Blocking callable returning the chain results for a symbol
+        executor: Executor the downloads run on ("options" lane)
+        ttl: Seconds a snapshot is served before it is downloaded again
+        provider: Provider name used for the executor lane
+    """
+
+    def __init__(
+        self,
+        fetcher: ChainFetcher,
+        executor: SDKExecutor,
+        ttl: float = 60.0,
+        provider: str = "yfinance",
+    ):
+        self.fetcher = fetcher
+        self.executor = executor
+        self.provider = provider
+        self.cache = TTLCache(ttl=ttl, maxsize=256)
+        self._flight = SingleFlight()
+        # Called with every freshly downloaded snapshot
+        self.listeners: List[Callable[[ChainSnapshot], None]] = []
+
+    async def _load(self, symbol: str) -> ChainSnapshot:
+        results = await self.executor.run("options", self.provider, self.fetcher, symbol)
+        snapshot = ChainSnapshot(symbol, results)
+        self.cache.set(symbol, snapshot)
+        for listener in self.listeners:
+            listener(snapshot)
+        return snapshot
+
+    async def get(self, symbol: str) -> ChainSnapshot:
+        """Return the current snapshot for symbol, downloading it if stale"""
+        symbol = symbol.upper()
+        snapshot = self.cache.get(symbol)
+        if snapshot is None:
+            snapshot = await self._flight.do(symbol, lambda: self._load(symbol))
+        return snapshot
@@ -0,0 +1,293 @@
+"""
+Batched price-prediction service.
+
+A linear forecasting model (one row of weights per horizon over a fixed set
+of return/volatility/trend features) is loaded once into every worker of a
+process pool. Concurrent requests are collected for a few milliseconds and
+scored as one batch: features for every symbol are computed as a matrix and
+all horizons come out of a single matrix product. Results are cached per
+(symbol, horizon, last bar). The pool is spawned by the first prediction,
+not at server startup.
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from unified_backend.cache import TTLCache
+from unified_backend.greeks import norm_cdf
+from unified_backend.ohlcv_store import OHLCVStore
+
+FEATURES = ("ret_5", "ret_21", "ret_63", "ret_252", "vol_21", "gap_sma50", "gap_sma200")
+HORIZONS = (1, 5, 21, 63)
+# Closes passed to the model per symbol (enough for the 252-day return)
+LOOKBACK = 253
+# Calendar days of history loaded to cover LOOKBACK trading days
+HISTORY_DAYS = 380
+
+logger = logging.getLogger(__name__)
+
+
+def compute_features(closes: np.ndarray) -> np.ndarray:
+    """
+    Model features for a batch of close histories.
+
+    Args:
+        closes: (B, LOOKBACK) closes, oldest first
+
+    Returns:
+        np.ndarray: (B, len(FEATURES)) feature matrix
+    """
+    logs = np.log(closes)
+    last = logs[:, -1]
+    returns = np.diff(logs[:, -22:], axis=1)
+    sma50 = closes[:, -50:].mean(axis=1)
+    sma200 = closes[:, -200:].mean(axis=1)
+    return np.column_stack(
+        [
+            last - logs[:, -6],
+            last - logs[:, -22],
+            last - logs[:, -64],
+            last - logs[:, -253],
+            returns.std(axis=1, ddof=1),
+            last - np.log(sma50),
+            last - np.log(sma200),
+        ]
+    )
+
+
+@dataclass
+class LinearPriceModel:
+    """
+    Expected log return per horizon as weights @ features + intercept.
+
+    Attributes:
+        horizons: Forecast horizons in trading days (H,)
+        weights: (H, len(FEATURES)) feature weights
+        intercept: (H,) drift per horizon
+    """
+
+    horizons: np.ndarray
+    weights: np.ndarray
+    intercept: np.ndarray
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearPriceModel":
+        """Load a model saved as .npz with horizons, weights and intercept arrays"""
+        with np.load(path) as data:
+            return cls(data["horizons"], data["weights"], data["intercept"])
+
+    @classmethod
+    def baseline(cls) -> "LinearPriceModel":
+        """
+        Untrained momentum/mean-reversion model used when no model file is set.
+
+        It adds a long-run equity drift, follows 3- and 12-month momentum and
+        fades short-term moves and stretch above the 50-day average.
+        """
+        h = np.array(HORIZONS, dtype=np.float64)
+        weights = np.zeros((len(h), len(FEATURES)))
+        weights[:, FEATURES.index("ret_5")] = -0.10 * np.minimum(h, 5) / 5
+        weights[:, FEATURES.index("ret_63")] = 0.05 * h / 63
+        weights[:, FEATURES.index("ret_252")] = 0.02 * h / 21
+        weights[:, FEATURES.index("gap_sma50")] = -0.10 * np.minimum(h, 21) / 21
+        return cls(h, weights, 0.0003 * h)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """(B, H) expected log returns for a (B, F) feature matrix"""
+        return features @ self.weights.T + self.intercept
+
+
+# Model of the current worker process, loaded once by _init_worker
+_MODEL: Optional[LinearPriceModel] = None
+
+
+def _init_worker(model_path: Optional[str]) -> None:
+    global _MODEL
+    _MODEL = LinearPriceModel.load(Path(model_path)) if model_path else LinearPriceModel.baseline()
+
+
+def score_batch(closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Forecast a batch of symbols with the worker's model.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: horizons (H,), expected
+        log returns (B, H) and their standard deviations (B, H)
+    """
+    features = compute_features(closes)
+    mu = _MODEL.predict(features)
+    sigma = features[:, FEATURES.index("vol_21"), None] * np.sqrt(_MODEL.horizons)
+    return _MODEL.horizons, mu, sigma
+
+
+def _padded(close: np.ndarray) -> np.ndarray:
+    """Last LOOKBACK closes, left-padded with the first close for short histories"""
+    close = close[-LOOKBACK:]
+    if len(close) < LOOKBACK:
+        close = np.concatenate([np.full(LOOKBACK - len(close), close[0]), close])
+    return close
+
+
+class PredictionService:
+    """
+    Micro-batched predictions scored in a process pool.
+
+    Args:
+        store: OHLCV store daily closes are read from
+        model_path: .npz model file; the baseline model if None
+        workers: Number of scoring processes
+        max_batch: Requests scored together at most
+        max_wait: Seconds the first request of a batch waits for others
+        cache_ttl: Seconds a prediction is reused for the same last bar
+    """
+
+    def __init__(
+        self,
+        store: OHLCVStore,
+        model_path: Optional[Path] = None,
+        workers: int = 2,
+        max_batch: int = 256,
+        max_wait: float = 0.005,
+        cache_ttl: float = 300.0,
+    ):
+        self.store = store
+        self.model_path = str(model_path) if model_path else None
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = TTLCache(ttl=cache_ttl, maxsize=50_000)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._starting: Optional[asyncio.Future] = None
+        self._pending: Dict[Tuple[str, int, float], Tuple[np.ndarray, asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Scoring tasks in flight; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        # Horizons of the loaded model, known once the workers are warm
+        self.horizons: Tuple[int, ...] = HORIZONS
+
+    async def start(self) -> None:
+        """Start the worker processes and load the model into each of them, once"""
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        starting = self._starting
+        try:
+            await asyncio.shield(starting)
+        except Exception:
+            # The next batch tries again
+            if self._starting is starting:
+                self._starting = None
+            raise
+
+    async def _start(self) -> None:
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.model_path,),
+        )
+        loop = asyncio.get_running_loop()
+        warmup = np.full((self.workers, LOOKBACK), 100.0)
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, score_batch, warmup[i : i + 1]) for i in range(self.workers))
+            )
+        except BaseException:
+            self.close()
+            raise
+        self.horizons = tuple(results[0][0].astype(int).tolist())
+
+    def close(self) -> None:
+        self._starting = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _schedule(self) -> None:
+        if len(self._pending) >= self.max_batch:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._score(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._scored)
+
+    def _scored(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Scoring a prediction batch failed", exc_info=task.exception())
+
+    async def _score(self, pending: Dict[Tuple[str, int, float], Tuple[np.ndarray, asyncio.Future]]) -> None:
+        keys = list(pending)
+        futures = [pending[k][1] for k in keys]
+        try:
+            await self.start()
+            closes = np.stack([pending[k][0] for k in keys])
+            horizons, mu, sigma = await asyncio.get_running_loop().run_in_executor(
+                self._pool, score_batch, closes
+            )
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result((horizons, mu[i], sigma[i]))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancelled mid-batch: release the waiting requests
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+    async def predict(self, symbol: str) -> Dict[int, Dict[str, float]]:
+        """
+        Forecast one symbol at every model horizon.
+
+        Returns:
+            Dict[int, Dict[str, float]]: Per horizon (trading days) the last
+            close, predicted price, expected return and the probability that
+            the predicted direction is right
+        """
+        symbol = symbol.upper()
+        end = date.today()
+        bars = await self.store.get(symbol, end - timedelta(days=HISTORY_DAYS), end)
+        close = bars["close"][~np.isnan(bars["close"])]
+        if len(close) < 2:
+            raise ValueError(f"Not enough price history for {symbol}")
+        last_t, last_close = int(bars["t"][-1]), float(close[-1])
+
+        cached = {h: self.cache.get((symbol, h, last_t, last_close)) for h in self.horizons}
+        if all(v is not None for v in cached.values()):
+            return cached
+
+        key = (symbol, last_t, last_close)
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = (_padded(close), asyncio.get_running_loop().create_future())
+            self._schedule()
+        horizons, mu, sigma = await asyncio.shield(entry[1])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confidence = np.where(sigma > 0, norm_cdf(np.abs(mu) / sigma), 0.5)
+        out = {}
+        for i, h in enumerate(horizons.astype(int).tolist()):
+            out[h] = {
+                "last_close": last_close,
+                "price": last_close * float(np.exp(mu[i])),
+                "expected_return": float(np.expm1(mu[i])),
+                "confidence": float(confidence[i]),
+            }
+            self.cache.set((symbol, h, last_t, last_close), out[h])
+        return out
@@ -0,0 +1,193 @@
+"""
+Batched quote engine for the unified backend.
+
+Splits a list of symbols into provider batches, runs the batches
+concurrently off the event loop and returns whatever came back. Quotes are
+kept in a process-wide TTL cache and concurrent misses for the same
+(symbol, provider) share a single upstream call.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from unified_backend.cache import TTLCache
+from unified_backend.executor import ExecutorSaturated, SDKExecutor
+
+logger = logging.getLogger(__name__)
+
+# fetcher(symbols, provider) -> list of quote records, one per symbol found
+QuoteFetcher = Callable[[Sequence[str], str], List[Any]]
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    """Split items into consecutive lists of at most `size` elements"""
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _index_by_symbol(batch: Sequence[str], records: List[Any]) -> Dict[str, Any]:
+    """Map quote records back to the requested symbols.
+
+    Providers echo the symbol on each record. A single-symbol batch whose
+    record carries no symbol is still attributed to the requested one.
+    """
+    wanted = set(batch)
+    quotes = {}
+    for record in records or []:
+        symbol = getattr(record, "symbol", None)
+        if symbol is None and len(batch) == 1:
+            symbol = batch[0]
+        if symbol is None:
+            continue
+        symbol = str(symbol).upper()
+        if symbol in wanted and symbol not in quotes:
+            quotes[symbol] = record
+    return quotes
+
+
+class QuoteEngine:
+    """
+    Fetch quotes for many symbols with one upstream call per batch.
+
+    Batches are dispatched concurrently to the "quotes" lane of the SDK
+    executor, so wall-clock time follows the slowest batch instead of the
+    sum of all calls. When a batch
+    fails its symbols are retried one per lane call, concurrently but at
+    most `max_retries` at a time per engine, so one bad ticker only drops
+    itself from the result without flooding the lane's queue. Symbols
+    dropped because the lane was saturated are logged.
+
+    Successful quotes are cached for `cache_ttl` seconds. A symbol that is
+    already being fetched by another request is awaited rather than fetched
+    again, so upstream volume is bounded by symbols x refresh rate no matter
+    how many clients ask for it.
+
+    Args:
+        fetcher: Blocking callable returning quote records for a batch
+        executor: Executor the blocking fetcher calls are run on
+        batch_size: Maximum number of symbols per upstream call
+        cache_ttl: Seconds a fetched quote is served from cache
+        max_retries: Single-symbol retries of failed batches in flight at once
+    """
+
+    def __init__(
+        self,
+        fetcher: QuoteFetcher,
+        executor: SDKExecutor,
+        batch_size: int = 25,
+        cache_ttl: float = 5.0,
+        max_retries: int = 8,
+    ):
+        self.fetcher = fetcher
+        self.executor = executor
+        self.batch_size = max(1, batch_size)
+        self.cache = TTLCache(ttl=cache_ttl)
+        self.max_retries = max(1, max_retries)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Created on first use, inside the running loop
+        self._retry_slots: Optional[asyncio.Semaphore] = None
+
+    async def get_quotes(
+        self, symbols: Sequence[str], provider: str = "yfinance"
+    ) -> Dict[str, Any]:
+        """
+        Get quotes for a list of symbols.
+
+        Args:
+            symbols: Symbols to quote (case-insensitive, duplicates ignored)
+            provider: OpenBB provider name
+
+        Returns:
+            Dict[str, Any]: Quote record per upper-cased symbol. Symbols that
+            failed or returned nothing are missing from the dict.
+        """
+        unique = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        loop = asyncio.get_running_loop()
+
+        quotes = {}
+        owned: List[str] = []
+        waiting: Dict[str, asyncio.Future] = {}
+        for symbol in unique:
+            key = (symbol, provider)
+            cached = self.cache.get(key)
+            if cached is not None:
+                quotes[symbol] = cached
+            elif key in self._inflight:
+                waiting[symbol] = self._inflight[key]
+            else:
+                self._inflight[key] = loop.create_future()
+                owned.append(symbol)
+
+        if owned:
+            try:
+                fetched = await self._fetch(owned, provider)
+            except BaseException:
+                # Release followers with a miss rather than propagating our
+                # cancellation to requests that did not ask for it
+                fetched = {}
+                raise
+            finally:
+                for symbol in owned:
+                    key = (symbol, provider)
+                    value = fetched.get(symbol)
+                    if value is not None:
+                        self.cache.set(key, value)
+                    self._inflight.pop(key).set_result(value)
+            quotes.update(fetched)
+
+        for symbol, future in waiting.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                quotes[symbol] = value
+
+        return quotes
+
+    async def _fetch(self, symbols: List[str], provider: str) -> Dict[str, Any]:
+        """Fetch uncached symbols in concurrent provider batches"""
+        batches = _chunks(symbols, self.batch_size)
+        results = await asyncio.gather(
+            *(self._fetch_batch(batch, provider) for batch in batches)
+        )
+
+        quotes = {}
+        for batch_quotes in results:
+            quotes.update(batch_quotes)
+        return quotes
+
+    async def _fetch_single(self, symbol: str, provider: str) -> Dict[str, Any]:
+        """Retry one symbol of a failed batch, waiting for a retry slot"""
+        if self._retry_slots is None:
+            self._retry_slots = asyncio.Semaphore(self.max_retries)
+        async with self._retry_slots:
+            try:
+                records = await self.executor.run(
+                    "quotes", provider, self.fetcher, [symbol], provider
+                )
+            except ExecutorSaturated:
+                logger.warning("Quote lane %s saturated; dropped %s", provider, symbol)
+                return {}
+            except Exception:
+                return {}
+        return _index_by_symbol([symbol], records)
+
+    async def _fetch_batch(self, batch: List[str], provider: str) -> Dict[str, Any]:
+        """Fetch one batch, falling back to single-symbol calls on failure"""
+        try:
+            records = await self.executor.run(
+                "quotes", provider, self.fetcher, batch, provider
+            )
+        except ExecutorSaturated:
+            logger.warning(
+                "Quote lane %s saturated; dropped %s", provider, ", ".join(batch)
+            )
+            return {}
+        except Exception:
+            if len(batch) == 1:
+                return {}
+            quotes = {}
+            for single in await asyncio.gather(
+                *(self._fetch_single(symbol, provider) for symbol in batch)
+            ):
+                quotes.update(single)
+            return quotes
+
+        return _index_by_symbol(batch, records)
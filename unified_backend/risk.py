@@ -0,0 +1,271 @@
+"""
+Portfolio risk engine with an incrementally updated covariance matrix.
+
+Daily returns of every holding (plus a benchmark) feed a rolling-window
+mean/covariance that is updated with rank-one adds and removes when new
+daily bars arrive, instead of being recomputed from the full return
+matrix. Price ticks only change position values, so risk is re-evaluated
+against the cached covariance.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from unified_backend.ohlcv_store import OHLCVStore
+
+TRADING_DAYS = 252
+Z_95 = 1.6448536269514722
+
+DEFAULT_PORTFOLIO = {
+    "cash": 15000.0,
+    "positions": [
+        {"symbol": "AAPL", "quantity": 120, "cost_basis": 185.00},
+        {"symbol": "MSFT", "quantity": 60, "cost_basis": 380.00},
+        {"symbol": "NVDA", "quantity": 150, "cost_basis": 95.00},
+        {"symbol": "SPY", "quantity": 40, "cost_basis": 520.00},
+        {"symbol": "TSLA", "quantity": 30, "cost_basis": 240.00},
+    ],
+}
+
+
+def load_portfolio(path: Optional[Path]) -> Dict[str, Any]:
+    """
+    Read positions from a JSON file, falling back to the demo portfolio.
+
+    The file holds {"cash": float, "positions": [{"symbol", "quantity",
+    "cost_basis"}, ...]}.
+    """
+    if path is not None and Path(path).exists():
+        with open(path) as f:
+            return json.load(f)
+    return DEFAULT_PORTFOLIO
+
+
+class RollingCovariance:
+    """
+    Mean and covariance of the last `window` return vectors.
+
+    Adding or dropping one observation is a rank-one update of the
+    co-moment matrix, O(N^2) for N assets.
+    """
+
+    def __init__(self, returns: np.ndarray, window: int):
+        self.window = window
+        returns = returns[-window:]
+        self.rows: Deque[np.ndarray] = deque(returns)
+        self.n = len(returns)
+        self.mean = returns.mean(axis=0) if self.n else np.zeros(returns.shape[1])
+        centred = returns - self.mean
+        self.comoment = centred.T @ centred
+
+    def push(self, x: np.ndarray) -> None:
+        """Add one observation, dropping the oldest once the window is full"""
+        self.n += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.n
+        self.comoment += np.outer(delta, x - self.mean)
+        self.rows.append(x)
+        if self.n > self.window:
+            self._drop(self.rows.popleft())
+
+    def _drop(self, x: np.ndarray) -> None:
+        old_mean = self.mean
+        self.n -= 1
+        self.mean = old_mean - (x - old_mean) / self.n
+        self.comoment -= np.outer(x - self.mean, x - old_mean)
+
+    def covariance(self) -> np.ndarray:
+        return self.comoment / max(self.n - 1, 1)
+
+    def returns(self) -> np.ndarray:
+        return np.array(self.rows)
+
+
+def aligned_closes(bars: Sequence[Dict[str, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Closes of several symbols on the union of their timestamps.
+
+    Missing closes are forward-filled (NaN before a symbol's first bar).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: timestamps (T,) and closes (T, N)
+    """
+    t = np.unique(np.concatenate([b["t"] for b in bars]))
+    closes = np.full((len(t), len(bars)), np.nan)
+    for j, b in enumerate(bars):
+        idx = np.searchsorted(b["t"], t, side="right") - 1
+        valid = idx >= 0
+        closes[valid, j] = b["close"][idx[valid]]
+    return t, closes
+
+
+@dataclass
+class _RiskState:
+    committed_t: int
+    cov: RollingCovariance
+
+
+class RiskEngine:
+    """
+    Risk and P&L for a portfolio of positions, from stored daily bars.
+
+    Args:
+        store: OHLCV store the bars are read from
+        benchmark: Symbol beta is measured against
+        window: Number of daily returns in the covariance window
+        risk_free_rate: Annual rate used for the Sharpe ratio
+    """
+
+    def __init__(
+        self,
+        store: OHLCVStore,
+        benchmark: str = "SPY",
+        window: int = TRADING_DAYS,
+        risk_free_rate: float = 0.045,
+    ):
+        self.store = store
+        self.benchmark = benchmark.upper()
+        self.window = window
+        self.risk_free_rate = risk_free_rate
+        # Keyed by the tuple of symbols (holdings + benchmark)
+        self._states: Dict[Tuple[str, ...], _RiskState] = {}
+        self._lock = threading.Lock()
+
+    def _update(self, universe: Tuple[str, ...], t: np.ndarray, returns: np.ndarray) -> RollingCovariance:
+        """Fold completed daily returns into the cached covariance"""
+        # returns[i] is the return into bar t[i + 1]; the last bar may still
+        # be in progress, so its return is not committed
+        completed_t, completed = t[1:-1], returns[:-1]
+        state = self._states.get(universe)
+        start = None
+        if state is not None:
+            start = int(np.searchsorted(completed_t, state.committed_t, side="right"))
+            if start == 0 or len(completed) - start > self.window:
+                start = None
+
+        if start is None:
+            cov = RollingCovariance(completed, self.window)
+            self._states[universe] = _RiskState(int(completed_t[-1]) if len(completed_t) else 0, cov)
+            return cov
+
+        for row in completed[start:]:
+            state.cov.push(row)
+        if len(completed_t):
+            state.committed_t = int(completed_t[-1])
+        return state.cov
+
+    def _evaluate(
+        self,
+        universe: Tuple[str, ...],
+        quantities: np.ndarray,
+        cost_basis: np.ndarray,
+        cash: float,
+        bars: List[Dict[str, np.ndarray]],
+    ) -> Dict[str, float]:
+        t, closes = aligned_closes(bars)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.nan_to_num(closes[1:] / closes[:-1] - 1.0)
+        with self._lock:
+            cov_state = self._update(universe, t, returns)
+            cov = cov_state.covariance()
+            mean = cov_state.mean.copy()
+            window_returns = cov_state.returns()
+            observations = cov_state.n
+
+        prices = np.nan_to_num(closes[-1])
+        n = len(quantities)
+        exposure = quantities * prices[:n]
+        invested = float(exposure.sum())
+        value = invested + cash
+
+        def pnl(bars_back: int) -> float:
+            if len(closes) <= bars_back:
+                return float("nan")
+            past = np.nan_to_num(closes[-1 - bars_back, :n])
+            return float(quantities @ (prices[:n] - past))
+
+        # Holdings are the first n assets of the universe, the benchmark last
+        holdings_cov = cov[:n, :n]
+        variance = float(exposure @ holdings_cov @ exposure)
+        daily_vol = np.sqrt(max(variance, 0.0))
+        bench_var = cov[-1, -1]
+        beta = float(exposure @ cov[:n, -1] / bench_var / invested) if bench_var > 0 and invested else float("nan")
+
+        pnl_series = window_returns[:, :n] @ exposure if len(window_returns) else np.empty(0)
+        portfolio_returns = pnl_series / invested if invested else pnl_series
+        mean_return = float(mean[:n] @ exposure / invested) if invested else 0.0
+        volatility = daily_vol / invested * np.sqrt(TRADING_DAYS) if invested else float("nan")
+        sharpe = (
+            (mean_return * TRADING_DAYS - self.risk_free_rate) / volatility
+            if volatility and np.isfinite(volatility)
+            else float("nan")
+        )
+        if len(portfolio_returns):
+            equity = np.cumprod(1.0 + portfolio_returns)
+            max_drawdown = float((equity / np.maximum.accumulate(equity) - 1.0).min())
+            var_hist = float(-np.percentile(pnl_series, 5))
+        else:
+            max_drawdown = var_hist = float("nan")
+
+        return {
+            "value": value,
+            "invested": invested,
+            "cash": cash,
+            "positions": n,
+            "day_pnl": pnl(1),
+            "week_pnl": pnl(5),
+            "month_pnl": pnl(21),
+            "unrealized_pnl": float(exposure.sum() - quantities @ cost_basis),
+            "beta": beta,
+            "sharpe": float(sharpe),
+            "volatility": float(volatility),
+            "max_drawdown": max_drawdown,
+            "var_historical": var_hist,
+            "var_parametric": float(Z_95 * daily_vol),
+            "observations": observations,
+        }
+
+    async def evaluate(self, portfolio: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Risk metrics and P&L of a portfolio.
+
+        Args:
+            portfolio: {"cash": float, "positions": [{"symbol", "quantity", "cost_basis"}]}
+
+        Returns:
+            Dict[str, float]: Value, P&L over 1/5/21 bars, beta, Sharpe,
+            annualized volatility, max drawdown and 1-day 95% VaR (historical
+            and parametric, in currency)
+        """
+        positions = portfolio.get("positions", [])
+        symbols = [p["symbol"].upper() for p in positions]
+        quantities = np.array([float(p.get("quantity", 0)) for p in positions])
+        cost_basis = np.array([float(p.get("cost_basis", 0)) for p in positions])
+        universe = tuple(symbols) + (self.benchmark,)
+        # The benchmark may also be a holding; fetch and report each symbol once
+        distinct = list(dict.fromkeys(universe))
+
+        end = date.today()
+        start = end - timedelta(days=int(self.window * 365 / TRADING_DAYS) + 30)
+        loaded = await self.store.get_many(distinct, start, end)
+        missing = [s for s in distinct if s not in loaded or not len(loaded[s]["t"])]
+        if missing:
+            shown = ", ".join(missing[:10]) + (f" and {len(missing) - 10} more" if len(missing) > 10 else "")
+            raise ValueError(f"No price data for {shown}")
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            self._evaluate,
+            universe,
+            quantities,
+            cost_basis,
+            float(portfolio.get("cash", 0.0)),
+            [loaded[s] for s in universe],
+        )
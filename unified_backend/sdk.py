@@ -0,0 +1,139 @@
+"""
+Deferred loading of the OpenBB SDK.
+
+Importing `openbb` builds the SDK and loads every installed provider
+extension, which takes seconds. `LazySDK` keeps that off the import path
+of the app: the package is only located at import time, loaded in a
+background thread once the server has started (or by the first caller that
+needs it), and its readiness and a timing breakdown of the load are
+exposed for health checks.
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+UNAVAILABLE = "unavailable"
+
+
+class LazySDK:
+    """
+    Load `from <module> import <attribute>` on demand, once.
+
+    Args:
+        module: Package to import, e.g. "openbb"
+        attribute: Object taken from the package, e.g. "obb"
+        warmup: Dotted attribute paths touched after the import so the
+            routers/extensions they live in are loaded too
+    """
+
+    def __init__(self, module: str, attribute: str, warmup: Sequence[str] = ()):
+        self.module = module
+        self.attribute = attribute
+        self.warmup = tuple(warmup)
+        self.available = importlib.util.find_spec(module) is not None
+        self.state = IDLE if self.available else UNAVAILABLE
+        self.error: Optional[str] = None
+        # (phase, seconds) in the order they happened
+        self.timings: List[Tuple[str, float]] = []
+        self.modules: Counter = Counter()
+        self._sdk: Any = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        if not self.available:
+            self._ready.set()
+
+    def mark(self, phase: str, seconds: float) -> None:
+        """Add a phase measured elsewhere (e.g. app import) to the timing report"""
+        self.timings.append((phase, seconds))
+
+    def start(self) -> None:
+        """Load in a background thread unless already loading or loaded"""
+        if self.state == IDLE:
+            threading.Thread(target=self.load, name=f"{self.module}-loader", daemon=True).start()
+
+    def load(self) -> Any:
+        """Import the SDK in the calling thread (no-op once loaded)"""
+        with self._lock:
+            if self.state in (READY, FAILED, UNAVAILABLE):
+                return self._sdk
+            self.state = LOADING
+            before = set(sys.modules)
+            try:
+                started = time.perf_counter()
+                package = importlib.import_module(self.module)
+                self.mark(f"import {self.module}", time.perf_counter() - started)
+
+                started = time.perf_counter()
+                sdk = getattr(package, self.attribute)
+                self.mark(f"build {self.attribute}", time.perf_counter() - started)
+
+                for path in self.warmup:
+                    started = time.perf_counter()
+                    target = sdk
+                    for name in path.split("."):
+                        target = getattr(target, name)
+                    self.mark(f"warm up {self.attribute}.{path}", time.perf_counter() - started)
+
+                self._sdk = sdk
+                self.state = READY
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                self.state = FAILED
+            finally:
+                self.modules = Counter(name.split(".")[0] for name in set(sys.modules) - before)
+                self._ready.set()
+            return self._sdk
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        The loaded SDK, waiting for (or starting) the load if needed.
+
+        Raises:
+            RuntimeError: If the SDK is not installed, failed to load or is
+                not ready within timeout
+        """
+        if self.state == READY:
+            return self._sdk
+        if self.state == IDLE:
+            self.load()
+        if not self._ready.wait(timeout):
+            raise RuntimeError(f"{self.module} SDK is still loading")
+        if self.state != READY:
+            raise RuntimeError(f"{self.module} SDK not available: {self.error or 'not installed'}")
+        return self._sdk
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def proxy(self, timeout: Optional[float] = None) -> "SDKProxy":
+        return SDKProxy(self, timeout)
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Readiness, load phases and the packages that contributed the most modules"""
+        return {
+            "state": self.state,
+            "error": self.error,
+            "phases": [{"phase": p, "ms": round(s * 1000, 1)} for p, s in self.timings],
+            "modules_loaded": sum(self.modules.values()),
+            "top_packages": [{"package": p, "modules": n} for p, n in self.modules.most_common(top)],
+        }
+
+
+class SDKProxy:
+    """Stands in for the SDK object; attribute access waits for the load"""
+
+    def __init__(self, sdk: LazySDK, timeout: Optional[float] = None):
+        self._sdk = sdk
+        self._timeout = timeout
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sdk.get(self._timeout), name)
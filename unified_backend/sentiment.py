@@ -0,0 +1,260 @@
+"""
+News sentiment pipeline with per-article score caching.
+
+Headlines come from a per-symbol news cache (shared with the news widget).
+Every article is keyed by a hash of its content and scored once: a refresh
+only scores articles whose hash has not been seen, and per-symbol sentiment
+is aggregated from the cached scores. The lexicon scorer takes tens of
+microseconds per article, less than pickling it to a worker process would,
+so articles are scored in-process.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from unified_backend.cache import SingleFlight, TTLCache
+from unified_backend.executor import SDKExecutor
+
+logger = logging.getLogger(__name__)
+
+# Compact finance lexicon (in the spirit of Loughran-McDonald)
+POSITIVE = frozenset(
+    """
+    beat beats surge surges surged soar soars soared rally rallies rallied gain gains gained
+    jump jumps jumped rise rises rising rose climb climbs climbed record strong stronger
+    growth grow grows grew profit profits profitable upgrade upgrades upgraded outperform
+    outperforms bullish boost boosts boosted raise raises raised exceed exceeds exceeded
+    positive optimistic opportunity breakthrough expand expands expansion win wins won
+    approval approved buyback dividend innovative robust rebound rebounds rebounded top tops
+    """.split()
+)
+NEGATIVE = frozenset(
+    """
+    miss misses missed fall falls fell drop drops dropped plunge plunges plunged slump slumps
+    decline declines declined loss losses lose loses weak weaker downgrade downgrades
+    downgraded underperform underperforms bearish cut cuts lawsuit lawsuits probe investigation
+    fraud recall recalls warning warns warned risk risks concern concerns layoff layoffs
+    bankruptcy default defaults delay delays delayed negative pessimistic fine fined penalty
+    slowdown slower crash crashes crashed tumble tumbles tumbled sink sinks sank halt halted
+    """.split()
+)
+NEGATIONS = frozenset("not no never without hardly barely fails failed".split())
+# Tokens after a negation whose polarity is flipped
+NEGATION_SCOPE = 3
+_TOKEN = re.compile(r"[a-z']+")
+
+
+def score_text(text: str) -> float:
+    """Sentiment of one text in [-1, 1] (0 when no lexicon word is present)"""
+    pos = neg = 0
+    flip = 0
+    for token in _TOKEN.findall(text.lower()):
+        if token in NEGATIONS:
+            flip = NEGATION_SCOPE
+            continue
+        polarity = (token in POSITIVE) - (token in NEGATIVE)
+        if flip:
+            polarity, flip = -polarity, flip - 1
+        if polarity > 0:
+            pos += 1
+        elif polarity < 0:
+            neg += 1
+    return (pos - neg) / (pos + neg + 1)
+
+
+def score_texts(texts: Sequence[str]) -> List[float]:
+    """Score a batch of texts"""
+    return [score_text(text) for text in texts]
+
+
+def content_hash(article: Any) -> str:
+    """Stable key of an article's content, independent of the symbol it was fetched for"""
+    title = (getattr(article, "title", None) or "").strip()
+    text = (getattr(article, "text", None) or "").strip()
+    return hashlib.sha1(f"{title}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _article_text(article: Any) -> str:
+    return f"{getattr(article, 'title', None) or ''}. {getattr(article, 'text', None) or ''}"
+
+
+def _age_days(article: Any, now: datetime) -> float:
+    published = getattr(article, "date", None)
+    if not isinstance(published, datetime):
+        return 0.0
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return max((now - published).total_seconds() / 86400, 0.0)
+
+
+class NewsCache:
+    """
+    Company news per symbol, downloaded at most once per TTL.
+
+    Args:
+        fetcher: Blocking callable(symbol, limit) returning news records
+        executor: Executor the downloads run on ("news" lane)
+        ttl: Seconds a symbol's news is reused
+        limit: Articles requested per symbol
+        provider: Provider name used for the executor lane
+        max_downloads: Downloads submitted to the executor at once, so a
+            large refresh waits here instead of overflowing the lane queue
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str, int], List[Any]],
+        executor: SDKExecutor,
+        ttl: float = 300.0,
+        limit: int = 50,
+        provider: str = "yfinance",
+        max_downloads: int = 8,
+    ):
+        self.fetcher = fetcher
+        self.executor = executor
+        self.limit = limit
+        self.provider = provider
+        self.cache = TTLCache(ttl=ttl, maxsize=2_000)
+        self.max_downloads = max_downloads
+        self._flight = SingleFlight()
+        # Created on first use, inside the running loop
+        self._downloads: Optional[asyncio.Semaphore] = None
+
+    async def _load(self, symbol: str) -> List[Any]:
+        if self._downloads is None:
+            self._downloads = asyncio.Semaphore(self.max_downloads)
+        async with self._downloads:
+            articles = await self.executor.run("news", self.provider, self.fetcher, symbol, self.limit)
+        self.cache.set(symbol, articles)
+        return articles
+
+    async def get(self, symbol: str) -> List[Any]:
+        symbol = symbol.upper()
+        articles = self.cache.get(symbol)
+        if articles is None:
+            articles = await self._flight.do(symbol, lambda: self._load(symbol))
+        return articles
+
+
+class SentimentPipeline:
+    """
+    Scores news articles once each and aggregates sentiment per symbol.
+
+    Args:
+        news: News cache the articles are read from
+        inline_max: New articles scored on the event loop at most (about
+            3 ms of work); a larger refresh is scored in a thread
+        half_life_days: Age at which an article's weight in the aggregate halves
+        threshold: Score above which an article counts as bullish (below its
+            negative as bearish)
+        cache_size: Article scores kept; an evicted article is simply scored again
+        cache_ttl: Seconds an article score is kept
+    """
+
+    def __init__(
+        self,
+        news: NewsCache,
+        inline_max: int = 64,
+        half_life_days: float = 2.0,
+        threshold: float = 0.2,
+        cache_size: int = 20_000,
+        cache_ttl: float = 86_400.0,
+    ):
+        self.news = news
+        self.inline_max = inline_max
+        self.half_life_days = half_life_days
+        self.threshold = threshold
+        # content hash -> score
+        self.scores = TTLCache(ttl=cache_ttl, maxsize=cache_size)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def _score_new(self, articles: Dict[str, Any]) -> None:
+        """Score the articles whose hash is neither cached nor being scored"""
+        loop = asyncio.get_running_loop()
+        waiting = [self._pending[h] for h in articles if h in self._pending]
+        new = [h for h in articles if h not in self._pending and self.scores.get(h) is None]
+        if new:
+            futures = {h: loop.create_future() for h in new}
+            self._pending.update(futures)
+            texts = [_article_text(articles[h]) for h in new]
+            try:
+                try:
+                    if len(new) <= self.inline_max:
+                        scores = score_texts(texts)
+                    else:
+                        scores = await loop.run_in_executor(None, score_texts, texts)
+                except Exception as e:
+                    # Left unscored; a later refresh tries them again
+                    logger.warning("Scoring %d articles failed: %r", len(new), e)
+                    scores = [None] * len(new)
+                for h, score in zip(new, scores):
+                    if score is not None:
+                        self.scores.set(h, score)
+                    futures[h].set_result(score)
+            finally:
+                for h in new:
+                    self._pending.pop(h, None)
+                    if not futures[h].done():
+                        futures[h].cancel()
+        if waiting:
+            await asyncio.gather(*waiting, return_exceptions=True)
+
+    async def analyze(self, symbols: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        News sentiment for several symbols.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per symbol the recency-weighted score in
+            [-1, 1], article counts (total, bullish, bearish, last 24h, and
+            unscored for articles whose scoring failed), the 24h score and the
+            scored articles (newest first). Symbols whose news could not be
+            loaded are left out.
+        """
+        symbols = [s.upper() for s in symbols]
+        loaded = await asyncio.gather(*(self.news.get(s) for s in symbols), return_exceptions=True)
+        news = {s: a for s, a in zip(symbols, loaded) if not isinstance(a, BaseException)}
+
+        by_hash: Dict[str, Any] = {}
+        keyed: Dict[str, List[tuple]] = {}
+        for symbol, articles in news.items():
+            keyed[symbol] = [(content_hash(a), a) for a in articles]
+            by_hash.update(keyed[symbol])
+        await self._score_new(by_hash)
+
+        now = datetime.now(timezone.utc)
+        decay = math.log(2) / self.half_life_days
+        out = {}
+        for symbol, items in keyed.items():
+            weighted = total_weight = recent_sum = 0.0
+            recent = bullish = bearish = 0
+            scored = []
+            for h, article in items:
+                score = self.scores.get(h)
+                if score is None:
+                    continue
+                age = _age_days(article, now)
+                weight = math.exp(-decay * age)
+                weighted += weight * score
+                total_weight += weight
+                if age <= 1:
+                    recent += 1
+                    recent_sum += score
+                bullish += score > self.threshold
+                bearish += score < -self.threshold
+                scored.append((age, score, article))
+            scored.sort(key=lambda x: x[0])
+            out[symbol] = {
+                "score": weighted / total_weight if total_weight else 0.0,
+                "score_24h": recent_sum / recent if recent else 0.0,
+                "articles": len(scored),
+                "articles_24h": recent,
+                "bullish": bullish,
+                "bearish": bearish,
+                "unscored": len(items) - len(scored),
+                "scored": [(score, article) for _, score, article in scored],
+            }
+        return out
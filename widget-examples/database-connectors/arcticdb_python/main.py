@@ -52,7 +52,7 @@ def read_root():
 def get_widgets():
     """Widgets configuration file for OpenBB Pro"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 # Using the example from https://colab.research.google.com/github/man-group/ArcticDB/blob/master/docs/mkdocs/docs/notebooks/ArcticDB_demo_lmdb.ipynb#scrollTo=g7oLl_YlQqeM
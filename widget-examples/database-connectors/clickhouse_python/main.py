@@ -4,7 +4,7 @@ from pathlib import Path
 import clickhouse_connect
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 client = clickhouse_connect.get_client(
     host="",
@@ -43,7 +43,7 @@ def read_root():
 def get_widgets():
     """Widgets configuration file for OpenBB Pro"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 
@@ -62,5 +62,6 @@ ORDER BY year
 """
     )
 
-    # convert df to json
-    return json.loads(results.to_json(orient="records"))
+    # send the dataframe rows as pandas encodes them, without decoding and
+    # re-encoding them
+    return Response(results.to_json(orient="records"), media_type="application/json")
@@ -41,7 +41,7 @@ def read_root():
 def get_widgets():
     """Widgets configuration file for the OpenBB Custom Backend"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 
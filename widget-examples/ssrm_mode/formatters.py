@@ -4,7 +4,18 @@ Handles data conversion without hardcoded field mappings.
 """
 
 import math
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
+
+# Media type a client accepts to get one array per column instead of row objects
+COLUMNAR_MEDIA_TYPE = "application/vnd.openbb.columnar+json"
+
+
+def wants_columnar(request: Any) -> bool:
+    """Whether the client asked for ?format=columnar or the columnar media type"""
+    return (
+        request.query_params.get("format") == "columnar"
+        or COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+    )
 
 
 def clean_json_data(data):
@@ -54,17 +65,60 @@ def convert_database_row_to_dict(row: Any) -> Dict[str, Any]:
         return {"data": row}
 
 
-def format_query_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _json_type(values: List[Any]) -> str:
+    """JSON type of the first non-null value of a column"""
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return "boolean"
+        if isinstance(value, int):
+            return "integer"
+        if isinstance(value, float):
+            return "number"
+        return "string"
+    return "null"
+
+
+def format_query_results_columnar(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Format query results as a schema plus one array per column.
+
+    Args:
+        results: List of database rows as dictionaries
+
+    Returns:
+        Dict[str, Any]: {"schema": [{"name", "type"}, ...], "columns": [[...], ...]}
+    """
+    names: Dict[str, None] = {}
+    for row in results:
+        names.update(dict.fromkeys(row))
+    columns = [clean_json_data([row.get(name) for row in results]) for name in names]
+    return {
+        "schema": [
+            {"name": name, "type": _json_type(values)}
+            for name, values in zip(names, columns)
+        ],
+        "columns": columns,
+    }
+
+
+def format_query_results(
+    results: List[Dict[str, Any]], columnar: bool = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Format query results for API response.
 
     Args:
         results: List of database rows as dictionaries
-        is_grouped: Whether the results are from a grouped query
+        columnar: Return a schema plus one array per column instead of row dicts
 
     Returns:
-        List[Dict[str, Any]]: Formatted results ready for JSON response
+        Union[List[Dict[str, Any]], Dict[str, Any]]: Formatted results ready for JSON response
     """
+    if columnar:
+        return format_query_results_columnar(results)
+
     formatted_results = []
 
     for row in results:
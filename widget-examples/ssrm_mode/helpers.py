@@ -9,7 +9,7 @@ This file contains the main helper functions that tie together all the modular c
 """
 
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Tuple, overload
+from typing import Any, Dict, List, Literal, Tuple, Union, overload
 
 from config import DatabaseConfig
 from database import DatabaseManager
@@ -19,8 +19,8 @@ from query_builder import QueryBuilder
 
 
 async def perform_ssrm_query(
-    db_manager: DatabaseManager, ag_rows: AgRows
-) -> Tuple[int, List[Dict[str, Any]]]:
+    db_manager: DatabaseManager, ag_rows: AgRows, columnar: bool = False
+) -> Tuple[int, Union[List[Dict[str, Any]], Dict[str, Any]]]:
     """
     Execute SSRM query using the modular components.
 
@@ -33,9 +33,10 @@ async def perform_ssrm_query(
     Args:
         db_manager: Database manager instance
         ag_rows: AgGrid configuration and base query
+        columnar: Format the results as a schema plus one array per column
 
     Returns:
-        Tuple[int, List[Dict[str, Any]]]: (total_count, formatted_results)
+        Tuple[int, Union[List[Dict[str, Any]], Dict[str, Any]]]: (total_count, formatted_results)
 
     Raises:
         Exception: If query execution fails
@@ -59,7 +60,7 @@ async def perform_ssrm_query(
         results = db_manager.execute_query(main_query)
 
         # Format results for JSON response
-        formatted_results = format_query_results(results)
+        formatted_results = format_query_results(results, columnar=columnar)
 
         return total_count, formatted_results
 
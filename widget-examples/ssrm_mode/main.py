@@ -2,9 +2,11 @@ import json
 from pathlib import Path
 from typing import Annotated
 
-from fastapi import Body, FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+from formatters import COLUMNAR_MEDIA_TYPE, wants_columnar
 from helpers import create_database_manager, perform_ssrm_query
 
 # Import our custom models and helper functions
@@ -28,6 +30,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress SSRM pages (JSON) above 1 KB for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize database manager
 # Note: Ensure you have 'demo_data.db' file in the same directory or provide correct path
 db_manager = create_database_manager(
@@ -48,6 +53,7 @@ def get_root():
 
 @app.post("/data-ssrm")
 async def get_data_ssrm(
+    request: Request,
     ag_options: Annotated[AgGridOptions, Body(...)] = AgGridOptions(),
 ):
     """
@@ -88,6 +94,10 @@ async def get_data_ssrm(
             - rows: Total row count for pagination
             - debug_info: Query execution information
 
+        With `?format=columnar` (or an Accept header naming the columnar media
+        type) the rows are replaced by `schema` and `columns`, one array per
+        column, and `rowCount` stays the total row count.
+
     Raises:
         HTTPException: 500 error if database query fails
 
@@ -131,7 +141,16 @@ async def get_data_ssrm(
         )
 
         # Execute the SSRM query using our helper function
-        total_count, formatted_results = await perform_ssrm_query(db_manager, ag_rows)
+        columnar = wants_columnar(request)
+        total_count, formatted_results = await perform_ssrm_query(
+            db_manager, ag_rows, columnar=columnar
+        )
+
+        if columnar:
+            return JSONResponse(
+                {**formatted_results, "rowCount": total_count},
+                media_type=COLUMNAR_MEDIA_TYPE,
+            )
 
         # Results are already formatted and cleaned by our modular system
         clean_results = formatted_results
@@ -150,7 +169,7 @@ async def get_data_ssrm(
 def get_widgets():
     """Widgets configuration file for the OpenBB Terminal Pro"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 
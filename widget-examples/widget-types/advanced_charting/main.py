@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
@@ -9,6 +9,12 @@ from enum import Enum
 import json
 from pathlib import Path
 from fastapi.responses import JSONResponse
+import numpy as np
+
+from backend_common.bar_stream import BarStream
+from backend_common.bars import BarStore, Bars
+from backend_common.responses import FastJSONResponse
+from backend_common.symbol_search import SymbolIndex
 
 app = FastAPI(title="TradingView UDF Kraken API")
 
@@ -24,6 +30,31 @@ app.add_middleware(
 # Kraken API base URL
 KRAKEN_API_BASE = "https://api.kraken.com"
 
+# Kraken only serves 1, 5, 15, 30, 60, 240, 1440, 10080 and 21600-minute
+# bars; the other advertised resolutions are resampled from a native one,
+# which is kept per pair so zooming out costs no new request
+BARS = BarStore(
+    bases={
+        "3": "1",
+        "120": "60",
+        "360": "60",
+        "480": "240",
+        "720": "240",
+        "3D": "D",
+        "M": "D",
+        "1M": "D",
+    }
+)
+# Seconds stored bars are reused before Kraken is asked again, as the
+# latest bar keeps changing until its interval closes
+BARS_TTL = 30
+# Most pairs one quotes request may ask for
+MAX_QUOTE_SYMBOLS = 100
+# Seconds the AssetPairs list and its search index are reused
+PAIRS_TTL = 3600
+# Seconds between polls of Kraken for streamed bars
+STREAM_INTERVAL = 5.0
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -86,27 +117,28 @@ class ResolutionEnum(str, Enum):
 
 # Helper functions
 def resolution_to_interval(resolution: str) -> str:
+    # Kraken intervals only; other resolutions are resampled by BARS
     resolution_map = {
         "1": "1",
-        "3": "3",
         "5": "5",
         "15": "15",
         "30": "30",
         "60": "60",
-        "120": "120",
         "240": "240",
-        "360": "360",
-        "480": "480",
-        "720": "720",
         "D": "1440",
         "1D": "1440",
-        "3D": "4320",
         "W": "10080",
         "1W": "10080",
-        "M": "21600",
-        "1M": "21600",
     }
-    return resolution_map.get(resolution, "60")
+    if resolution not in resolution_map:
+        raise ValueError(f"Unsupported resolution {resolution!r}")
+    return resolution_map[resolution]
+
+def kraken_to_bars(klines: List[List[Any]]) -> Bars:
+    # Kraken rows are [time, open, high, low, close, vwap, volume, count]
+    columns = np.array([kline[:5] + kline[6:7] for kline in klines], dtype=np.float64)
+    t, o, h, l, c, v = columns.reshape(-1, 6).T.copy()
+    return Bars(t.astype(np.int64), o, h, l, c, v)
 
 async def fetch_kraken_data(endpoint: str, params: Dict[str, Any] = None) -> Any:
     url = f"{KRAKEN_API_BASE}{endpoint}"
@@ -135,7 +167,7 @@ async def root():
 def get_widgets():
     """Widgets configuration file for the OpenBB Custom Backend"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 # UDF API endpoints
@@ -159,52 +191,58 @@ async def get_config():
     }
     return config
 
+# AssetPairs and the search index built from them, refreshed every PAIRS_TTL seconds
+_pairs_cache: Dict[str, Any] = {"loaded_at": None, "asset_pairs": {}, "index": SymbolIndex()}
+
+async def get_asset_pairs() -> Dict[str, Any]:
+    loaded_at = _pairs_cache["loaded_at"]
+    if loaded_at is not None and time.monotonic() - loaded_at < PAIRS_TTL:
+        return _pairs_cache["asset_pairs"]
+    
+    asset_pairs = await fetch_kraken_data("/0/public/AssetPairs")
+    
+    index = SymbolIndex()
+    for pair_name, pair_info in asset_pairs.get("result", {}).items():
+        # Skip darkpool pairs
+        if pair_name.startswith("."):
+            continue
+        
+        base_asset = pair_info.get("base", "")
+        quote_asset = pair_info.get("quote", "")
+        result = {
+            "symbol": pair_name,
+            "full_name": f"KRAKEN:{pair_name}",
+            "description": f"{base_asset}/{quote_asset}",
+            "exchange": "KRAKEN",
+            "ticker": pair_name,
+            "type": "crypto"
+        }
+        # Names match by word prefix: "xbt" finds XBT/USD through its wsname and altname
+        index.add(
+            result,
+            pair_name,
+            pair_info.get("wsname", ""),
+            pair_info.get("altname", ""),
+            base_asset,
+            quote_asset,
+            exchange="KRAKEN",
+            type="crypto"
+        )
+    
+    _pairs_cache.update(loaded_at=time.monotonic(), asset_pairs=asset_pairs, index=index)
+    return asset_pairs
+
 @app.get("/udf/search", response_model=List[UDFSearchResult])
 async def search_symbols(
     query: str = Query("", description="Search query"),
-    limit: int = Query(30, description="Limit of results")
+    limit: int = Query(30, description="Limit of results"),
+    exchange: str = Query("", description="Exchange filter; empty for all"),
+    symbol_type: str = Query("", alias="type", description="Symbol type filter; empty for all")
 ):
     try:
-        # Get asset pairs from Kraken
-        asset_pairs = await fetch_kraken_data("/0/public/AssetPairs")
-        
-        filtered_symbols = []
-        for pair_name, pair_info in asset_pairs.get("result", {}).items():
-            # Skip darkpool pairs
-            if pair_name.startswith("."):
-                continue
-                
-            base_asset = pair_info.get("base", "")
-            quote_asset = pair_info.get("quote", "")
-            wsname = pair_info.get("wsname", pair_name)
-            
-            if (query.lower() in pair_name.lower() or 
-                query.lower() in base_asset.lower() or 
-                query.lower() in quote_asset.lower()):
-                filtered_symbols.append({
-                    "symbol": pair_name,
-                    "wsname": wsname,
-                    "base": base_asset,
-                    "quote": quote_asset,
-                    "altname": pair_info.get("altname", pair_name)
-                })
-                
-            if len(filtered_symbols) >= limit:
-                break
-        
-        results = [
-            UDFSearchResult(
-                symbol=symbol["symbol"],
-                full_name=f"KRAKEN:{symbol['symbol']}",
-                description=f"{symbol['base']}/{symbol['quote']}",
-                exchange="KRAKEN",
-                ticker=symbol["symbol"],
-                type="crypto"
-            )
-            for symbol in filtered_symbols
-        ]
-        
-        return results
+        # Asset pairs are downloaded once per PAIRS_TTL; each keystroke is an index lookup
+        await get_asset_pairs()
+        return _pairs_cache["index"].search(query, limit, exchange=exchange, type=symbol_type)
     except Exception as e:
         logger.error(f"Error in symbol search: {e}")
         return []
@@ -215,7 +253,7 @@ async def get_symbol_info(symbol: str = Query(..., description="Symbol to get in
     
     try:
         # Get asset pairs from Kraken
-        asset_pairs = await fetch_kraken_data("/0/public/AssetPairs")
+        asset_pairs = await get_asset_pairs()
         
         if clean_symbol not in asset_pairs.get("result", {}):
             return {"s": "error", "errmsg": "Symbol not found"}
@@ -251,6 +289,30 @@ async def get_symbol_info(symbol: str = Query(..., description="Symbol to get in
         logger.error(f"Error in symbol info: {e}")
         return {"s": "error", "errmsg": "Failed to fetch symbol info"}
 
+async def load_bars(clean_symbol: str, base: str, start: int, end: int) -> None:
+    params = {
+        "pair": clean_symbol,
+        "interval": resolution_to_interval(base)
+    }
+    
+    # Kraken OHLC endpoint accepts 'since' parameter in seconds
+    if start > 0:
+        params["since"] = str(start)
+        
+    # Kraken doesn't have a direct 'to' parameter or 'countback'
+    # The bars are stored and filtered on our side
+    
+    ohlc_data = await fetch_kraken_data("/0/public/OHLC", params)
+    
+    # Kraken returns data in format {pair_name: [[time, open, high, low, close, vwap, volume, count], ...], last: timestamp}
+    klines = (ohlc_data or {}).get("result", {}).get(clean_symbol, [])
+    bars = kraken_to_bars(klines)
+    if not len(bars):
+        return
+    # Kraken returns at most the latest 720 bars whatever 'since' is, so
+    # only the span from the first returned bar on is known to be complete
+    BARS.add(clean_symbol, base, bars, max(start, int(bars.t[0])), end)
+
 @app.get("/udf/history")
 async def get_history(
     symbol: str = Query(..., description="Symbol"),
@@ -259,53 +321,93 @@ async def get_history(
     to_time: int = Query(..., alias="to", description="To timestamp")
 ):
     clean_symbol = symbol.split(":")[-1] if ":" in symbol else symbol
-    interval = resolution_to_interval(resolution)
     
     try:
-        params = {
-            "pair": clean_symbol,
-            "interval": interval
-        }
+        base, start, end = BARS.plan(resolution, from_time, to_time)
         
-        # Kraken OHLC endpoint accepts 'since' parameter in seconds
-        if from_time > 0:
-            params["since"] = str(from_time)
-            
-        # Kraken doesn't have a direct 'to' parameter or 'countback'
-        # We'll fetch data and filter it on our side
+        if not BARS.covered(clean_symbol, base, start, end, max_age=BARS_TTL):
+            await load_bars(clean_symbol, base, start, end)
         
-        ohlc_data = await fetch_kraken_data("/0/public/OHLC", params)
+        bars = BARS.history(clean_symbol, resolution, from_time, to_time)
         
-        if not ohlc_data or "result" not in ohlc_data:
+        if not len(bars):
             return {"s": "no_data"}
-            
-        # Kraken returns data in format {pair_name: [[time, open, high, low, close, vwap, volume, count], ...], last: timestamp}
-        klines = ohlc_data["result"].get(clean_symbol, [])
-        
-        # Filter by time range
-        filtered_klines = [
-            kline for kline in klines 
-            if from_time <= kline[0] <= to_time
-        ]
-        
-        if not filtered_klines:
-            return {"s": "no_data"}
-        
-        result = {
-            "s": "ok",
-            "t": [int(kline[0]) for kline in filtered_klines],       # Time
-            "o": [float(kline[1]) for kline in filtered_klines],     # Open
-            "h": [float(kline[2]) for kline in filtered_klines],     # High
-            "l": [float(kline[3]) for kline in filtered_klines],     # Low
-            "c": [float(kline[4]) for kline in filtered_klines],     # Close
-            "v": [float(kline[6]) for kline in filtered_klines]      # Volume
-        }
         
-        return result
+        # The OHLCV values are NumPy arrays, serialized without conversion to lists
+        return FastJSONResponse(bars.to_udf())
     except Exception as e:
         logger.error(f"Error in history data: {e}")
         return {"s": "error", "errmsg": f"Failed to fetch history data: {str(e)}"}
 
+def quote_symbols(symbols: str) -> List[str]:
+    # Comma-separated symbols, in request order and without duplicates
+    names = [name.strip() for name in symbols.split(",") if name.strip()]
+    names = list(dict.fromkeys(names))
+    if len(names) > MAX_QUOTE_SYMBOLS:
+        raise ValueError(f"{len(names)} symbols requested; at most {MAX_QUOTE_SYMBOLS} per request")
+    return names
+
+@app.get("/udf/quotes")
+async def get_quotes(symbols: str = Query(..., description="Comma-separated symbols")):
+    try:
+        names = quote_symbols(symbols)
+        # One Ticker call covers every pair
+        pairs = {name: name.split(":")[-1] for name in names}
+        ticker = await fetch_kraken_data("/0/public/Ticker", {"pair": ",".join(set(pairs.values()))})
+    except Exception as e:
+        logger.error(f"Error in quotes: {e}")
+        return {"s": "error", "errmsg": f"Failed to fetch quotes: {str(e)}"}
+    
+    quotes = []
+    for name, pair in pairs.items():
+        info = ticker.get("result", {}).get(pair)
+        if info is None:
+            quotes.append({"s": "error", "n": name, "v": {}})
+            continue
+        
+        # Kraken has no previous close for 24/7 markets; today's open (UTC) stands in for it
+        last = float(info["c"][0])
+        open_price = float(info["o"])
+        change = last - open_price
+        quotes.append({
+            "s": "ok",
+            "n": name,
+            "v": {
+                "ch": change,
+                "chp": 100 * change / open_price if open_price else 0.0,
+                "short_name": pair,
+                "exchange": "KRAKEN",
+                "description": pair,
+                "lp": last,
+                "ask": float(info["a"][0]),
+                "bid": float(info["b"][0]),
+                "open_price": open_price,
+                "high_price": float(info["h"][0]),
+                "low_price": float(info["l"][0]),
+                "prev_close_price": open_price,
+                "volume": float(info["v"][0])
+            }
+        })
+    
+    return {"s": "ok", "d": quotes}
+
+async def latest_kraken_bars(symbol: str, resolution: str) -> Bars:
+    # The previous and the forming bar; the fetched bars also refresh the bar store behind /udf/history
+    clean_symbol = symbol.split(":")[-1] if ":" in symbol else symbol
+    now = int(time.time())
+    base, start, end = BARS.plan(resolution, now, now, countback=2)
+    await load_bars(clean_symbol, base, start, end)
+    return BARS.history(clean_symbol, resolution, now, now, countback=2)
+
+# Kraken is polled once per STREAM_INTERVAL seconds per subscribed (pair, resolution),
+# however many charts listen to it
+BAR_STREAM = BarStream(poll=latest_kraken_bars, interval=STREAM_INTERVAL)
+
+@app.websocket("/udf/stream")
+async def udf_stream(websocket: WebSocket):
+    # Live charts subscribe here instead of polling /udf/history; see backend_common/bar_stream.py
+    await BAR_STREAM.serve(websocket)
+
 @app.get("/udf/time")
 async def get_server_time():
     try:
@@ -6,7 +6,7 @@ import plotly.graph_objects as go
 import requests
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from plotly_templates import dark_template
 
 app = FastAPI()
@@ -33,7 +33,7 @@ def read_root():
 def get_widgets():
     """Widgets configuration file for the OpenBB Custom Backend"""
     return JSONResponse(
-        content=json.load((Path(__file__).parent.resolve() / "widgets.json").open())
+        content=json.loads((Path(__file__).parent.resolve() / "widgets.json").read_text())
     )
 
 
@@ -126,8 +126,9 @@ def get_chains(raw: bool = False):
             ),
         )
 
-        # return the plotly json
-        return json.loads(figure.to_json())
+        # return the plotly json as encoded by the figure, without decoding
+        # and re-encoding it
+        return Response(figure.to_json(), media_type="application/json")
 
     print(f"Request error {response.status_code}: {response.text}")
     return JSONResponse(
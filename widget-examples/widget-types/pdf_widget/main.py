@@ -28,7 +28,7 @@ def read_root():
 @app.get("/widgets.json")
 def get_widgets():
     """Widgets configuration file for the OpenBB Custom Backend."""
-    return JSONResponse(content=json.load((ROOT_PATH / "widgets.json").open()))
+    return JSONResponse(content=json.loads((ROOT_PATH / "widgets.json").read_text()))
 
 
 @app.get("/files-base64")